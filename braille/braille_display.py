@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+여러 점자 모듈을 하나의 점자 디스플레이로
+- 점자 모듈(아두이노 + 모터 10개)마다 시리얼 포트가 따로 있고, 이어지는 셀 범위를 하나씩 맡음
+- BRAILLE_PORTS 환경 변수로 모듈 지정 (예: "/dev/ttyACM1,/dev/ttyACM2" 또는 "/dev/ttyACM1:10,/dev/ttyACM2:6")
+  지정하지 않으면 기존처럼 자동으로 찾은 모듈 하나 (10칸)
+- 화면 갱신은 모듈별로 나눠 동시에 전송하고, 모든 모듈이 끝나면 완료되는 Future 하나를 반환
+- 표시 중인 셀 상태를 한 곳에서 관리 (페이지 넘김과 읽기 학습이 같이 사용)
+"""
+
+import os
+import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from braille.motor_protocol import MotorLink, MOTOR_COUNT
+
+MODULE_PORTS_ENV = "BRAILLE_PORTS"
+BAUD_RATE = 9600
+BLANK_CELL = '88'
+DEFAULT_STATE = ['11', '22', '33', '44', '55', '66', '77', '88', '11', '22']  # 상태 기록이 없을 때 (모듈마다 반복)
+
+
+def configured_module_ports():
+    """환경 변수의 모듈 목록 → [(포트, 셀 수), ...] (없으면 빈 목록)"""
+    modules = []
+    for spec in os.environ.get(MODULE_PORTS_ENV, "").split(','):
+        spec = spec.strip()
+        if not spec:
+            continue
+        port, _, cells = spec.partition(':')
+        modules.append((port, int(cells) if cells.isdigit() else MOTOR_COUNT))
+    return modules
+
+
+def gather_futures(futures):
+    """여러 Future → 모두 끝나면 완료되는 Future 하나 (결과: 모두 성공했는지)"""
+    combined = Future()
+    remaining = [len(futures)]
+    results = []
+    lock = threading.Lock()
+
+    def on_done(future):
+        try:
+            success = bool(future.result())
+        except Exception:
+            success = False
+        with lock:
+            results.append(success)
+            remaining[0] -= 1
+            finished = remaining[0] == 0
+        if finished:
+            combined.set_result(all(results))
+
+    if not futures:
+        combined.set_result(True)
+    for future in futures:
+        future.add_done_callback(on_done)
+    return combined
+
+
+class BrailleModule:
+    def __init__(self, name, first_cell, cell_count, link=None):
+        """점자 모듈 하나 (셀 first_cell부터 cell_count칸)"""
+        self.name = name
+        self.first_cell = first_cell
+        self.cell_count = cell_count
+        self.link = link
+        self.executor = ThreadPoolExecutor(max_workers=1)   # 모듈 안에서는 순서대로, 모듈끼리는 동시에
+        self.stats = {'updates': 0, 'failures': 0, 'seconds': 0.0}
+
+    @property
+    def cells(self):
+        return slice(self.first_cell, self.first_cell + self.cell_count)
+
+    def connect(self):
+        """포트를 열고 모터 프로토콜 확인 (기존 점자 모터 연결과 같은 순서)"""
+        import serial
+        try:
+            serial_port = serial.Serial(self.name, BAUD_RATE, timeout=2)
+            time.sleep(2)  # Arduino 리셋 대기
+            serial_port.reset_input_buffer()
+            serial_port.reset_output_buffer()
+            serial_port.write(b'\n')   # 아두이노 깨우기
+            time.sleep(0.5)
+            serial_port.reset_input_buffer()
+            self.link = MotorLink(serial_port)
+            self.link.negotiate()
+            print(f"✅ 점자 모듈 연결: {self.name} (셀 {self.first_cell + 1}~{self.first_cell + self.cell_count})")
+            return True
+        except Exception as e:
+            print(f"❌ 점자 모듈 {self.name} 연결 실패: {e}")
+            self.link = None
+            return False
+
+    def send(self, values):
+        """이 모듈 몫의 이동량 전송 (Future 반환)"""
+        if self.link is None:
+            print(f"[ERROR] 점자 모듈 {self.name}이 연결되지 않았습니다.")
+            future = Future()
+            future.set_result(False)
+            return future
+        start = time.time()
+        future = self.link.send(' '.join(values))
+        future.add_done_callback(lambda done: self.record(start, done.result()))
+        return future
+
+    def record(self, start, success):
+        self.stats['updates'] += 1
+        self.stats['seconds'] += time.time() - start
+        if not success:
+            self.stats['failures'] += 1
+
+    def close(self):
+        if self.link:
+            self.link.close()
+            if self.link.serial_port.is_open:
+                self.link.serial_port.close()
+
+
+class BrailleDisplay:
+    def __init__(self, translator, modules):
+        """여러 점자 모듈을 하나의 논리 디스플레이로 (셀 번호는 모듈 순서대로 이어짐)"""
+        self.translator = translator
+        self.modules = modules
+        self.cell_count = sum(module.cell_count for module in modules)
+        self.state = None                 # 표시 중인 셀 (처음에는 로그 파일에서 읽음)
+        self.confirmed_state = None       # 모든 모듈이 이동을 끝냈다고 확인된 마지막 셀
+        self.generation = 0               # show() 요청 순번
+        self.stale_before = 0             # 이 순번까지의 요청은 실패한 이동을 기준으로 계산됨
+        self.lock = threading.Lock()
+        self.stats = {'updates': 0, 'planned_hits': 0, 'failures': 0}
+
+    @property
+    def connected(self):
+        """연결된 모듈이 하나라도 있는지"""
+        return any(module.link is not None for module in self.modules)
+
+    # ---------------- 상태 ----------------
+
+    def default_state(self):
+        return (DEFAULT_STATE * (self.cell_count // len(DEFAULT_STATE) + 1))[:self.cell_count]
+
+    def fit(self, cells):
+        """셀 목록을 디스플레이 길이에 맞춤 (모자라면 빈 칸)"""
+        return (list(cells) + [BLANK_CELL] * self.cell_count)[:self.cell_count]
+
+    def current_state(self):
+        """현재 표시 중인 셀 (모르면 로그 파일, 그것도 없으면 기본값)"""
+        with self.lock:
+            if self.state:
+                return list(self.state)
+        try:
+            with open(self.translator.log_file_path, 'r', encoding='utf-8') as f:
+                loaded = f.read().split()
+        except OSError:
+            loaded = []
+        return self.fit(loaded) if loaded else self.default_state()
+
+    # ---------------- 표시 ----------------
+
+    def show(self, cells, planned=None, planned_from=None):
+        """
+        셀 표시 요청 (모든 모듈이 끝나면 완료되는 Future 반환)
+        planned: planned_from 상태에서 미리 계산한 이동량 - 현재 상태가 같을 때만 사용
+        """
+        target = self.fit(cells)
+        current = self.current_state()
+        if planned and planned_from is not None and self.fit(planned_from) == current \
+                and len(planned.split()) == self.cell_count:
+            transition = planned
+            self.stats['planned_hits'] += 1
+        else:
+            transition = self.translator.calculate_state_transition(current, target)
+        print(f"🔄 상태 전환: {transition}")
+
+        self.translator.log_to_file(self.translator.log_file_path, ' '.join(target))
+        self.translator.log_to_file(self.translator.change_log_path, transition)
+        with self.lock:
+            if self.confirmed_state is None:
+                self.confirmed_state = current
+            self.state = target   # 앞선 명령이 모두 끝나면 이 상태가 됨
+            self.stats['updates'] += 1
+            self.generation += 1
+            generation = self.generation
+        # 결과 반영(실패 시 되돌리기)까지 끝난 뒤 완료되는 Future를 반환
+        settled = Future()
+
+        def on_done(done):
+            self.settle(generation, target, done.result())
+            settled.set_result(done.result())
+
+        self.dispatch(transition).add_done_callback(on_done)
+        return settled
+
+    def settle(self, generation, target, success):
+        """
+        이동 결과 반영 (모든 모듈이 끝났을 때 호출)
+        실패하면 표시 상태와 로그를 마지막으로 확인된 상태로 되돌림 - 다음 이동량은 그 상태에서 계산
+        실패 전에 이미 보낸 요청은 틀린 상태를 기준으로 계산됐으므로 성공해도 확인된 상태로 보지 않음
+        """
+        with self.lock:
+            if success:
+                if generation > self.stale_before:
+                    self.confirmed_state = target
+                return
+            self.stats['failures'] += 1
+            self.stale_before = max(self.stale_before, self.generation)
+            self.state = list(self.confirmed_state)
+            rollback = self.state
+        print(f"⚠️ 점자 표시 실패 - 마지막 확인 상태로 되돌림: {' '.join(rollback)}")
+        self.translator.log_to_file(self.translator.log_file_path, ' '.join(rollback))
+
+    def dispatch(self, transition):
+        """이동량을 모듈별로 나눠 동시에 전송 (움직일 것이 없는 모듈은 건너뜀)"""
+        values = transition.split()
+        futures = []
+        for module in self.modules:
+            part = values[module.cells]
+            if not any(value not in ('0', '?') for value in part):
+                continue
+            outer = Future()
+            module.executor.submit(self.send_module, module, part, outer)
+            futures.append(outer)
+        return gather_futures(futures)
+
+    def send_module(self, module, part, outer):
+        """모듈 전송 스레드 (텍스트 방식은 이동이 끝날 때까지 막히므로 모듈마다 따로)"""
+        try:
+            inner = module.send(part)
+        except Exception as e:
+            print(f"❌ 점자 모듈 {module.name} 전송 오류: {e}")
+            outer.set_result(False)
+            return
+        inner.add_done_callback(lambda done: outer.set_result(done.result()))
+
+    # ---------------- 정리 / 통계 ----------------
+
+    def close(self):
+        for module in self.modules:
+            module.close()
+
+    def get_stats(self):
+        return dict(self.stats, cell_count=self.cell_count,
+                    modules={module.name: dict(module.stats) for module in self.modules})
+
+
+def build_display():
+    """설정된 모듈로 디스플레이 구성 (설정이 없으면 자동으로 찾은 모듈 하나)"""
+    from braille.braille_translator import BrailleTranslator
+
+    ports = configured_module_ports()
+    if not ports:
+        translator = BrailleTranslator()
+        module = BrailleModule(translator.serial_port.port if translator.serial_port else "auto",
+                               0, MOTOR_COUNT, translator.motor_link)
+        return BrailleDisplay(translator, [module])
+
+    translator = BrailleTranslator(connect=False)   # 연결은 모듈이 각자
+    modules = []
+    first_cell = 0
+    for port, cell_count in ports:
+        modules.append(BrailleModule(port, first_cell, cell_count))
+        first_cell += cell_count
+    # 모듈마다 아두이노 리셋 대기가 있으므로 동시에 연결
+    threads = [threading.Thread(target=module.connect) for module in modules]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    connected = sum(module.link is not None for module in modules)
+    print(f"📟 점자 디스플레이: 모듈 {connected}/{len(modules)}개, {first_cell}칸")
+    return BrailleDisplay(translator, modules)
+
+
+if __name__ == "__main__":
+    # 테스트 (연결 없이 모듈 나누기만)
+    print("점자 디스플레이 테스트")
+    print(f"  설정된 모듈: {configured_module_ports() or '없음 (자동 1개)'}")
+    test_modules = [BrailleModule("A", 0, 10), BrailleModule("B", 10, 6)]
+    test_display = BrailleDisplay(None, test_modules)
+    values = [str(n) for n in range(1, 17)]
+    for test_module in test_modules:
+        print(f"  {test_module.name}: {values[test_module.cells]}")
+    print(f"  기본 상태: {test_display.default_state()}")
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+점자 페이지 넘김
+- 한 번에 표시할 수 없는 긴 텍스트(동화, 답변, OCR 결과)를 페이지로 나눔 (단어 경계에서 나누고, 단어 사이는 빈 칸)
+- 한 페이지보다 긴 단어만 페이지 경계에서 자름
+- 한 페이지는 점자 디스플레이 전체 칸 수 (모듈이 여러 개면 더 긴 페이지를 한 번에 표시)
+- 텍스트를 열 때 전체 페이지와 페이지 사이 모터 이동량을 미리 계산
+- 조이스틱으로 다음 페이지를 요청하면 계획된 이동량을 바로 전송 (전송은 별도 스레드, 밀린 요청은 최신 것만)
+- 모듈별 모터 프로토콜 파이프라인에 넣고 바로 반환해 앞 페이지가 움직이는 동안 다음 페이지를 받아 둠
+- 초당 표시 셀 수(cells/sec) 기록
+"""
+
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+CELLS_PER_PAGE = 10           # 모듈 하나 (디스플레이에 연결되면 전체 칸 수 사용)
+BLANK_CELL = '88'
+
+
+def paginate_words(word_cells, cells_per_page=CELLS_PER_PAGE):
+    """
+    단어별 셀 목록 → 페이지 목록 (각 페이지는 정확히 cells_per_page칸, 남는 칸은 빈 칸)
+    단어가 현재 페이지에 들어가지 않으면 다음 페이지로 넘기고,
+    한 페이지보다 긴 단어는 페이지 단위로 잘라 이어 씁니다.
+    """
+    return paginate_words_indexed(word_cells, cells_per_page)[0]
+
+
+def paginate_words_indexed(word_cells, cells_per_page=CELLS_PER_PAGE):
+    """paginate_words + 단어마다 시작하는 페이지 번호 (음성에 맞춰 페이지를 넘길 때 사용)"""
+    pages = []
+    word_pages = []
+    current = []
+    for cells in word_cells:
+        if not cells:
+            word_pages.append(len(pages))
+            continue
+        needed = len(cells) + (1 if current else 0)
+        if current and len(current) + needed > cells_per_page:
+            pages.append(current)
+            current = []
+        if current:
+            current.append(BLANK_CELL)
+        if len(current) == cells_per_page:
+            pages.append(current)
+            current = []
+        word_pages.append(len(pages))
+        for cell in cells:
+            if len(current) == cells_per_page:
+                pages.append(current)
+                current = []
+            current.append(cell)
+    if current:
+        pages.append(current)
+    pages = [page + [BLANK_CELL] * (cells_per_page - len(page)) for page in pages]
+    return pages, [min(page, len(pages) - 1) for page in word_pages] if pages else []
+
+
+class BrailleDocument:
+    def __init__(self, text, pages, transitions, start_state, word_pages=None):
+        """
+        페이지로 나눈 텍스트 (transitions[i]: 이전 페이지(0번은 시작 상태) → i번 페이지 이동량)
+        word_pages[i]: 공백으로 나눈 i번째 단어가 시작하는 페이지
+        """
+        self.text = text
+        self.pages = pages
+        self.word_pages = word_pages or []
+        self.transitions = transitions
+        self.start_state = start_state
+        self.position = -1   # 아직 표시한 페이지 없음
+
+    def __len__(self):
+        return len(self.pages)
+
+    def previous_state(self, index):
+        return self.pages[index - 1] if index > 0 else self.start_state
+
+
+class BraillePager:
+    def __init__(self, display=None):
+        """점자 페이지 넘김 초기화 (점자 디스플레이 연결은 처음 표시할 때)"""
+        self.display = display
+        self.document = None
+        self.target_index = None      # 가장 최근에 요청된 페이지
+        self.last_motion_end = 0.0
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=1)   # 모터 전송 요청은 한 번에 하나씩
+        self.stats = {'pages': 0, 'cells': 0, 'motor_seconds': 0.0}
+
+    # ---------------- 디스플레이 ----------------
+
+    def get_display(self):
+        """점자 디스플레이 (모듈 연결은 프로그램 동안 한 번만)"""
+        if self.display is None:
+            from braille.braille_display import build_display
+            self.display = build_display()
+        return self.display
+
+    def get_translator(self):
+        return self.get_display().translator
+
+    @property
+    def cells_per_page(self):
+        return self.get_display().cell_count
+
+    # ---------------- 페이지 계산 ----------------
+
+    def paginate(self, text):
+        """텍스트 → (페이지 목록, 단어별 페이지 번호) (단어마다 따로 변환해 단어 경계를 유지)"""
+        translator = self.get_translator()
+        word_cells = [translator.braille_to_cells(translator.translate_text(word)) for word in text.split()]
+        return paginate_words_indexed(word_cells, self.cells_per_page)
+
+    def open_text(self, text, show_first=True):
+        """
+        텍스트를 열어 전체 페이지와 이동량을 미리 계산합니다.
+        show_first=True면 첫 페이지를 바로 표시 (백그라운드 전송)
+        """
+        start = time.time()
+        pages, word_pages = self.paginate(text)
+        if not pages:
+            print("ℹ️ 점자로 표시할 내용이 없습니다.")
+            return None
+
+        translator = self.get_translator()
+        start_state = self.get_display().current_state()
+        transitions = []
+        previous = start_state
+        for page in pages:
+            transitions.append(translator.calculate_state_transition(previous, page))
+            previous = page
+
+        document = BrailleDocument(text, pages, transitions, start_state, word_pages)
+        with self.lock:
+            self.document = document
+            self.target_index = None
+        print(f"📟 점자 {len(pages)}쪽 준비 ({len(text)}자, {(time.time() - start) * 1000:.0f}ms)")
+        if show_first:
+            self.go_to(0)
+        return document
+
+    # ---------------- 페이지 이동 ----------------
+
+    def go_to(self, index):
+        """페이지 표시 요청 (즉시 반환, 전송 완료 Future 반환)"""
+        with self.lock:
+            if not self.document or not 0 <= index < len(self.document):
+                return None
+            self.target_index = index
+        return self.executor.submit(self.refresh)
+
+    def next_page(self):
+        """다음 페이지 (마지막 페이지 다음은 처음으로)"""
+        with self.lock:
+            if not self.document:
+                print("ℹ️ 열린 점자 문서가 없습니다.")
+                return None
+            base = self.target_index if self.target_index is not None else self.document.position
+            index = (base + 1) % len(self.document)
+        if index == 0 and base >= 0:
+            print("📟 마지막 페이지 - 처음으로 돌아갑니다")
+        return self.go_to(index)
+
+    def previous_page(self):
+        with self.lock:
+            if not self.document:
+                return None
+            base = self.target_index if self.target_index is not None else self.document.position
+            index = max(0, base - 1)
+        return self.go_to(index)
+
+    def refresh(self):
+        """전송 스레드: 가장 최근에 요청된 페이지만 표시 (밀린 중간 페이지는 건너뜀)"""
+        with self.lock:
+            document, index = self.document, self.target_index
+        if document is None or index is None or index == document.position:
+            return False
+
+        # 계획한 이전 상태에서 넘어가면 미리 계산한 이동량 사용 (디스플레이가 현재 상태와 비교)
+        # 모든 모듈에 나눠 보내고 바로 반환 (이 페이지가 움직이는 동안 다음 페이지 요청을 받을 수 있음)
+        page = document.pages[index]
+        start = time.time()
+        motion = self.get_display().show(page, document.transitions[index], document.previous_state(index))
+        with self.lock:
+            document.position = index
+        motion.add_done_callback(lambda done: self.record_motion(document, index, page, start, done.result()))
+        return True
+
+    def record_motion(self, document, index, page, start, success):
+        """이동 완료 시 통계 기록 (앞 페이지가 끝나기를 기다린 시간은 빼고 계산)"""
+        now = time.time()
+        elapsed = now - max(start, self.last_motion_end)
+        self.last_motion_end = now
+        if not success:
+            print(f"⚠️ 점자 {index + 1}/{len(document)}쪽 모터 이동 실패")
+            return
+        with self.lock:
+            self.stats['pages'] += 1
+            self.stats['cells'] += sum(cell != BLANK_CELL for cell in page)
+            self.stats['motor_seconds'] += elapsed
+        print(f"📟 점자 {index + 1}/{len(document)}쪽 ({elapsed * 1000:.0f}ms, "
+              f"{self.cells_per_second():.1f} cells/s)")
+
+    # ---------------- 통계 ----------------
+
+    def cells_per_second(self):
+        """모터 전송 시간 기준 초당 표시한 글자 셀 수"""
+        seconds = self.stats['motor_seconds']
+        return self.stats['cells'] / seconds if seconds > 0 else 0.0
+
+    def get_stats(self):
+        with self.lock:
+            stats = dict(self.stats)
+            if self.display:
+                stats['planned_hits'] = self.display.stats['planned_hits']
+            stats['cells_per_second'] = self.cells_per_second()
+            if self.document:
+                stats['page'] = self.document.position + 1
+                stats['page_count'] = len(self.document)
+            return stats
+
+
+# 전역 점자 페이지 인스턴스
+braille_pager = BraillePager()
+
+# 편의 함수들
+def open_braille_text(text):
+    """긴 텍스트를 점자 페이지로 열고 첫 페이지 표시"""
+    try:
+        return braille_pager.open_text(text)
+    except Exception as e:
+        print(f"❌ 점자 페이지 준비 오류: {e}")
+        return None
+
+def next_braille_page():
+    """다음 점자 페이지 (조이스틱)"""
+    return braille_pager.next_page()
+
+def get_braille_display():
+    """페이지 넘김과 학습 기능이 함께 쓰는 점자 디스플레이"""
+    return braille_pager.get_display()
+
+if __name__ == "__main__":
+    # 테스트 (모터 없이 페이지 나누기만)
+    print("점자 페이지 넘김 테스트")
+    fake_words = [['11'] * 3, ['22'] * 4, ['33'] * 2, ['44'] * 12, ['55']]
+    for number, page in enumerate(paginate_words(fake_words), 1):
+        print(f"  {number}쪽: {' '.join(page)}")
@@ -7,15 +7,19 @@ import serial
 import time
 import glob
 
+from braille.motor_protocol import MotorLink
+
 class BrailleTranslator:
-    def __init__(self):
+    def __init__(self, connect=True):
         # 로그 파일 경로를 현재 프로젝트로 변경
         self.log_file_path = '/home/drboom/py_project/hanium_snowdream/braille_log/log.txt'
         self.change_log_path = '/home/drboom/py_project/hanium_snowdream/braille_log/braille_log_change.txt'
 
         # 시리얼 통신 설정 - 동적 검색 방식 사용
         self.serial_port = None
-        self.init_serial_connection()
+        self.motor_link = None
+        if connect:  # 커리큘럼 컴파일처럼 변환만 할 때는 아두이노에 연결하지 않음
+            self.init_serial_connection()
 
         # 상태이동의 기준이 되는 전체 순서
         self.sequence = [
@@ -90,6 +94,10 @@ class BrailleTranslator:
                 self.serial_port.reset_input_buffer()
                 
                 print("✅ 점자 모터 Arduino 연결 성공!")
+
+                # 바이너리 프로토콜 지원 여부 확인 (미지원이면 텍스트 명령)
+                self.motor_link = MotorLink(self.serial_port)
+                self.motor_link.negotiate()
             else:
                 print("❌ 점자 모터 Arduino 연결 실패")
                 print("USB 포트를 확인하거나 Arduino를 연결해주세요.")
@@ -134,7 +142,8 @@ class BrailleTranslator:
                 result += self.english_braille.get(char, '')
         return result
 
-    def convert_braille_to_number(self, braille_text):
+    def braille_to_cells(self, braille_text):
+        """점자 문자열 → 셀 번호 목록 (길이 제한 없음, 페이지 나누기용)"""
         numbers = []
         for char in braille_text:
             # NUMBER_SIGN과 CAPITAL_SIGN은 제어 문자이므로 제외
@@ -142,7 +151,10 @@ class BrailleTranslator:
                 continue
             number = self.braille_char_to_number_map.get(char)
             if number: numbers.append(number)
-        return numbers[:10]
+        return numbers
+
+    def convert_braille_to_number(self, braille_text):
+        return self.braille_to_cells(braille_text)[:10]
 
     def calculate_state_transition(self, current_state, target_state):
         transitions = []
@@ -167,69 +179,6 @@ class BrailleTranslator:
                 transitions.append('?')
         return " ".join(transitions)
 
-    def send_motor_commands(self, transitions):
-        """아두이노에 모터 제어 명령을 전송"""
-        print(f"[DEBUG] send_motor_commands 시작")
-        print(f"[DEBUG] transitions 입력값: '{transitions}'")
-        
-        if not self.serial_port or not self.serial_port.is_open:
-            print("[ERROR] Arduino가 연결되지 않았습니다.")
-            return
-        
-        print(f"[DEBUG] 시리얼 포트 상태: {self.serial_port.is_open}")
-        
-        try:
-            # 전환값을 공백으로 분리
-            values = transitions.split()
-            print(f"[DEBUG] 파싱된 values: {values}")
-            print(f"[DEBUG] values 개수: {len(values)}")
-            
-            # 10개 모터에 대한 명령 생성
-            commands = []
-            for i in range(min(10, len(values))):
-                try:
-                    value = int(values[i])
-                    # 1 = 1/8바퀴 = 256 스텝
-                    steps = abs(value) * 256
-                    direction = 1 if value >= 0 else 0
-                    command = f"M{i+1}:{steps}:{direction}"
-                    commands.append(command)
-                    print(f"[DEBUG] 모터{i+1}: value={value}, steps={steps}, direction={direction}")
-                except ValueError:
-                    print(f"[ERROR] 잘못된 값: {values[i]}")
-            
-            print(f"[DEBUG] 생성된 commands: {commands}")
-            
-            # 명령들을 하나의 문자열로 결합
-            full_command = " ".join(commands) + "\n"
-            print(f"[DEBUG] 최종 명령: '{full_command.strip()}'")
-            print(f"[DEBUG] 명령 길이: {len(full_command)} bytes")
-            
-            # 아두이노에 전송
-            print(f"[DEBUG] 아두이노에 전송 시작...")
-            bytes_sent = self.serial_port.write(full_command.encode())
-            print(f"[DEBUG] 전송된 바이트: {bytes_sent}")
-            self.serial_port.flush()  # 버퍼 비우기
-            print(f"[DEBUG] 전송 완료, 응답 대기 중...")
-            
-            # 아두이노로부터 응답 대기 (타임아웃 15초로 증가 - 모터 동작 시간 고려)
-            self.serial_port.timeout = 15
-            response = self.serial_port.readline().decode().strip()
-            print(f"[DEBUG] 원시 응답: '{response}'")
-            
-            if response:
-                print(f"[SUCCESS] 아두이노 응답: {response}")
-            else:
-                print(f"[WARNING] 아두이노로부터 응답이 없습니다")
-                
-            # 아두이노가 처리할 시간 주기
-            time.sleep(0.5)
-            
-        except Exception as e:
-            print(f"[ERROR] 모터 제어 중 오류: {e}")
-            import traceback
-            traceback.print_exc()
-
     def log_to_file(self, file_path, text_to_log):
         try:
             os.makedirs(os.path.dirname(file_path), exist_ok=True)
@@ -240,6 +189,8 @@ class BrailleTranslator:
 
     def close_connection(self):
         """시리얼 연결 종료"""
+        if self.motor_link:
+            self.motor_link.close()
         if self.serial_port and self.serial_port.is_open:
             self.serial_port.close()
             print("점자 모터 연결 종료")
\ No newline at end of file
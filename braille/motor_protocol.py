@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+점자 모터 바이너리 프로토콜
+- 프레임: 동기 바이트(AA 55) | 버전 | 종류 | 순번 | 길이 | 내용 | CRC-16 (CCITT, 버전~내용)
+- 이동 프레임 내용: 움직일 모터 비트마스크(2바이트) + 모터마다 부호 있는 스텝 수(2바이트)
+- 아두이노는 프레임마다 ACK(받음) / NAK(오류 코드) / DONE(이동 끝)을 같은 순번으로 응답
+- 파이프라인: 앞 프레임이 움직이는 동안 다음 프레임을 미리 보내 둠 (최대 PIPELINE_DEPTH개)
+- 이동량은 상대값이라 같은 프레임을 두 번 실행하면 모터가 두 번 움직임
+  → ACK가 오지 않아 다시 보낼 때는 아두이노가 중복 순번을 걸러야 함
+    (최근에 받은 순번이 다시 오면 실행하지 않고 ACK(이미 끝났으면 DONE도)만 다시 보냄)
+  → 아두이노가 HELLO 응답에서 CAPABILITY_DEDUP을 알릴 때만 ACK 시간 초과 재전송, 아니면 실패 처리
+  → NAK(CRC 오류 / 대기열 가득 참)는 실행하지 않은 프레임이므로 항상 다시 보냄
+- 연결할 때 HELLO에 응답이 없으면 예전 텍스트 형식(M1:256:1 ...)으로 동작
+"""
+
+import time
+import struct
+import threading
+from concurrent.futures import Future
+
+SYNC = b'\xaa\x55'
+PROTOCOL_VERSION = 1
+HEADER_SIZE = 6                # 동기 2 + 버전 + 종류 + 순번 + 길이
+MAX_PAYLOAD = 255
+STEPS_PER_UNIT = 256           # 이동량 1 = 1/8바퀴 = 256 스텝
+MOTOR_COUNT = 10
+PIPELINE_DEPTH = 2             # 실행 중 1개 + 대기 1개
+HANDSHAKE_TIMEOUT = 0.5
+ACK_TIMEOUT = 0.5              # 받음 응답 대기 (넘으면 다시 보냄)
+DONE_TIMEOUT = 15              # 이동 완료 대기 (텍스트 방식 응답 대기와 같음)
+MAX_RETRIES = 2
+
+# HELLO 응답 내용: 버전 | 받아 둘 수 있는 프레임 수 | 기능 비트
+CAPABILITY_DEDUP = 0x01        # 중복 순번 프레임을 다시 실행하지 않음 (ACK 시간 초과 재전송 허용)
+
+# 프레임 종류
+FRAME_MOVE = 0x01
+FRAME_HELLO = 0x02
+FRAME_ACK = 0x81
+FRAME_NAK = 0x82
+FRAME_DONE = 0x83
+
+# 오류 코드 (NAK / DONE 내용)
+ERROR_OK = 0
+ERROR_BAD_CRC = 1
+ERROR_BAD_VERSION = 2
+ERROR_BAD_LENGTH = 3
+ERROR_QUEUE_FULL = 4
+ERROR_MOTOR_FAULT = 5
+ERROR_UNKNOWN_TYPE = 6
+ERROR_TIMEOUT = 0xff           # 호스트 쪽 시간 초과 (아두이노가 보내지 않음)
+ERROR_NAMES = {
+    ERROR_OK: "정상", ERROR_BAD_CRC: "CRC 오류", ERROR_BAD_VERSION: "버전 불일치",
+    ERROR_BAD_LENGTH: "길이 오류", ERROR_QUEUE_FULL: "대기열 가득 참", ERROR_MOTOR_FAULT: "모터 이상",
+    ERROR_UNKNOWN_TYPE: "알 수 없는 프레임", ERROR_TIMEOUT: "응답 없음",
+}
+RETRYABLE_ERRORS = (ERROR_BAD_CRC, ERROR_QUEUE_FULL)
+
+
+def _crc_table():
+    table = []
+    for byte in range(256):
+        crc = byte << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x1021) if crc & 0x8000 else (crc << 1)
+        table.append(crc & 0xffff)
+    return table
+
+CRC_TABLE = _crc_table()
+
+
+def crc16(data, crc=0xffff):
+    """CRC-16/CCITT-FALSE"""
+    for byte in data:
+        crc = ((crc << 8) & 0xffff) ^ CRC_TABLE[((crc >> 8) ^ byte) & 0xff]
+    return crc
+
+
+# ===================================================================
+#                         ENCODER / DECODER
+# ===================================================================
+
+def parse_transitions(transitions, motor_count=MOTOR_COUNT):
+    """이동량 문자열("3 -2 0 ...") → 정수 목록 (잘못된 값('?')은 0으로)"""
+    values = []
+    for token in transitions.split()[:motor_count]:
+        try:
+            values.append(int(token))
+        except ValueError:
+            print(f"⚠️ 잘못된 이동량: {token}")
+            values.append(0)
+    return values
+
+
+def encode_frame(frame_type, sequence, payload=b''):
+    """프레임 인코딩"""
+    if len(payload) > MAX_PAYLOAD:
+        raise ValueError(f"payload too long: {len(payload)}")
+    body = bytes([PROTOCOL_VERSION, frame_type, sequence & 0xff, len(payload)]) + payload
+    return SYNC + body + struct.pack('<H', crc16(body))
+
+
+def encode_move(values, sequence):
+    """모터별 이동량 → 이동 프레임 (움직이지 않는 모터는 비트마스크에서 빠짐)"""
+    mask = 0
+    steps = b''
+    for motor, value in enumerate(values):
+        if value:
+            mask |= 1 << motor
+            steps += struct.pack('<h', value * STEPS_PER_UNIT)
+    return encode_frame(FRAME_MOVE, sequence, struct.pack('<H', mask) + steps)
+
+
+def decode_move(payload, motor_count=MOTOR_COUNT):
+    """이동 프레임 내용 → 모터별 스텝 수 목록"""
+    mask, = struct.unpack_from('<H', payload)
+    steps = [0] * motor_count
+    offset = 2
+    for motor in range(motor_count):
+        if mask & (1 << motor):
+            steps[motor], = struct.unpack_from('<h', payload, offset)
+            offset += 2
+    return steps
+
+
+def encode_text_command(values):
+    """예전 텍스트 형식 명령 (M1:256:1 M2:512:0 ...)"""
+    commands = [f"M{motor + 1}:{abs(value) * STEPS_PER_UNIT}:{1 if value >= 0 else 0}"
+                for motor, value in enumerate(values)]
+    return " ".join(commands) + "\n"
+
+
+class FrameDecoder:
+    def __init__(self):
+        """수신 바이트 → 프레임 (동기 바이트로 다시 맞추고 CRC가 틀린 프레임은 버림)"""
+        self.buffer = bytearray()
+        self.crc_errors = 0
+
+    def feed(self, data):
+        """받은 바이트를 넣고 완성된 프레임 [(종류, 순번, 내용), ...] 반환"""
+        self.buffer.extend(data)
+        frames = []
+        while True:
+            start = self.buffer.find(SYNC)
+            if start < 0:
+                # 동기 바이트 앞부분(AA)만 남겨 둠
+                del self.buffer[:max(0, len(self.buffer) - 1)]
+                return frames
+            del self.buffer[:start]
+            if len(self.buffer) < HEADER_SIZE:
+                return frames
+            length = self.buffer[5]
+            total = HEADER_SIZE + length + 2
+            if len(self.buffer) < total:
+                return frames
+            body = bytes(self.buffer[2:HEADER_SIZE + length])
+            received_crc, = struct.unpack_from('<H', self.buffer, HEADER_SIZE + length)
+            if received_crc != crc16(body) or body[0] != PROTOCOL_VERSION:
+                # 잘못된 동기 위치일 수 있으므로 한 바이트만 넘기고 다시 찾음
+                self.crc_errors += 1
+                del self.buffer[:1]
+                continue
+            del self.buffer[:total]
+            frames.append((body[1], body[2], body[4:]))
+
+
+# ===================================================================
+#                              LINK
+# ===================================================================
+
+class PendingFrame:
+    def __init__(self, sequence, frame):
+        self.sequence = sequence
+        self.frame = frame
+        self.future = Future()
+        self.sent_at = time.time()
+        self.acked_at = None
+        self.retries = 0
+
+
+class MotorLink:
+    def __init__(self, serial_port, pipeline_depth=PIPELINE_DEPTH):
+        """점자 모터 시리얼 연결 위의 명령 전송 (바이너리 / 텍스트)"""
+        self.serial_port = serial_port
+        self.pipeline_depth = pipeline_depth
+        self.mode = 'text'
+        self.dedup = False                       # 아두이노가 중복 순번을 거르는지 (재전송 가능 여부)
+        self.sequence = 0
+        self.decoder = FrameDecoder()
+        self.pending = {}                        # 순번 → PendingFrame
+        self.lock = threading.Lock()
+        self.write_lock = threading.Lock()
+        self.window = threading.Semaphore(pipeline_depth)
+        self.reader = None
+        self.running = False
+        self.stats = {'frames': 0, 'bytes': 0, 'retries': 0, 'naks': 0, 'timeouts': 0}
+
+    # ---------------- 연결 ----------------
+
+    def negotiate(self):
+        """HELLO 프레임으로 바이너리 프로토콜 확인 (응답 없으면 텍스트 방식)"""
+        try:
+            self.serial_port.reset_input_buffer()
+            self.serial_port.write(encode_frame(FRAME_HELLO, 0, bytes([PROTOCOL_VERSION])))
+            self.serial_port.flush()
+            previous_timeout = self.serial_port.timeout
+            self.serial_port.timeout = 0.05
+            deadline = time.time() + HANDSHAKE_TIMEOUT
+            reply = None
+            while reply is None and time.time() < deadline:
+                for frame_type, _, payload in self.decoder.feed(self.serial_port.read(64)):
+                    if frame_type == FRAME_ACK and payload and payload[0] == PROTOCOL_VERSION:
+                        reply = payload
+            self.serial_port.timeout = previous_timeout
+        except Exception as e:
+            print(f"⚠️ 점자 모터 프로토콜 확인 실패: {e}")
+            reply = None
+
+        if reply is None:
+            # 텍스트 펌웨어가 HELLO 바이트를 한 줄로 읽도록 줄을 끝내고 응답은 버림
+            try:
+                self.serial_port.write(b'\n')
+                time.sleep(0.1)
+                self.serial_port.reset_input_buffer()
+            except Exception:
+                pass
+            self.mode = 'text'
+            print("ℹ️ 점자 모터: 텍스트 명령 방식 (바이너리 프로토콜 미지원 펌웨어)")
+            return False
+
+        # 아두이노가 받아 둘 수 있는 프레임 수에 맞춤
+        if len(reply) > 1 and reply[1]:
+            self.pipeline_depth = min(self.pipeline_depth, reply[1])
+            self.window = threading.Semaphore(self.pipeline_depth)
+        self.dedup = len(reply) > 2 and bool(reply[2] & CAPABILITY_DEDUP)
+        if not self.dedup:
+            print("⚠️ 점자 모터: 중복 순번 확인 미지원 펌웨어 - ACK 시간 초과 시 다시 보내지 않음")
+        self.mode = 'binary'
+        self.running = True
+        self.reader = threading.Thread(target=self.reader_loop, daemon=True)
+        self.reader.start()
+        print(f"✅ 점자 모터: 바이너리 프로토콜 v{PROTOCOL_VERSION} (파이프라인 {self.pipeline_depth})")
+        return True
+
+    def close(self):
+        self.running = False
+        with self.lock:
+            pending, self.pending = list(self.pending.values()), {}
+        for entry in pending:
+            self.resolve(entry, False)
+
+    # ---------------- 전송 ----------------
+
+    def send(self, transitions):
+        """
+        이동량 전송 (Future 반환, 이동이 끝나면 True / 실패하면 False)
+        바이너리 방식은 파이프라인에 자리가 날 때까지만 기다리고 바로 반환합니다.
+        """
+        values = parse_transitions(transitions)
+        if self.mode != 'binary':
+            future = Future()
+            future.set_result(self.send_text(values))
+            return future
+
+        if not self.window.acquire(timeout=DONE_TIMEOUT):
+            print("❌ 점자 모터 파이프라인이 비지 않습니다")
+            future = Future()
+            future.set_result(False)
+            return future
+        with self.lock:
+            sequence = self.sequence
+            self.sequence = (self.sequence + 1) & 0xff
+            entry = PendingFrame(sequence, encode_move(values, sequence))
+            self.pending[sequence] = entry
+        self.write(entry)
+        return entry.future
+
+    def write(self, entry):
+        with self.write_lock:
+            self.serial_port.write(entry.frame)
+            self.serial_port.flush()
+        entry.sent_at = time.time()
+        self.stats['frames'] += 1
+        self.stats['bytes'] += len(entry.frame)
+
+    def send_text(self, values):
+        """예전 텍스트 명령: 한 줄 전송 후 응답 한 줄 대기"""
+        command = encode_text_command(values)
+        self.serial_port.write(command.encode())
+        self.serial_port.flush()
+        self.stats['frames'] += 1
+        self.stats['bytes'] += len(command)
+
+        # 모터 동작 시간을 고려해 응답 대기 15초
+        self.serial_port.timeout = DONE_TIMEOUT
+        response = self.serial_port.readline().decode(errors='replace').strip()
+        if response:
+            print(f"[SUCCESS] 아두이노 응답: {response}")
+        else:
+            print(f"[WARNING] 아두이노로부터 응답이 없습니다")
+        # 아두이노가 처리할 시간 주기
+        time.sleep(0.5)
+        return bool(response)
+
+    # ---------------- 수신 ----------------
+
+    def reader_loop(self):
+        """응답 프레임 처리 + 시간 초과 프레임 재전송"""
+        self.serial_port.timeout = 0.05
+        while self.running:
+            try:
+                data = self.serial_port.read(64)
+            except Exception as e:
+                print(f"❌ 점자 모터 수신 오류: {e}")
+                self.close()
+                return
+            for frame_type, sequence, payload in self.decoder.feed(data):
+                self.handle_frame(frame_type, sequence, payload)
+            self.check_timeouts()
+
+    def handle_frame(self, frame_type, sequence, payload):
+        with self.lock:
+            entry = self.pending.get(sequence)
+        if entry is None:
+            return
+        code = payload[0] if payload else ERROR_OK
+        if frame_type == FRAME_ACK:
+            entry.acked_at = time.time()
+        elif frame_type == FRAME_DONE:
+            if code != ERROR_OK:
+                print(f"❌ 점자 모터 프레임 {sequence}: {ERROR_NAMES.get(code, code)}")
+            self.resolve(entry, code == ERROR_OK)
+        elif frame_type == FRAME_NAK:
+            self.stats['naks'] += 1
+            self.retry_or_fail(entry, code)
+
+    def check_timeouts(self):
+        now = time.time()
+        with self.lock:
+            entries = list(self.pending.values())
+        for entry in entries:
+            if entry.acked_at is None and now - entry.sent_at > ACK_TIMEOUT:
+                self.retry_or_fail(entry, ERROR_TIMEOUT)
+            elif entry.acked_at is not None and now - entry.acked_at > DONE_TIMEOUT:
+                self.stats['timeouts'] += 1
+                print(f"❌ 점자 모터 프레임 {entry.sequence}: 이동 완료 응답 없음")
+                self.resolve(entry, False)
+
+    def retry_or_fail(self, entry, code):
+        """
+        NAK는 실행하지 않은 프레임이라 다시 보내도 안전
+        ACK 시간 초과는 아두이노가 받아 실행했을 수도 있으므로 중복 순번을 거르는 펌웨어일 때만 다시 보냄
+        """
+        retryable = code in RETRYABLE_ERRORS or (code == ERROR_TIMEOUT and self.dedup)
+        if retryable and entry.retries < MAX_RETRIES:
+            entry.retries += 1
+            self.stats['retries'] += 1
+            self.write(entry)
+            return
+        if code == ERROR_TIMEOUT:
+            self.stats['timeouts'] += 1
+        print(f"❌ 점자 모터 프레임 {entry.sequence}: {ERROR_NAMES.get(code, code)}")
+        self.resolve(entry, False)
+
+    def resolve(self, entry, success):
+        with self.lock:
+            removed = self.pending.pop(entry.sequence, None) is entry
+        if removed:
+            self.window.release()
+        if not entry.future.done():
+            entry.future.set_result(success)
+
+    def get_stats(self):
+        with self.lock:
+            return dict(self.stats, mode=self.mode, in_flight=len(self.pending))
+
+
+if __name__ == "__main__":
+    # 테스트 (시리얼 없이 인코딩 / 디코딩만)
+    print("점자 모터 프로토콜 테스트")
+    values = parse_transitions("3 -2 0 0 36 -36 1 0 0 5")
+    frame = encode_move(values, 7)
+    print(f"  바이너리: {len(frame)}바이트 {frame.hex()}")
+    print(f"  텍스트: {len(encode_text_command(values))}바이트")
+    decoder = FrameDecoder()
+    frames = decoder.feed(b'\x00garbage' + frame[:5]) + decoder.feed(frame[5:])
+    for frame_type, sequence, payload in frames:
+        print(f"  디코딩: 종류={frame_type:#x} 순번={sequence} 스텝={decode_move(payload)}")
@@ -2,8 +2,10 @@ import serial
 import time
 import glob
 import os
+import threading
 
 BAUD_RATE = 9600
+RELAY_POLL_INTERVAL = 0.05  # 기능 실행 중 신호 확인 간격
 
 def find_available_ports():
     """사용 가능한 시리얼 포트를 찾습니다."""
@@ -186,4 +188,44 @@ def close_connection(ser):
     시리얼 연결을 안전하게 종료합니다.
     """
     if ser and ser.is_open:
-        ser.close()
\ No newline at end of file
+        ser.close()
+
+class SignalRelay:
+    """
+    기능 실행 중(메인 루프가 막혀 있는 동안)에도 조이스틱 신호를 읽는 스레드
+    - handler(signal)가 True를 반환하면 바로 처리된 신호로 보고 아두이노 플래그 리셋
+    - 처리하지 않은 신호는 모아 두었다가 stop()으로 돌려줌 (기능이 끝난 뒤 메인 루프가 순서대로 처리)
+    """
+    def __init__(self, ser, handler):
+        self.ser = ser
+        self.handler = handler
+        self.deferred = []
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        return self
+
+    def run(self):
+        while not self.stop_event.is_set():
+            signal = read_signal(self.ser)
+            if signal:
+                try:
+                    handled = self.handler(signal)
+                except Exception as e:
+                    print(f"[DEBUG] 실행 중 신호 처리 오류: {e}")
+                    handled = False
+                if handled:
+                    send_signal(self.ser)  # 다음 입력을 받을 수 있게 플래그 리셋
+                else:
+                    self.deferred.append(signal)
+            self.stop_event.wait(RELAY_POLL_INTERVAL)
+
+    def stop(self):
+        """읽기 스레드 종료 후 처리하지 않은 신호 목록 반환"""
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join()
+        return self.deferred
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+TTS 합성 후처리
+- GPT-SoVITS 출력 앞뒤의 무음을 지정한 여유만 남기고 잘라냄
+- pygame 믹서의 기본 샘플레이트/채널/16비트 형식으로 미리 변환 (재생 시 리샘플링 제거)
+- 선택적으로 음량 정규화 (RMS 목표 + 피크 제한)
+- 클립마다 줄어든 재생 시간(초)을 기록
+모든 처리는 NumPy 벡터 연산으로 수행합니다.
+"""
+
+import os
+import json
+import time
+import wave
+import threading
+import numpy as np
+
+SILENCE_THRESHOLD_DB = -45.0   # 이보다 작은 구간은 무음으로 봄 (dBFS, 10ms RMS 기준)
+SILENCE_MARGIN_MS = 80         # 잘라낸 뒤 앞뒤에 남길 여유
+ANALYSIS_WINDOW_MS = 10        # 무음 판정 창 길이
+NORMALIZE_LOUDNESS = False     # True면 RMS를 TARGET_RMS_DB로 맞춤
+TARGET_RMS_DB = -20.0
+PEAK_LIMIT = 0.97
+DEFAULT_MIXER_FORMAT = (44100, 2)   # 믹서가 초기화되지 않았을 때 (샘플레이트, 채널)
+STATS_PATH = "/home/drboom/py_project/hanium_snowdream/telemetry/audio_postprocess.json"
+MAX_STATS_ENTRIES = 500
+
+
+# ===================================================================
+#                         AUDIO ARRAY HELPERS
+# ===================================================================
+
+def read_wav(path):
+    """WAV → (float32 배열 [프레임, 채널], 샘플레이트), -1.0 ~ 1.0 범위"""
+    with wave.open(str(path), 'rb') as wf:
+        rate = wf.getframerate()
+        channels = wf.getnchannels()
+        width = wf.getsampwidth()
+        raw = wf.readframes(wf.getnframes())
+
+    if width == 1:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128) / 128
+    elif width == 2:
+        samples = np.frombuffer(raw, dtype='<i2').astype(np.float32) / 32768
+    elif width == 3:
+        # 24비트: 3바이트씩 묶어 부호 있는 32비트로 확장
+        triples = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        values = triples[:, 0] | (triples[:, 1] << 8) | (triples[:, 2] << 16)
+        values = np.where(values >= 1 << 23, values - (1 << 24), values)
+        samples = values.astype(np.float32) / (1 << 23)
+    elif width == 4:
+        samples = np.frombuffer(raw, dtype='<i4').astype(np.float32) / 2**31
+    else:
+        raise ValueError(f"지원하지 않는 샘플 크기: {width}")
+    return samples.reshape(-1, channels), rate
+
+def write_wav(path, samples, rate, sample_width=2):
+    """float32 배열 → 16비트(기본) PCM WAV"""
+    samples = np.clip(samples, -1.0, 1.0)
+    if sample_width == 2:
+        data = (samples * 32767).astype('<i2')
+    elif sample_width == 1:
+        data = (samples * 127 + 128).astype(np.uint8)
+    else:
+        data = (samples * (2**31 - 1)).astype('<i4')
+    temp_path = str(path) + ".tmp"
+    with wave.open(temp_path, 'wb') as wf:
+        wf.setnchannels(samples.shape[1])
+        wf.setsampwidth(sample_width)
+        wf.setframerate(rate)
+        wf.writeframes(data.tobytes())
+    os.replace(temp_path, str(path))
+
+def convert_format(samples, rate, target_rate, target_channels):
+    """채널 수와 샘플레이트를 맞춤 (선형 보간 리샘플링)"""
+    if samples.shape[1] != target_channels:
+        mono = samples.mean(axis=1, keepdims=True)
+        samples = np.repeat(mono, target_channels, axis=1)
+
+    if rate != target_rate and len(samples):
+        length = int(round(len(samples) * target_rate / rate))
+        source_positions = np.arange(len(samples))
+        target_positions = np.linspace(0, len(samples) - 1, length)
+        samples = np.stack([np.interp(target_positions, source_positions, samples[:, c])
+                            for c in range(samples.shape[1])], axis=1).astype(np.float32)
+    return samples
+
+def trim_silence(samples, rate, threshold_db=SILENCE_THRESHOLD_DB, margin_ms=SILENCE_MARGIN_MS):
+    """앞뒤 무음을 잘라내고 margin_ms만 남김 (창 단위 RMS로 판정)"""
+    window = max(1, int(rate * ANALYSIS_WINDOW_MS / 1000))
+    count = len(samples) // window
+    if count == 0:
+        return samples
+
+    # [창 개수, 창 길이, 채널] 형태로 묶어 창별 RMS를 한 번에 계산
+    frames = samples[:count * window].reshape(count, window, -1)
+    rms = np.sqrt(np.mean(frames ** 2, axis=(1, 2)))
+    active = np.flatnonzero(rms > 10 ** (threshold_db / 20))
+    if len(active) == 0:
+        return samples[:0]
+
+    margin = int(rate * margin_ms / 1000)
+    start = max(0, active[0] * window - margin)
+    end = min(len(samples), (active[-1] + 1) * window + margin)
+    return samples[start:end]
+
+def normalize_loudness(samples, target_db=TARGET_RMS_DB, peak_limit=PEAK_LIMIT):
+    """RMS를 목표 음량으로 맞추되 피크가 peak_limit을 넘지 않게 제한"""
+    if not len(samples):
+        return samples
+    rms = float(np.sqrt(np.mean(samples ** 2)))
+    peak = float(np.max(np.abs(samples)))
+    if rms == 0 or peak == 0:
+        return samples
+    gain = min(10 ** (target_db / 20) / rms, peak_limit / peak)
+    return samples * gain
+
+def mixer_format():
+    """pygame 믹서의 (샘플레이트, 채널) (초기화 전이면 기본값)"""
+    try:
+        import pygame
+        init = pygame.mixer.get_init()
+    except ImportError:
+        init = None
+    if not init:
+        return DEFAULT_MIXER_FORMAT
+    return init[0], init[2]
+
+
+# ===================================================================
+#                           POST PROCESSOR
+# ===================================================================
+
+class AudioPostProcessor:
+    def __init__(self, stats_path=STATS_PATH, normalize=NORMALIZE_LOUDNESS):
+        """후처리기 초기화 (누적 통계 로드)"""
+        self.stats_path = stats_path
+        self.normalize = normalize
+        self.lock = threading.Lock()
+        self.stats = {'clips': 0, 'saved_seconds': 0.0, 'recent': []}
+        try:
+            with open(stats_path, 'r', encoding='utf-8') as f:
+                self.stats.update(json.load(f))
+        except (OSError, ValueError):
+            pass
+
+    def process(self, wav_path):
+        """
+        합성된 WAV를 제자리에서 후처리합니다.
+        반환값: 줄어든 재생 시간(초), 실패하면 None (원본은 그대로 둠)
+        """
+        start = time.time()
+        try:
+            samples, rate = read_wav(wav_path)
+        except (OSError, EOFError, ValueError, wave.Error) as e:
+            print(f"⚠️ 후처리용 WAV 읽기 실패: {e}")
+            return None
+
+        original_seconds = len(samples) / rate
+        target_rate, target_channels = mixer_format()
+        samples = trim_silence(samples, rate)
+        if not len(samples):
+            print(f"⚠️ 전부 무음인 클립 - 후처리 건너뜀: {os.path.basename(str(wav_path))}")
+            return None
+        samples = convert_format(samples, rate, target_rate, target_channels)
+        if self.normalize:
+            samples = normalize_loudness(samples)
+        write_wav(wav_path, samples, target_rate)
+
+        new_seconds = len(samples) / target_rate
+        saved = original_seconds - new_seconds
+        print(f"✂️ 무음 {saved:.2f}초 제거 ({rate}Hz → {target_rate}Hz, "
+              f"{(time.time() - start) * 1000:.0f}ms): {os.path.basename(str(wav_path))}")
+        self.record(wav_path, original_seconds, new_seconds, rate, target_rate)
+        return saved
+
+    def record(self, wav_path, original_seconds, new_seconds, source_rate, target_rate):
+        """클립별 절약 시간 기록 (최근 MAX_STATS_ENTRIES개 + 누적 합계)"""
+        with self.lock:
+            self.stats['clips'] += 1
+            self.stats['saved_seconds'] += original_seconds - new_seconds
+            self.stats['recent'].append({
+                'file': os.path.basename(str(wav_path)),
+                'time': time.time(),
+                'original_seconds': round(original_seconds, 3),
+                'trimmed_seconds': round(new_seconds, 3),
+                'saved_seconds': round(original_seconds - new_seconds, 3),
+                'source_rate': source_rate,
+                'target_rate': target_rate,
+            })
+            del self.stats['recent'][:-MAX_STATS_ENTRIES]
+            try:
+                os.makedirs(os.path.dirname(self.stats_path), exist_ok=True)
+                with open(self.stats_path, 'w', encoding='utf-8') as f:
+                    json.dump(self.stats, f, ensure_ascii=False, indent=2)
+            except OSError as e:
+                print(f"⚠️ 후처리 통계 저장 실패: {e}")
+
+    def summary(self):
+        """누적 절약 시간 요약"""
+        with self.lock:
+            clips = self.stats['clips']
+            return {
+                'clips': clips,
+                'saved_seconds': self.stats['saved_seconds'],
+                'average_saved_seconds': self.stats['saved_seconds'] / clips if clips else None
+            }
+
+
+# 전역 후처리기 인스턴스
+audio_postprocessor = AudioPostProcessor()
+
+# 편의 함수들
+def postprocess_tts_output(wav_path):
+    """TTS 합성 직후 호출: 무음 제거 + 믹서 형식 변환 (실패해도 원본 유지)"""
+    try:
+        return audio_postprocessor.process(wav_path)
+    except Exception as e:
+        print(f"⚠️ 음성 후처리 오류: {e}")
+        return None
+
+def get_postprocess_summary():
+    """누적 절약 재생 시간"""
+    return audio_postprocessor.summary()
+
+if __name__ == "__main__":
+    # 테스트
+    print("TTS 후처리 테스트")
+    test_rate = 32000
+    silence = np.zeros((test_rate // 2, 1), dtype=np.float32)
+    tone = 0.3 * np.sin(np.linspace(0, 880 * np.pi, test_rate, dtype=np.float32))[:, None]
+    test_path = "/tmp/postprocess_test.wav"
+    write_wav(test_path, np.concatenate([silence, tone, silence]), test_rate)
+    processor = AudioPostProcessor(stats_path="/tmp/postprocess_stats.json")
+    print(f"절약: {processor.process(test_path):.2f}초, 요약: {processor.summary()}")
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+압축 음성 저장소
+- 캐시된 음성을 분류(동화 / 안내 / TTS 캐시 / 조각)별로 WAV, FLAC, Opus 중 하나로 보관
+- 합성은 계속 WAV로 하고, 유휴 시간에 분류별 코덱으로 압축한 뒤 WAV는 삭제
+- 조회는 확장자와 무관하게 실제 있는 파일을 찾아 줌 (resolve_audio)
+- 재생은 pygame(SDL_mixer)이 FLAC/Opus를 직접 스트리밍 디코딩 → 임시 WAV 없음
+- NumPy 처리용 디코딩(read_audio)과 바이트 단위 인코딩/디코딩(동화 묶음 파일용) 제공
+- 벤치마크: 디스크 사용량 / 콜드 읽기 시간 / 디코딩 CPU 시간을 WAV와 비교
+"""
+
+import io
+import os
+import sys
+import time
+import wave
+import tempfile
+import numpy as np
+
+from function.audio_postprocess import read_wav, write_wav, convert_format
+
+AUDIO_EXTENSIONS = ('.wav', '.flac', '.opus')   # 조회 순서 (새로 합성된 WAV가 우선)
+CODEC_EXTENSIONS = {'wav': '.wav', 'flac': '.flac', 'opus': '.opus'}
+OPUS_SAMPLE_RATE = 48000    # Opus가 지원하는 샘플레이트 (8/12/16/24/48kHz 중 최고 음질)
+
+FUNCTION_DIR = "/home/drboom/py_project/hanium_snowdream/function/"
+
+# 분류별 저장 폴더와 코덱 (wav로 두면 압축하지 않음)
+CATEGORY_DIRS = {
+    'story': os.path.join(FUNCTION_DIR, "function_textbook"),
+    'prompts': os.path.join(FUNCTION_DIR, "audio_prompts"),
+    'tts_cache': os.path.join(FUNCTION_DIR, "tts_cache"),
+    'fragments': os.path.join(FUNCTION_DIR, "audio_fragments"),
+    'photo_cache': os.path.join(FUNCTION_DIR, "photo_cache"),
+}
+CATEGORY_CODECS = {
+    'story': 'flac',        # 가장 큰 용량 - 무손실 압축
+    'prompts': 'flac',
+    'tts_cache': 'flac',
+    'fragments': 'wav',     # 조립 입력이라 자주 읽음 - 압축하지 않음
+    'photo_cache': 'opus',  # 다시 들을 가능성이 낮은 사진 설명 - 손실 압축
+}
+
+
+def load_soundfile():
+    """FLAC/Opus 인코더·디코더 (libsndfile) - 없으면 None"""
+    try:
+        import soundfile
+        return soundfile
+    except ImportError:
+        return None
+
+
+def to_pcm16(samples):
+    """float32 배열 → 16비트 PCM 바이트"""
+    return (np.clip(samples, -1.0, 1.0) * 32767).astype('<i2').tobytes()
+
+
+class AudioStore:
+    def __init__(self, category_dirs=CATEGORY_DIRS, category_codecs=CATEGORY_CODECS):
+        """압축 음성 저장소 초기화"""
+        self.category_dirs = dict(category_dirs)
+        self.category_codecs = dict(category_codecs)
+        self.soundfile = load_soundfile()
+        if self.soundfile is None:
+            print("ℹ️ soundfile이 설치되지 않음 - 음성을 WAV로만 보관")
+
+    # ---------------- 분류 / 조회 ----------------
+
+    def category_for(self, path):
+        """경로가 속한 분류 이름 (없으면 None)"""
+        path = os.path.abspath(str(path))
+        for category, directory in self.category_dirs.items():
+            if path.startswith(os.path.abspath(directory) + os.sep):
+                return category
+        return None
+
+    def codec_for(self, category):
+        """분류의 코덱 (압축 라이브러리가 없으면 항상 wav)"""
+        if self.soundfile is None:
+            return 'wav'
+        return self.category_codecs.get(category, 'wav')
+
+    def resolve(self, path):
+        """확장자와 무관하게 실제로 있는 음성 파일 경로 반환 (없으면 None)"""
+        base = os.path.splitext(str(path))[0]
+        for extension in AUDIO_EXTENSIONS:
+            candidate = base + extension
+            if os.path.exists(candidate):
+                return candidate
+        return None
+
+    def remove(self, path):
+        """모든 확장자의 같은 음성 파일 삭제"""
+        base = os.path.splitext(str(path))[0]
+        removed = False
+        for extension in AUDIO_EXTENSIONS:
+            try:
+                os.remove(base + extension)
+                removed = True
+            except OSError:
+                pass
+        return removed
+
+    # ---------------- 디코딩 ----------------
+
+    def read(self, path):
+        """음성 파일 → (float32 배열 [프레임, 채널], 샘플레이트)"""
+        path = self.resolve(path) or str(path)
+        if path.endswith('.wav'):
+            return read_wav(path)
+        if self.soundfile is None:
+            raise ValueError(f"압축 음성을 읽을 수 없습니다 (soundfile 없음): {path}")
+        samples, rate = self.soundfile.read(path, dtype='float32', always_2d=True)
+        return samples, rate
+
+    def duration(self, path):
+        """재생 길이(초) - 헤더만 읽음, 읽을 수 없으면 None"""
+        path = self.resolve(path) or str(path)
+        try:
+            if path.endswith('.wav'):
+                with wave.open(path, 'rb') as wf:
+                    return wf.getnframes() / float(wf.getframerate())
+            return self.soundfile.info(path).duration
+        except Exception:
+            return None
+
+    def decode_bytes(self, data, codec, rate=None, channels=None):
+        """
+        메모리 상의 인코딩된 바이트 → (float32 배열, 샘플레이트)
+        wav 코덱은 헤더 없는 16비트 PCM이므로 rate/channels를 함께 넘겨야 합니다.
+        """
+        if codec == 'wav':
+            samples = np.frombuffer(data, dtype='<i2').astype(np.float32) / 32768
+            return samples.reshape(-1, channels), rate
+        samples, rate = self.soundfile.read(io.BytesIO(data), dtype='float32', always_2d=True)
+        return samples, rate
+
+    # ---------------- 인코딩 ----------------
+
+    def encode_bytes(self, samples, rate, codec):
+        """
+        float32 배열 → 인코딩된 바이트 (wav 코덱은 헤더 없는 16비트 PCM)
+        반환값: (바이트, 실제 샘플레이트)
+        """
+        if codec == 'wav':
+            return to_pcm16(samples), rate
+        if codec == 'opus' and rate != OPUS_SAMPLE_RATE:
+            samples = convert_format(samples, rate, OPUS_SAMPLE_RATE, samples.shape[1])
+            rate = OPUS_SAMPLE_RATE
+        buffer = io.BytesIO()
+        if codec == 'flac':
+            self.soundfile.write(buffer, samples, rate, format='FLAC', subtype='PCM_16')
+        else:
+            self.soundfile.write(buffer, samples, rate, format='OGG', subtype='OPUS')
+        return buffer.getvalue(), rate
+
+    def compress_file(self, wav_path, codec=None):
+        """
+        WAV 한 개를 분류 코덱으로 압축하고 원본 WAV 삭제
+        반환값: 최종 파일 경로 (압축하지 않으면 원래 경로)
+        """
+        wav_path = str(wav_path)
+        codec = codec or self.codec_for(self.category_for(wav_path))
+        if codec == 'wav' or not wav_path.endswith('.wav'):
+            return wav_path
+
+        try:
+            samples, rate = read_wav(wav_path)
+            data, _ = self.encode_bytes(samples, rate, codec)
+        except Exception as e:
+            print(f"⚠️ 음성 압축 실패 ({os.path.basename(wav_path)}): {e}")
+            return wav_path
+
+        target_path = os.path.splitext(wav_path)[0] + CODEC_EXTENSIONS[codec]
+        temp_path = target_path + ".tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, target_path)
+        os.remove(wav_path)
+        return target_path
+
+    def compress_category(self, category, should_stop=None):
+        """
+        분류 폴더의 WAV를 전부 압축 (유휴 시간 작업용)
+        should_stop()이 True를 반환하면 중간에 멈춤
+        반환값: {'files', 'bytes_before', 'bytes_after'}
+        """
+        directory = self.category_dirs.get(category)
+        codec = self.codec_for(category)
+        result = {'files': 0, 'bytes_before': 0, 'bytes_after': 0}
+        if not directory or codec == 'wav' or not os.path.isdir(directory):
+            return result
+
+        for root, _, files in os.walk(directory):
+            for filename in files:
+                if not filename.endswith('.wav'):
+                    continue
+                if should_stop and should_stop():
+                    return result
+                wav_path = os.path.join(root, filename)
+                before = os.path.getsize(wav_path)
+                final_path = self.compress_file(wav_path, codec)
+                if final_path != wav_path:
+                    result['files'] += 1
+                    result['bytes_before'] += before
+                    result['bytes_after'] += os.path.getsize(final_path)
+
+        if result['files']:
+            print(f"🗜️ {category}: {result['files']}개 압축, "
+                  f"{result['bytes_before'] / 1024**2:.1f}MB → {result['bytes_after'] / 1024**2:.1f}MB")
+        return result
+
+    # ---------------- 벤치마크 ----------------
+
+    def benchmark(self, source_dir, codecs=('wav', 'flac', 'opus'), limit=50):
+        """
+        source_dir의 WAV들을 코덱별로 인코딩해 비교합니다.
+        - 디스크 사용량 (바이트)
+        - 콜드 읽기 시간 (페이지 캐시를 비운 뒤 파일 전체 읽기)
+        - 디코딩 CPU 시간 (process_time 기준)
+        """
+        sources = []
+        for root, _, files in os.walk(source_dir):
+            sources += [os.path.join(root, f) for f in sorted(files) if f.endswith('.wav')]
+        sources = sources[:limit]
+        if not sources:
+            print(f"❌ 벤치마크할 WAV가 없습니다: {source_dir}")
+            return {}
+
+        clips = [read_wav(path) for path in sources]
+        audio_seconds = sum(len(samples) / rate for samples, rate in clips)
+        results = {}
+        with tempfile.TemporaryDirectory() as work_dir:
+            for codec in codecs:
+                if codec != 'wav' and self.soundfile is None:
+                    continue
+                paths = []
+                for index, (samples, rate) in enumerate(clips):
+                    path = os.path.join(work_dir, f"clip_{index}{CODEC_EXTENSIONS[codec]}")
+                    if codec == 'wav':
+                        write_wav(path, samples, rate)
+                    else:
+                        data, _ = self.encode_bytes(samples, rate, codec)
+                        with open(path, 'wb') as f:
+                            f.write(data)
+                    paths.append(path)
+
+                total_bytes = sum(os.path.getsize(p) for p in paths)
+                for path in paths:
+                    drop_page_cache(path)
+                start = time.perf_counter()
+                for path in paths:
+                    with open(path, 'rb') as f:
+                        f.read()
+                cold_read_ms = (time.perf_counter() - start) * 1000
+
+                cpu_start = time.process_time()
+                for path in paths:
+                    self.read(path)
+                decode_cpu_ms = (time.process_time() - cpu_start) * 1000
+
+                results[codec] = {
+                    'bytes': total_bytes,
+                    'cold_read_ms': cold_read_ms,
+                    'decode_cpu_ms': decode_cpu_ms,
+                    'decode_cpu_per_audio_second_ms': decode_cpu_ms / audio_seconds,
+                }
+
+        wav_bytes = results.get('wav', {}).get('bytes')
+        print(f"📊 음성 저장 벤치마크: {len(sources)}개 파일, 총 {audio_seconds:.1f}초")
+        print(f"{'코덱':<6}{'용량(MB)':>10}{'비율':>8}{'콜드 읽기(ms)':>16}{'디코딩 CPU(ms)':>18}")
+        for codec, row in results.items():
+            ratio = f"{row['bytes'] / wav_bytes:.2f}" if wav_bytes else "-"
+            print(f"{codec:<6}{row['bytes'] / 1024**2:>10.2f}{ratio:>8}"
+                  f"{row['cold_read_ms']:>16.1f}{row['decode_cpu_ms']:>18.1f}")
+        return results
+
+
+def drop_page_cache(path):
+    """파일의 페이지 캐시를 비워 콜드 읽기를 재현 (지원하지 않으면 무시)"""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+    except (OSError, AttributeError):
+        pass
+
+
+# 전역 음성 저장소 인스턴스
+audio_store = AudioStore()
+
+# 편의 함수들
+def resolve_audio(path):
+    """WAV/FLAC/Opus 중 실제로 있는 파일 경로 (없으면 None)"""
+    return audio_store.resolve(path)
+
+def read_audio(path):
+    """음성 파일을 float32 배열로 디코딩"""
+    return audio_store.read(path)
+
+def compress_all(should_stop=None):
+    """모든 분류의 WAV를 분류별 코덱으로 압축"""
+    return {category: audio_store.compress_category(category, should_stop)
+            for category in audio_store.category_dirs}
+
+if __name__ == "__main__":
+    # python -m function.audio_store compress      → 모든 분류 압축
+    # python -m function.audio_store [WAV 폴더]    → 코덱 벤치마크
+    if len(sys.argv) > 1 and sys.argv[1] == "compress":
+        print(compress_all())
+    else:
+        target_dir = sys.argv[1] if len(sys.argv) > 1 else CATEGORY_DIRS['story']
+        audio_store.benchmark(target_dir)
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+카메라 서비스
+- 사진 모드 진입 / 메뉴에서 "사진" 선택 시 미리 카메라를 열어 자동 노출 안정화
+- 백그라운드 스레드에서 계속 프레임을 받아 최근 프레임 링 버퍼에 저장
+- 셔터 시점에 가장 선명한 최근 프레임을 즉시 반환 (라플라시안 분산 점수)
+"""
+
+import time
+import threading
+from collections import deque
+import cv2
+
+CAMERA_INDEX = 0
+FRAME_RING_SIZE = 6        # 최근 프레임 보관 개수
+SHARPNESS_MAX_SIDE = 320   # 선명도 계산용 축소 크기 (빠른 계산)
+WARMUP_SECONDS = 1.0       # 이 시간 이전 프레임은 노출이 불안정
+IDLE_RELEASE_SECONDS = 60  # 이 시간 동안 사용하지 않으면 카메라 해제
+STOP_TIMEOUT = 3.0         # 새로 열기 전에 이전 수집 스레드 종료를 기다리는 시간
+
+
+def sharpness_score(frame):
+    """라플라시안 분산으로 선명도 점수 계산 (클수록 선명)"""
+    height, width = frame.shape[:2]
+    scale = SHARPNESS_MAX_SIDE / max(height, width)
+    if scale < 1:
+        frame = cv2.resize(frame, (round(width * scale), round(height * scale)),
+                           interpolation=cv2.INTER_AREA)
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    return cv2.Laplacian(gray, cv2.CV_64F).var()
+
+
+class CameraService:
+    def __init__(self, camera_index=CAMERA_INDEX, ring_size=FRAME_RING_SIZE):
+        """카메라 서비스 초기화 (카메라는 warm_up 호출 시 열림)"""
+        self.camera_index = camera_index
+        self.frames = deque(maxlen=ring_size)  # (시각, 프레임)
+        self.lock = threading.Lock()
+        self.opened_at = 0
+        self.last_used = 0
+        self.thread = None
+        self.stop_event = None                 # 현재 수집 스레드의 중지 이벤트 (스레드마다 따로)
+        self.state_lock = threading.Lock()     # warm_up / release 순서 보장
+
+    def is_running(self):
+        """중지 요청을 받지 않은 수집 스레드가 있는지"""
+        return self.thread is not None and self.thread.is_alive() and not self.stop_event.is_set()
+
+    def warm_up(self):
+        """카메라를 열고 백그라운드 프레임 수집 시작 (이미 열려 있으면 무시)"""
+        self.last_used = time.time()
+        with self.state_lock:
+            if self.is_running():
+                return True
+
+            # 이전 스레드가 아직 카메라를 쥐고 있으면 끝날 때까지 기다린 뒤에만 새로 열기
+            if self.thread is not None and self.thread.is_alive():
+                self.thread.join(timeout=STOP_TIMEOUT)
+                if self.thread.is_alive():
+                    print("❌ 이전 카메라 수집이 끝나지 않아 카메라를 열 수 없습니다.")
+                    return False
+
+            cap = cv2.VideoCapture(self.camera_index)
+            if not cap.isOpened():
+                print("❌ 웹캠을 열 수 없습니다.")
+                return False
+            # 드라이버 내부 버퍼를 최소화해 항상 최신 프레임을 받음
+            cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+            self.opened_at = time.time()
+            with self.lock:
+                self.frames.clear()
+            stop_event = threading.Event()
+            self.stop_event = stop_event
+            self.thread = threading.Thread(target=self.grab_loop, args=(cap, stop_event), daemon=True)
+            self.thread.start()
+        print("📷 카메라 예열 시작")
+        return True
+
+    def grab_loop(self, cap, stop_event):
+        """수집 스레드: 자기 카메라 핸들과 중지 이벤트만 사용"""
+        try:
+            while not stop_event.is_set():
+                ret, frame = cap.read()
+                if not ret:
+                    time.sleep(0.05)
+                    continue
+                with self.lock:
+                    # 중지 후 늦게 읽힌 프레임은 새 수집의 버퍼에 넣지 않음
+                    if stop_event.is_set():
+                        break
+                    self.frames.append((time.time(), frame))
+                if time.time() - self.last_used > IDLE_RELEASE_SECONDS:
+                    print("📷 카메라 미사용 - 자동 해제")
+                    stop_event.set()
+        finally:
+            cap.release()
+
+    def release(self):
+        """프레임 수집 중지 및 카메라 해제 (스레드가 늦게 끝나면 다음 warm_up이 기다림)"""
+        with self.state_lock:
+            if self.stop_event:
+                self.stop_event.set()
+            if self.thread:
+                self.thread.join(timeout=1)
+                if not self.thread.is_alive():
+                    self.thread = None
+            with self.lock:
+                self.frames.clear()
+
+    def best_recent_frame(self, wait_timeout=2.0):
+        """링 버퍼에서 가장 선명한 프레임 반환 (노출 안정화 이전 프레임은 제외)"""
+        self.last_used = time.time()
+        deadline = time.time() + wait_timeout
+        while True:
+            with self.lock:
+                candidates = [(t, f) for t, f in self.frames if t - self.opened_at >= WARMUP_SECONDS]
+                if not candidates:
+                    candidates = list(self.frames)
+            if candidates or time.time() > deadline or not self.is_running():
+                break
+            time.sleep(0.02)
+
+        if not candidates:
+            return None
+        _, best = max(candidates, key=lambda item: sharpness_score(item[1]))
+        return best.copy()
+
+    def capture(self):
+        """셔터: 카메라가 예열되어 있으면 즉시, 아니면 열어서 프레임 반환"""
+        if not self.is_running() and not self.warm_up():
+            return None
+        return self.best_recent_frame()
+
+
+# 전역 카메라 서비스 인스턴스
+camera_service = CameraService()
+
+# 편의 함수들
+def warm_up_camera():
+    """카메라 예열 (메뉴 hover / 사진 모드 진입 시)"""
+    return camera_service.warm_up()
+
+def release_camera():
+    """카메라 해제 (사진 모드 종료 / 취소 시)"""
+    camera_service.release()
+
+if __name__ == "__main__":
+    # 테스트
+    print("카메라 서비스 테스트")
+    if warm_up_camera():
+        time.sleep(WARMUP_SECONDS + 0.5)
+        start = time.time()
+        frame = camera_service.capture()
+        print(f"셔터 지연: {(time.time() - start) * 1000:.1f}ms, 프레임: {None if frame is None else frame.shape}")
+        release_camera()
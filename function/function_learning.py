@@ -1,13 +1,17 @@
 #!/usr/bin/env python3
 import os
 import sys
-import subprocess
 import time
 import pygame
 from pathlib import Path
 
 # TTS 설정 - route.py 사용
 from function.route import generate_tts_audio, kill_tts_processes
+from process_supervisor import supervisor
+from function.phrase_composer import phrase_composer
+from function.audio_store import resolve_audio
+from navigation_system import nav_manager
+from function.learning_curriculum import open_curriculum
 
 # pygame 초기화
 pygame.mixer.init()
@@ -26,9 +30,6 @@ class LearningFunction:
         
         # 읽기 모드 새 오디오 파일들
         self.select_stage_wav = self.audio_dir / "select_stage.wav"
-        self.stage1_selected_wav = self.audio_dir / "stage1_selected.wav"
-        self.stage2_selected_wav = self.audio_dir / "stage2_selected.wav"
-        self.stage3_selected_wav = self.audio_dir / "stage3_selected.wav"
         
         # TTS 대본
         self.reading_prompt = "읽기 기능을 선택하시겠습니까?"
@@ -38,12 +39,12 @@ class LearningFunction:
         
         # 읽기 모드 새 TTS 대본들
         self.select_stage_prompt = "단계를 골라주세요"
-        self.stage1_selected_prompt = "1단계를 선택하셨습니다"
-        self.stage2_selected_prompt = "2단계를 선택하셨습니다"
-        self.stage3_selected_prompt = "3단계를 선택하셨습니다"
+        self.stage_selected_template = "{stage}단계를 선택하셨습니다"  # 단계마다 조각 하나만 합성
         
-        # 읽기 파일 경로
+        # 읽기 파일 경로 (컴파일된 커리큘럼 산출물로 로드)
         self.reading_file_path = Path(__file__).parent / "function_study" / "function_read.txt"
+        self.curriculum = None
+        self.display = None  # 점자 모터 연결은 처음 출력할 때 한 번만
         
         # 읽기 모드 상태
         self.reading_stages = {}
@@ -54,7 +55,7 @@ class LearningFunction:
     
     def ensure_audio_exists(self, text, audio_path):
         """오디오 파일이 존재하는지 확인하고 없으면 생성"""
-        if not audio_path.exists():
+        if not resolve_audio(audio_path):
             print(f"오디오 파일이 없습니다. TTS로 생성합니다: {audio_path}")
             return generate_tts_audio(text, audio_path)
         else:
@@ -64,7 +65,8 @@ class LearningFunction:
     def play_audio(self, audio_path):
         """오디오 파일 재생"""
         try:
-            pygame.mixer.music.load(str(audio_path))
+            # 압축 저장된 파일(FLAC/Opus)이면 그 파일을 스트리밍 재생
+            pygame.mixer.music.load(resolve_audio(audio_path) or str(audio_path))
             pygame.mixer.music.play()
             
             # 재생이 끝날 때까지 대기
@@ -107,42 +109,14 @@ class LearningFunction:
         return False
     
     def parse_reading_file(self):
-        """function_read.txt 파일을 파싱하여 단계별 단어 딕셔너리 생성"""
-        stages = {}
-        
-        try:
-            with open(self.reading_file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                
-            current_stage = None
-            for line in content.split('\n'):
-                line = line.strip()
-                if line.startswith('===') and line.endswith('==='):
-                    # 단계 헤더 파싱 (예: ===1단계===)
-                    stage_text = line.replace('===', '')
-                    if '1단계' in stage_text:
-                        current_stage = 1
-                    elif '2단계' in stage_text:
-                        current_stage = 2
-                    elif '3단계' in stage_text:
-                        current_stage = 3
-                    
-                    if current_stage:
-                        stages[current_stage] = []
-                        
-                elif line and current_stage and line[0].isdigit():
-                    # 번호가 있는 단어 라인 파싱 (예: 1. 강)
-                    parts = line.split('.', 1)
-                    if len(parts) == 2:
-                        word = parts[1].strip()
-                        stages[current_stage].append(word)
-            
-            print(f"파싱 결과: {stages}")
-            return stages
-            
-        except Exception as e:
-            print(f"읽기 파일 파싱 오류: {e}")
+        """컴파일된 커리큘럼을 로드하여 단계별 단어 딕셔너리 생성 (원본이 바뀌었을 때만 다시 파싱)"""
+        start = time.time()
+        self.curriculum = open_curriculum()
+        if not self.curriculum:
             return {}
+        stages = {stage: self.curriculum.words(stage) for stage in self.curriculum.stage_numbers()}
+        print(f"커리큘럼 로드: {len(stages)}단계 ({(time.time() - start) * 1000:.1f}ms)")
+        return stages
     
     def start_reading_mode(self):
         """읽기 모드 시작"""
@@ -154,9 +128,10 @@ class LearningFunction:
             print("❌ 읽기 파일을 불러올 수 없습니다.")
             return
         
-        # 단계 선택 모드 진입
+        # 단계 선택 모드 진입 (첫 단계부터)
         self.in_stage_selection = True
-        self.current_stage = 1
+        self.current_stage = min(self.reading_stages)
+        self.notify_stage_cursor()
         
         # "단계를 골라주세요" 음성 재생
         print("🔊 단계를 골라주세요")
@@ -171,15 +146,24 @@ class LearningFunction:
         if not self.in_stage_selection:
             return
             
+        # 단계 수에 제한 없음 - 커리큘럼에 있는 단계 번호 사이에서 이동
+        stage_numbers = sorted(self.reading_stages)
+        position = stage_numbers.index(self.current_stage) if self.current_stage in stage_numbers else 0
         if direction == 'up':
-            self.current_stage = max(1, self.current_stage - 1)
+            self.current_stage = stage_numbers[max(0, position - 1)]
         elif direction == 'down':
-            self.current_stage = min(3, self.current_stage + 1)
+            self.current_stage = stage_numbers[min(len(stage_numbers) - 1, position + 1)]
         
         print(f"현재 선택: {self.current_stage}단계")
+        self.notify_stage_cursor()
         
         # 단계별 음성 안내는 일단 생략 (너무 많은 TTS 생성 방지)
     
+    def notify_stage_cursor(self):
+        """선택된 단계가 바뀌었음을 알림 (확정 안내 / 앞 단어 음성 미리 준비)"""
+        nav_manager.notify_cursor('stage', self.current_stage, audio_dir=self.audio_dir,
+                                  words=self.reading_stages.get(self.current_stage, []))
+    
     def confirm_stage_selection(self):
         """단계 선택 확정 (상호작용 버튼)"""
         if not self.in_stage_selection:
@@ -188,14 +172,8 @@ class LearningFunction:
         print(f"✅ {self.current_stage}단계를 선택하셨습니다")
         
         # 선택 확정 음성 재생
-        stage_prompts = {
-            1: (self.stage1_selected_prompt, self.stage1_selected_wav),
-            2: (self.stage2_selected_prompt, self.stage2_selected_wav),
-            3: (self.stage3_selected_prompt, self.stage3_selected_wav)
-        }
-        
-        prompt_text, prompt_wav = stage_prompts[self.current_stage]
-        if self.ensure_audio_exists(prompt_text, prompt_wav):
+        prompt_wav = phrase_composer.render(self.stage_selected_template, stage=self.current_stage)
+        if prompt_wav:
             self.play_audio(prompt_wav)
         
         # 단어 학습 모드로 전환
@@ -230,56 +208,53 @@ class LearningFunction:
         # 1️⃣ 점자 출력 먼저
         self.output_braille(word)
         
-        # 2️⃣ 그 다음 TTS 음성 파일 생성 및 재생
-        word_audio_path = self.audio_dir / f"word_{word}.wav"
+        # 2️⃣ 그 다음 TTS 음성 파일 생성 및 재생 (캐시 키는 커리큘럼에 미리 계산됨)
+        entry = self.current_entry()
+        word_audio_path = self.audio_dir / (entry['audio_key'] if entry else f"word_{word}.wav")
         if self.ensure_audio_exists(word, word_audio_path):
+            if entry and entry['duration'] is None:
+                self.curriculum.record_audio(self.current_stage, self.current_word_index)
             self.play_audio(word_audio_path)
         
         print("상호작용 버튼을 눌러서 다음 단어로 이동하세요")
     
+    def current_entry(self):
+        """현재 단어의 커리큘럼 항목 (점자 셀, 이동량, 음성 키)"""
+        if not self.curriculum:
+            return None
+        return self.curriculum.entry(self.current_stage, self.current_word_index)
+    
+    def get_display(self):
+        """점자 디스플레이 (아두이노 연결과 표시 상태는 점자 페이지 넘김과 같이 씀)"""
+        if self.display is None:
+            sys.path.append('/home/drboom/py_project/hanium_snowdream')
+            from braille.braille_pager import get_braille_display
+            self.display = get_braille_display()
+        return self.display
+    
     def output_braille(self, word):
-        """BrailleTranslator를 사용하여 점자 출력"""
+        """미리 계산된 점자 셀로 출력 (커리큘럼에 없는 단어만 즉시 변환)"""
         try:
-            # 현재 프로젝트의 BrailleTranslator 임포트
-            sys.path.append('/home/drboom/py_project/hanium_snowdream')
-            from braille.braille_translator import BrailleTranslator
-            
-            translator = BrailleTranslator()
-            
-            # 현재 상태 로드 (로그 파일에서 읽기 시도)
-            current_state = ['11', '22', '33', '44', '55', '66', '77', '88', '11', '22']
-            try:
-                with open(translator.log_file_path, 'r', encoding='utf-8') as f:
-                    content = f.read().strip()
-                    if content:
-                        loaded_state = content.split()
-                        if len(loaded_state) >= 10:
-                            current_state = loaded_state[:10]
-                        else:
-                            current_state = loaded_state + ['88'] * (10 - len(loaded_state))
-            except FileNotFoundError:
-                pass
+            display = self.get_display()
             
-            # 단어를 점자로 변환
-            braille = translator.translate_text(word)
-            target_state = translator.convert_braille_to_number(braille)
+            entry = self.current_entry()
+            planned = planned_from = None
+            if entry and entry['word'] == word:
+                target_state = list(entry['cells'])
+                previous = self.curriculum.entry(self.current_stage, self.current_word_index - 1) \
+                    if self.current_word_index > 0 else None
+                # 이전 단어 상태에서 순서대로 넘어온 경우 미리 계산한 이동량 사용 (디스플레이가 현재 상태와 비교)
+                if entry['transition'] and previous:
+                    planned, planned_from = entry['transition'], previous['cells']
+            else:
+                translator = display.translator
+                braille = translator.translate_text(word)
+                target_state = translator.convert_braille_to_number(braille)
             
-            # 10개 미만이면 '88'로 채우기
-            if len(target_state) < 10:
-                padding_needed = 10 - len(target_state)
-                target_state.extend(['88'] * padding_needed)
-            
-            # 상태 전환 계산 및 아두이노 전송
-            transitions = translator.calculate_state_transition(current_state, target_state)
             print(f"📟 점자 출력: {word} → {' '.join(target_state)}")
-            print(f"🔄 상태 전환: {transitions}")
-            
-            # 로그 파일에 상태 저장
-            translator.log_to_file(translator.log_file_path, ' '.join(target_state))
-            translator.log_to_file(translator.change_log_path, transitions)
             
-            # 아두이노에 모터 제어 명령 전송
-            translator.send_motor_commands(transitions)
+            # 상태 저장 후 모든 점자 모듈에 모터 제어 명령 전송 (이동이 끝날 때까지 대기)
+            display.show(target_state, planned, planned_from).result()
             
         except Exception as e:
             print(f"❌ 점자 출력 오류: {e}")
@@ -299,7 +274,7 @@ class LearningFunction:
         print("🎉 읽기 학습이 완료되었습니다!")
         self.in_stage_selection = False
         self.in_word_learning = False
-        self.current_stage = 1
+        self.current_stage = min(self.reading_stages) if self.reading_stages else 1
         self.current_word_index = 0
     
     def start_writing_mode(self):
@@ -307,7 +282,7 @@ class LearningFunction:
         print("=== 📝 쓰기 모드 시작 ===")
         
         try:
-            # subprocess로 sudo 권한으로 실행
+            # 프로세스 관리자로 sudo 권한으로 실행
             print("🔑 sudo 권한으로 쓰기 모드 실행 중...")
             
             # 작업 디렉토리를 function 폴더로 설정
@@ -319,13 +294,11 @@ class LearningFunction:
                 'writing_mode.py'
             ]
             
-            # 백그라운드로 실행
-            self.writing_process = subprocess.Popen(
+            # 백그라운드로 실행 (자체 프로세스 그룹, 사용자 세션이므로 재시작하지 않음)
+            self.writing_process = supervisor.spawn(
+                'writing_mode',
                 cmd,
-                cwd=working_dir,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
+                cwd=working_dir
             )
             
             print("✅ 쓰기 모드 프로세스 시작!")
@@ -357,9 +330,12 @@ class LearningFunction:
         
         print("테스트 완료!")
 
+# 전역 학습 세션 인스턴스 (조이스틱 입력마다 새로 만들지 않음)
+learning_session = LearningFunction()
+
 def main():
     """메인 함수"""
-    learning = LearningFunction()
+    learning = learning_session
     
     # 테스트 모드
     if len(sys.argv) > 1 and sys.argv[1] == "test":
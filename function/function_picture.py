@@ -2,19 +2,30 @@
 #                      IMPORTS & CONFIGURATIONS
 # ===================================================================
 import cv2
-import requests
 import json
 import base64
 import os
+import re
 import time
-import subprocess
+import wave
+import queue
+import threading
 import pygame
 
+from ollama_client import ollama_client
+from memory_manager import memory_manager
+from process_supervisor import supervisor
+from tts_scheduler import tts_scheduler, INTERACTIVE, BACKGROUND
+from function.audio_store import resolve_audio
+from function.camera_service import camera_service, warm_up_camera
+from function.photo_cache import photo_cache, dhash
+from function.photo_detector import photo_detector, announcement_for
+from braille.braille_pager import open_braille_text
+
 # --- LLaVA & TTS 설정 ---
-OLLAMA_URL = "http://localhost:11434/api/generate"
 LLAVA_MODEL = "llava"
-CAPTURE_FILE = "capture.jpg"
-REF_AUDIO_PATH = "/home/drboom/py_project/shortform/route/kor_male.wav"
+LLAVA_MAX_SIDE = 672       # LLaVA 비전 인코더 입력 해상도 (336px 타일 2x2)
+LLAVA_JPEG_QUALITY = 85    # 한 번만 인코딩하므로 화질 손실이 누적되지 않음
 TTS_OUTPUT_DIR = "/home/drboom/py_project/snowdream/"
 GPT_SOVITS_DIR = "/home/drboom/py_project/GPT-SoVITS"  # 경로 수정
 
@@ -23,6 +34,14 @@ PHOTO_SOUND_DIR = "/home/drboom/py_project/hanium_snowdream/function/sound/"
 PHOTO_AIMING_SOUND = "photo_aiming.mp3"
 PHOTO_CHEESE_SOUND = "photo_cheese.mp3"
 
+# 분석 중 안내 설정 (실제 경과 시간 기준)
+PROGRESS_FIRST_DELAY = 4.0      # 이 시간이 지나도 결과가 없으면 "진행 중" 안내
+PROGRESS_REPEAT_INTERVAL = 8.0  # 이후 이 간격으로 반복 안내
+
+# 취소 버튼: 진행 중인 설명 스트리밍 / 문장 합성 / 재생 중단
+photo_cancel = threading.Event()
+analysis_running = False
+
 # 음성 안내 TTS 캐시 설정
 TTS_CACHE_DIR = "/home/drboom/py_project/hanium_snowdream/function/tts_cache/"
 os.makedirs(TTS_CACHE_DIR, exist_ok=True)
@@ -42,22 +61,9 @@ def generate_tts_for_text(text, output_path):
             print(f"❌ GPT-SoVits 디렉토리를 찾을 수 없습니다: {GPT_SOVITS_DIR}")
             return False
         
-        # TTS 명령 실행
-        cmd = [
-            'conda', 'run', '-n', 'GPTSoVits', 'python', 'tts_cli.py',
-            '--text', text,
-            '--ref_audio', REF_AUDIO_PATH,
-            '--output', output_path
-        ]
+        # TTS 스케줄러 큐를 거쳐 실행 (사용자가 기다리는 안내 → 대화형 우선순위)
         print(f"🔊 '{text}' 음성으로 변환 중...")
-        result = subprocess.run(cmd, cwd=GPT_SOVITS_DIR, timeout=300, capture_output=True, text=True)
-        
-        if result.returncode == 0:
-            print(f"✅ TTS 변환 완료: {output_path}")
-            return True
-        else:
-            print(f"❌ TTS 변환 실패: {result.stderr}")
-            return False
+        return tts_scheduler.synthesize(text, output_path, INTERACTIVE)
             
     except Exception as e:
         print(f"❌ TTS 실행 오류: {e}")
@@ -67,9 +73,11 @@ def ensure_tts_wav_exists(text, wav_filename):
     """TTS WAV 파일이 없으면 생성, 있으면 바로 사용"""
     wav_path = os.path.join(TTS_CACHE_DIR, wav_filename)
     
-    if os.path.exists(wav_path):
-        print(f"✅ 기존 음성 파일 사용: {wav_filename}")
-        return wav_path
+    # 압축 저장된 캐시(FLAC/Opus)도 그대로 사용 - pygame이 바로 디코딩
+    stored_path = resolve_audio(wav_path)
+    if stored_path:
+        print(f"✅ 기존 음성 파일 사용: {os.path.basename(stored_path)}")
+        return stored_path
     else:
         print(f"🔊 음성 파일 생성 중: '{text}'")
         if generate_tts_for_text(text, wav_path):
@@ -95,6 +103,67 @@ def play_cached_announcement(text, wav_filename):
             return False
     return False
 
+class BackgroundAnnouncer:
+    """추론/합성이 진행되는 동안 백그라운드에서 안내 음성을 재생"""
+
+    def __init__(self, intro_clips, progress_clip=None,
+                 first_delay=PROGRESS_FIRST_DELAY, repeat_interval=PROGRESS_REPEAT_INTERVAL,
+                 first_clip_fn=None):
+        self.intro_clips = intro_clips        # 시작하자마자 재생할 (텍스트, wav 파일명) 목록
+        self.first_clip_fn = first_clip_fn    # 백그라운드에서 계산해 가장 먼저 재생할 클립 (없으면 None 반환)
+        self.progress_clip = progress_clip    # 작업이 오래 걸릴 때만 재생할 안내
+        self.first_delay = first_delay
+        self.repeat_interval = repeat_interval
+        self.done = threading.Event()
+        self.thread = None
+        self.started_at = 0
+
+    def run(self):
+        if self.first_clip_fn:
+            clip = self.first_clip_fn()
+            if clip and not self.done.is_set():
+                play_cached_announcement(*clip)
+
+        for text, wav_filename in self.intro_clips:
+            if self.done.is_set():
+                return
+            play_cached_announcement(text, wav_filename)
+
+        if not self.progress_clip:
+            return
+        next_at = self.started_at + self.first_delay
+        while not self.done.wait(max(0, next_at - time.time())):
+            print(f"🕐 분석 {time.time() - self.started_at:.0f}초 경과 - 진행 안내")
+            play_cached_announcement(*self.progress_clip)
+            next_at = time.time() + self.repeat_interval
+
+    def start(self):
+        self.started_at = time.time()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """새 안내는 시작하지 않고, 재생 중인 안내가 끝날 때까지만 대기"""
+        self.done.set()
+        if self.thread:
+            self.thread.join()
+
+def play_audio_file(wav_path, should_stop=None):
+    """오디오 파일을 재생하고 끝날 때까지 대기합니다 (should_stop()이 True면 중단)"""
+    try:
+        pygame.mixer.music.load(wav_path)
+        pygame.mixer.music.play()
+        while pygame.mixer.music.get_busy():
+            if should_stop and should_stop():
+                pygame.mixer.music.stop()
+                return False
+            pygame.time.wait(100)
+        return True
+    except Exception as e:
+        print(f"❌ 음성 재생 오류: {e}")
+        return False
+
 def play_photo_sound_sequence():
     """사진 촬영 사운드 시퀀스를 재생합니다."""
     try:
@@ -127,229 +196,290 @@ def play_photo_sound_sequence():
     except Exception as e:
         print(f"❌ 사진 촬영 사운드 재생 오류: {e}")
 
-def capture_image_from_webcam():
-    """웹캠에서 이미지를 캡처하여 파일로 저장하고 경로를 반환"""
-    cap = cv2.VideoCapture(0)
-    if not cap.isOpened():
-        print("❌ 웹캠을 열 수 없습니다.")
-        return None
-    
-    print("📸 사진 촬영 사운드 시퀀스 시작...")
-    
-    # 사진 촬영 사운드 시퀀스 재생
-    play_photo_sound_sequence()
-    
-    # 사운드 시퀀스 끝나면 실제 촬영
-    ret, frame = cap.read()
-    if not ret:
+def capture_frame_from_webcam():
+    """셔터: 예열된 카메라의 최근 프레임 중 가장 선명한 것을 메모리로 반환 (파일 저장 없음)"""
+    frame = camera_service.capture()
+    if frame is None:
         print("❌ 프레임을 캡처할 수 없습니다.")
-        cap.release()
         return None
     
-    # 이미지 품질 조정하여 저장 (압축)
-    cv2.imwrite(CAPTURE_FILE, frame, [cv2.IMWRITE_JPEG_QUALITY, 70])  # 품질 70%로 압축
-    print(f"✅ '{CAPTURE_FILE}'으로 사진 저장 완료 (압축됨).")
-    cap.release()
-    return CAPTURE_FILE
-
-def image_to_base64(filepath):
-    """이미지 파일을 Base64 문자열로 변환 (추가 압축 포함)"""
-    from PIL import Image
-    import io
-    
-    # PIL로 이미지 열기
-    with Image.open(filepath) as img:
-        # JPEG 포맷으로 추가 압축
-        buffer = io.BytesIO()
-        
-        # RGB로 변환 (JPEG 호환성)
-        if img.mode != 'RGB':
-            img = img.convert('RGB')
-        
-        # 크기 조정 (최대 800x600)
-        img.thumbnail((800, 600), Image.Resampling.LANCZOS)
-        
-        # 품질 60으로 저장
-        img.save(buffer, format='JPEG', quality=60, optimize=True)
-        buffer.seek(0)
-        
-        return base64.b64encode(buffer.getvalue()).decode('utf-8')
+    print(f"✅ 프레임 캡처 완료 ({frame.shape[1]}x{frame.shape[0]})")
+    return frame
 
-def ask_llava_about_image(image_path, prompt):
-    """LLaVA에게 이미지에 대해 질문하고 답변을 반환 (음성 안내 포함)"""
-    if not os.path.exists(image_path):
-        print(f"❌ 이미지 파일이 없습니다: {image_path}")
-        return None
-    
-    # 1. 분석 시작 음성 안내
-    print("🤖 LLaVA에게 이미지에 대해 질문 중...")
-    play_cached_announcement(
-        "인공지능이 사진을 분석하고 있습니다.",
-        "photo_analysis_start.wav"
-    )
-    
-    encoded_image = image_to_base64(image_path)
-    data = { "model": LLAVA_MODEL, "prompt": prompt, "images": [encoded_image], "stream": False }
+def encode_frame_for_llava(frame):
+    """프레임을 LLaVA 입력 해상도로 한 번만 줄이고 JPEG + Base64로 인코딩"""
+    height, width = frame.shape[:2]
+    scale = LLAVA_MAX_SIDE / max(height, width)
+    if scale < 1:
+        frame = cv2.resize(frame, (round(width * scale), round(height * scale)),
+                           interpolation=cv2.INTER_AREA)
     
-    print(f"📝 프롬프트: {prompt}")
-    print(f"🖼️ 이미지 크기: {len(encoded_image)} characters")
-    
-    # 2. 분석 진행 중 음성 안내
-    print("🕐 이미지 분석 요청 중... (시간이 걸릴 수 있습니다)")
-    play_cached_announcement(
-        "분석이 진행 중입니다. 잠시만 기다려주세요.",
-        "photo_analysis_progress.wav"
-    )
-    
-    try:
-        response = requests.post(OLLAMA_URL, json=data, timeout=120)  # 타임아웃 증가
-        print("✅ 분석 완료!")
-        
-        # 3. 분석 완료 음성 안내
-        play_cached_announcement(
-            "분석이 완료되었습니다.",
-            "photo_analysis_complete.wav"
-        )
-        response.raise_for_status()
-        full_response = response.json().get("response", "")
-        print(f"\n💬 LLaVA 답변: {full_response.strip()}")
-        return full_response
-    except requests.exceptions.ConnectionError as e:
-        print(f"❌ 연결 오류: Ollama 서버가 실행 중인지 확인하세요")
-        print("💡 해결방법: 'ollama serve' 명령어로 서버를 시작하세요")
-        return None
-    except requests.exceptions.Timeout as e:
-        print(f"❌ 요청 시간 초과: 이미지가 너무 크거나 서버가 바쁩니다")
-        return None
-    except requests.RequestException as e:
-        print(f"❌ API 요청 오류: {e}")
+    ok, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, LLAVA_JPEG_QUALITY])
+    if not ok:
+        print("❌ 이미지 인코딩 실패")
         return None
+    return base64.b64encode(buffer.tobytes()).decode('utf-8')
 
-def stop_llava():
-    """LLaVA 모델을 종료하여 TTS를 위한 메모리를 확보"""
+# 문장 끝: 마침표/느낌표/물음표 뒤에 공백이 와야 완결된 문장으로 봄 (예: "3.5" 제외)
+SENTENCE_BOUNDARY = re.compile(r'[.!?。]+(?=\s)')
+
+def split_complete_sentences(buffer):
+    """버퍼에서 완결된 문장들을 잘라내고 (문장 목록, 남은 버퍼)를 반환"""
+    sentences = []
+    while True:
+        match = SENTENCE_BOUNDARY.search(buffer)
+        if not match:
+            break
+        sentence = buffer[:match.end()].strip()
+        if sentence:
+            sentences.append(sentence)
+        buffer = buffer[match.end():].lstrip()
+    return sentences, buffer
+
+def concat_wav_files(wav_paths, output_path):
+    """같은 포맷의 WAV 파일들을 하나로 이어 붙임"""
     try:
-        print("🔄 LLaVA 모델을 종료하여 메모리를 확보합니다...")
-        subprocess.run(['ollama', 'stop', 'llava'], capture_output=True, text=True, timeout=10)
+        with wave.open(output_path, 'wb') as out:
+            for i, path in enumerate(wav_paths):
+                with wave.open(path, 'rb') as wf:
+                    if i == 0:
+                        out.setparams(wf.getparams())
+                    out.writeframes(wf.readframes(wf.getnframes()))
         return True
     except Exception as e:
-        print(f"⚠️ LLaVA 종료 중 오류: {e}")
+        print(f"❌ WAV 합치기 오류: {e}")
         return False
 
-def start_llava():
-    """LLaVA 모델을 다시 로드"""
+def stream_description_to_speech(encoded_image, prompt, shutter_time, first_clip_fn=None):
+    """
+    LLaVA 설명을 스트리밍으로 받아 첫 문장이 완성되는 즉시 합성/재생하고,
+    나머지 문장은 생성되는 대로 큐에 넣어 이어서 재생합니다.
+    first_clip_fn이 있으면 분석 안내보다 먼저 그 결과(1단계 탐지 안내)를 재생합니다.
+    (전체 텍스트, 문장별 WAV 목록, 셔터→첫 음성 ms)를 반환합니다.
+    """
+    sentence_queue = queue.Queue()
+    audio_queue = queue.Queue()
+    full_text = []
+    status = {'error': None}
+
+    # LLaVA와 GPT-SoVITS가 같이 예산 안에 들어갈 때만 생성 중에 합성 (아니면 LLaVA를 내린 뒤 합성)
+    llava_released = threading.Event()
+    overlap = memory_manager.fits_together('llava', 'tts_server')
+    if not overlap:
+        print("ℹ️ 메모리 예산 부족 - LLaVA 생성이 끝나고 내린 뒤 문장 합성")
+
+    announcer = BackgroundAnnouncer(
+        [("인공지능이 사진을 분석하고 있습니다.", "photo_analysis_start.wav")],
+        progress_clip=("분석이 진행 중입니다. 잠시만 기다려주세요.", "photo_analysis_progress.wav"),
+        first_clip_fn=first_clip_fn
+    ).start()
+
+    def llava_producer():
+        # LLaVA 토큰 스트림 → 완결된 문장 단위로 합성 큐에 전달
+        # 연결 불가 안내는 분석 안내와 겹치지 않게 메인 스레드에서 재생 (notify=False)
+        memory_manager.mark_loaded('llava')
+        buffer = ""
+        stream = ollama_client.generate_stream(LLAVA_MODEL, prompt, images=[encoded_image],
+                                               timeout=120, notify=False)
+        try:
+            for piece in stream:
+                if photo_cancel.is_set():
+                    print("⏹️ 사진 설명 생성 중단 (취소)")
+                    break
+                full_text.append(piece)
+                sentences, buffer = split_complete_sentences(buffer + piece)
+                for sentence in sentences:
+                    print(f"✂️ 문장 완성: {sentence}")
+                    sentence_queue.put(sentence)
+        finally:
+            stream.close()   # 취소 시 응답 연결을 바로 닫음
+            status['error'] = ollama_client.last_error
+        if buffer.strip() and not photo_cancel.is_set():
+            sentence_queue.put(buffer.strip())
+        sentence_queue.put(None)
+
+        # 생성이 끝났으니 남은 문장 합성을 위해 LLaVA 메모리 해제
+        if stop_llava():
+            memory_manager.mark_unloaded('llava')
+        llava_released.set()
+
+    def tts_worker():
+        # 문장 → WAV, 순서대로 재생 큐에 전달
+        if not overlap:
+            llava_released.wait()
+        index = 0
+        while True:
+            sentence = sentence_queue.get()
+            if sentence is None or photo_cancel.is_set():
+                break
+            index += 1
+            wav_path = os.path.join(TTS_OUTPUT_DIR, f"photo_sentence_{index}.wav")
+            if generate_tts_for_text(sentence, wav_path):
+                audio_queue.put(wav_path)
+        audio_queue.put(None)
+
+    producer = threading.Thread(target=llava_producer, daemon=True)
+    synthesizer = threading.Thread(target=tts_worker, daemon=True)
+    producer.start()
+    synthesizer.start()
+
+    # 메인 스레드: 합성된 문장을 순서대로 재생
+    played = []
+    first_word_ms = None
+    while True:
+        wav_path = audio_queue.get()
+        if wav_path is None:
+            break
+        played.append(wav_path)   # 취소되어도 파일 정리는 호출자가 하도록 목록에 남김
+        if photo_cancel.is_set():
+            continue
+        if first_word_ms is None:
+            announcer.stop()
+            first_word_ms = (time.time() - shutter_time) * 1000
+            print(f"⏱️ 셔터 → 첫 음성: {first_word_ms:.0f}ms")
+        play_audio_file(wav_path, should_stop=photo_cancel.is_set)
+
+    announcer.stop()
+    producer.join()
+    if photo_cancel.is_set():
+        return None, played, first_word_ms
+    if status['error'] in ("unavailable", "connection") and ollama_client.on_unavailable:
+        ollama_client.on_unavailable()
+    text = "".join(full_text) if status['error'] is None else None
+    return text, played, first_word_ms
+
+def make_quick_label_clip_fn(frame, shutter_time, timings, missing_clips):
+    """
+    1단계(CPU 탐지) 안내 클립을 계산하는 함수를 만듭니다.
+    GPT-SoVITS 합성은 탐지보다 훨씬 느리므로 이미 합성된 안내만 바로 재생하고,
+    처음 보는 물체는 missing_clips에 모아 시퀀스가 끝난 뒤 백그라운드로 합성해 둡니다.
+    """
+    def quick_label_clip():
+        detection = photo_detector.detect(frame)
+        if photo_detector.last_ms is not None:
+            timings['tier1_detect_ms'] = photo_detector.last_ms
+        if not detection:
+            return None
+
+        clip = (announcement_for(detection['label']), f"detect_{detection['label']}.wav")
+        timings['tier1_label'] = detection['label']
+        if not resolve_audio(os.path.join(TTS_CACHE_DIR, clip[1])):
+            missing_clips.append(clip)
+            return None
+        timings['shutter_to_tier1_ms'] = (time.time() - shutter_time) * 1000
+        print(f"⏱️ 셔터 → 1단계 안내: {timings['shutter_to_tier1_ms']:.0f}ms")
+        return clip
+
+    return quick_label_clip
+
+def stop_llava():
+    """LLaVA 모델을 종료하여 TTS를 위한 메모리를 확보"""
     try:
-        print("🔄 LLaVA 모델을 다시 로드합니다...")
-        subprocess.run(['ollama', 'run', 'llava', ''], capture_output=True, text=True, timeout=30)
+        print("🔄 LLaVA 모델을 종료하여 메모리를 확보합니다...")
+        supervisor.run('ollama_stop', ['ollama', 'stop', 'llava'], timeout=10, group='ollama')
         return True
     except Exception as e:
-        print(f"⚠️ LLaVA 로드 중 오류: {e}")
+        print(f"⚠️ LLaVA 종료 중 오류: {e}")
         return False
 
-def text_to_speech(text, output_file="response.wav"):
-    """텍스트를 음성으로 변환하여 wav 파일 생성하고 스피커로 재생 (음성 안내 포함)"""
-    stopped_successfully = False
-    try:
-        if stop_llava():
-            stopped_successfully = True
-        
-        output_path = os.path.join(TTS_OUTPUT_DIR, output_file)
-        
-        # GPT-SoVits 디렉토리 존재 확인
-        if not os.path.exists(GPT_SOVITS_DIR):
-            print(f"❌ GPT-SoVits 디렉토리를 찾을 수 없습니다: {GPT_SOVITS_DIR}")
-            return False
-        
-        # TTS 변환 시작 음성 안내
-        play_cached_announcement(
-            "결과를 음성으로 변환하고 있습니다.",
-            "photo_tts_converting.wav"
-        )
-        
-        cmd = [
-            'conda', 'run', '-n', 'GPTSoVits', 'python', 'tts_cli.py',
-            '--text', text,
-            '--ref_audio', REF_AUDIO_PATH,
-            '--output', output_path
-        ]
-        print(f"🔊 '{text}' 음성으로 변환 중...")
-        result = subprocess.run(cmd, cwd=GPT_SOVITS_DIR, timeout=300, capture_output=True, text=True)
-        
-        if result.returncode == 0:
-            print(f"✅ 음성 변환 완료! 파일: {output_path}")
-            
-            # 스피커로 바로 재생
-            try:
-                print("🔊 pygame으로 스피커 재생 중...")
-                pygame.mixer.music.load(output_path)
-                pygame.mixer.music.play()
-                
-                # 재생이 끝날 때까지 대기
-                while pygame.mixer.music.get_busy():
-                    pygame.time.wait(100)
-                
-                print("✅ 오디오 재생 완료!")
-                
-            except Exception as e:
-                print(f"❌ pygame 오디오 재생 오류: {e}")
-                # pygame 실패 시 aplay로 재시도
-                try:
-                    print("🔄 aplay로 재생 시도...")
-                    subprocess.run(['aplay', output_path], timeout=60)
-                    print("✅ 오디오 재생 완료! (aplay 사용)")
-                except Exception as e2:
-                    print(f"❌ aplay도 실패: {e2}")
-                    print("⚠️ 오디오 재생 실패. 파일은 생성되었습니다.")
-            
-            return True
-        else:
-            print(f"❌ TTS 실패 (종료 코드: {result.returncode})")
-            if result.stderr:
-                print(f"오류 메시지: {result.stderr.strip()}")
-            return False
-            
-    except Exception as e:
-        print(f"❌ TTS 실행 오류: {e}")
-        return False
-    finally:
-        if stopped_successfully:
-            start_llava()
+def request_photo_cancel():
+    """취소 버튼 - 진행 중인 사진 설명을 중단 (스트리밍 연결 닫기, 남은 문장 합성/재생 생략)"""
+    photo_cancel.set()
+    if analysis_running:
+        pygame.mixer.music.stop()
+        tts_scheduler.cancel_pending()
 
 def run_photo_analysis():
     """사진 촬영부터 분석, TTS까지의 전체 과정을 실행하는 함수 (음성 안내 포함)"""
+    global analysis_running
+    photo_cancel.clear()
+    analysis_running = True
+    try:
+        return photo_analysis_sequence()
+    finally:
+        analysis_running = False
+
+def photo_analysis_sequence():
     print("\n" + "="*20 + " 📸 사진 분석 시퀀스 시작 " + "="*20)
     
+    # 안내 음성이 나오는 동안 카메라 노출이 안정화되도록 먼저 예열
+    warm_up_camera()
+    
     # 촬영 시작 음성 안내
     play_cached_announcement(
         "사진 촬영을 준비합니다.",
         "photo_capture_ready.wav"
     )
     
-    captured_file = capture_image_from_webcam()
-    if not captured_file:
+    timings = {}
+    
+    # aiming → cheese 사운드 후 셔터
+    print("📸 사진 촬영 사운드 시퀀스 시작...")
+    play_photo_sound_sequence()
+    
+    shutter_time = time.time()
+    frame = capture_frame_from_webcam()
+    timings['capture_ms'] = (time.time() - shutter_time) * 1000
+    if frame is None:
         print("사진 촬영 실패. 분석을 중단합니다.")
         return
-
-    prompt = "이 사진에 무엇이 보이나요? 한 줄로 간단히 설명해주세요."
-    response_text = ask_llava_about_image(captured_file, prompt)
     
-    # 디버깅: 이미지 파일 존재 확인
-    if os.path.exists(captured_file):
-        file_size = os.path.getsize(captured_file)
-        print(f"📁 이미지 파일 크기: {file_size} bytes")
-    else:
-        print("❌ 이미지 파일이 존재하지 않습니다!")
+    # 같은 장면을 다시 찍었으면 캐시된 설명 음성을 바로 재생
+    frame_hash = dhash(frame)
+    cached = photo_cache.lookup(frame_hash)
+    if cached:
+        timings['cache_hit'] = True
+        print(f"\n💬 캐시된 답변: {cached['text'].strip()}")
+        open_braille_text(cached['text'])
+        play_audio_file(cached['audio'])
+        print("="*22 + " ✅ 시퀀스 종료 " + "="*22)
+        return timings
+    
+    start_time = time.time()
+    encoded_image = encode_frame_for_llava(frame)
+    timings['encode_ms'] = (time.time() - start_time) * 1000
+    if not encoded_image:
         return
+    print(f"📁 인코딩된 이미지 크기: {len(encoded_image) * 3 // 4} bytes")
 
-    if response_text:
-        text_to_speech(response_text)
+    # 1단계(CPU 탐지) 안내는 LLaVA 추론과 병렬로 진행되고, LLaVA 첫 문장이 나오면 대체됨
+    missing_clips = []
+    quick_label_clip = make_quick_label_clip_fn(frame, shutter_time, timings, missing_clips)
 
-    try:
-        os.remove(captured_file)
-        print(f"🗑️ 임시 파일 '{captured_file}'을(를) 삭제했습니다.")
-    except OSError as e:
-        print(f"❌ 임시 파일 삭제 오류: {e}")
+    prompt = "이 사진에 무엇이 보이나요? 한 줄로 간단히 설명해주세요."
+    start_time = time.time()
+    response_text, sentence_wavs, first_word_ms = stream_description_to_speech(
+        encoded_image, prompt, shutter_time, first_clip_fn=quick_label_clip)
+    timings['upload_inference_ms'] = (time.time() - start_time) * 1000
+    timings['shutter_to_first_word_ms'] = first_word_ms
+
+    print(f"⏱️ 촬영 {timings['capture_ms']:.0f}ms / 인코딩 {timings['encode_ms']:.0f}ms / "
+          f"분석+음성 {timings['upload_inference_ms']:.0f}ms")
+    if 'tier1_detect_ms' in timings:
+        print(f"⏱️ 1단계 탐지 {timings['tier1_detect_ms']:.0f}ms")
+    if first_word_ms is not None:
+        print(f"⏱️ 셔터 → 첫 음성 {first_word_ms:.0f}ms")
+
+    if response_text and sentence_wavs:
+        print(f"\n💬 LLaVA 답변: {response_text.strip()}")
+        # 답변 전체를 점자 페이지로 준비 (첫 페이지 표시, 이후 레버 4번으로 넘김)
+        open_braille_text(response_text)
+        # 문장별 음성을 하나로 합쳐 캐시에 저장
+        output_path = os.path.join(TTS_OUTPUT_DIR, "response.wav")
+        if concat_wav_files(sentence_wavs, output_path):
+            photo_cache.store(frame_hash, response_text, output_path)
+    for wav_path in sentence_wavs:
+        try:
+            os.remove(wav_path)
+        except OSError:
+            pass
+
+    # 이번에 처음 본 물체의 1단계 안내는 다음 촬영을 위해 백그라운드에서 합성 (기다리지 않음)
+    for text, wav_filename in missing_clips:
+        tts_scheduler.submit(text, os.path.join(TTS_CACHE_DIR, wav_filename), BACKGROUND)
         
     print("="*22 + " ✅ 시퀀스 종료 " + "="*22)
+    return timings
 
 # ===================================================================
 #                       MAIN FUNCTION
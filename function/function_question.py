@@ -3,7 +3,6 @@
 # ===================================================================
 import os
 import pygame
-import subprocess
 import time
 import wave
 import pyaudio
@@ -11,12 +10,14 @@ import tempfile
 import threading
 import queue
 import whisper
-import requests
+
+from ollama_client import ollama_client
+from memory_manager import memory_manager
+from tts_scheduler import tts_scheduler, INTERACTIVE
+from braille.braille_pager import open_braille_text
 
 # --- 질문 기능 설정 ---
 QUESTION_DIR = "/home/drboom/py_project/hanium_snowdream/function/question_data/"
-REF_AUDIO_PATH = "/home/drboom/py_project/shortform/route/kor_male.wav"
-GPT_SOVITS_DIR = "/home/drboom/py_project/GPT-SoVITS"
 
 # 오디오 녹음 설정
 CHUNK = 1024
@@ -33,11 +34,13 @@ recording_frames = []
 is_recording = False
 recording_thread = None
 recording_started = False  # 녹음이 시작되었는지 추적
+whisper_lock = threading.Lock()  # Whisper 모델은 동시에 transcribe할 수 없음 (유휴 시간 단어 시간표 계산과 공유)
 
 # 모델 로드 (한 번만 로드)
 try:
     # Whisper 모델 로드
     whisper_model = whisper.load_model("small")
+    memory_manager.mark_loaded('whisper')
     
     # TinyLlama 모델은 기존 방식 유지 (ollama serve는 이미 실행 중)
     phi_process = None
@@ -222,6 +225,10 @@ def process_recorded_audio(audio_file):
     # 2. LLM (질문 → 답변)
     print("🧠 2단계: TinyLlama로 답변 생성 중...")
     answer_text = ask_llama(question_text)
+    if not answer_text and ollama_client.last_error in ("unavailable", "connection"):
+        # 서버 연결 불가 안내는 클라이언트가 이미 재생함
+        print("❌ Ollama 서버 사용 불가 - 질문 처리 중단")
+        return
     if not answer_text:
         print("⚠️ TinyLlama 실패, 기본 답변 사용")
         answer_text = "죄송합니다. 질문을 이해하지 못했습니다. 다시 말씀해 주세요."
@@ -256,7 +263,9 @@ def speech_to_text(audio_file):
                 return None
         
         # Whisper 모델로 음성 인식
-        result = whisper_model.transcribe(audio_file)
+        memory_manager.mark_loaded('whisper')
+        with whisper_lock:
+            result = whisper_model.transcribe(audio_file)
         return result["text"].strip()
         
     except Exception as e:
@@ -265,33 +274,22 @@ def speech_to_text(audio_file):
 
 def ask_llama(question_text):
     """TinyLlama 모델로 질문에 답변합니다."""
-    try:
-        # TinyLlama 모델로 답변 생성
-        response = requests.post(
-            "http://localhost:11434/api/generate",
-            json={
-                "model": "tinyllama",
-                "prompt": f"질문: {question_text}\n답변:",
-                "stream": False
-            },
-            timeout=30
-        )
-        
-        if response.status_code == 200:
-            result = response.json()
-            answer = result.get("response", "").strip()
-            
-            if answer:
-                return answer
-            else:
-                print("TinyLlama 모델이 빈 답변을 반환했습니다")
-                return None
-        else:
-            print(f"TinyLlama API 오류: {response.status_code}")
-            return None
-            
-    except Exception as e:
-        print(f"TinyLlama 모델 오류: {e}")
+    # 공유 Ollama 클라이언트 사용 (서버 다운 시 즉시 실패)
+    memory_manager.mark_loaded('tinyllama')
+    answer = ollama_client.generate(
+        "tinyllama",
+        f"질문: {question_text}\n답변:",
+        timeout=30
+    )
+    if answer is None:
+        print(f"TinyLlama 모델 오류: {ollama_client.last_error}")
+        return None
+
+    answer = answer.strip()
+    if answer:
+        return answer
+    else:
+        print("TinyLlama 모델이 빈 답변을 반환했습니다")
         return None
 
 def generate_tts_for_answer(text, output_path):
@@ -299,22 +297,9 @@ def generate_tts_for_answer(text, output_path):
     try:
         print("🔊 GPT-SoVits TTS로 음성 변환 중...")
         
-        # GPT-SoVits TTS 실행
-        cmd = [
-            'conda', 'run', '-n', 'GPTSoVits', 'python', 'tts_cli.py',
-            '--text', text,
-            '--ref_audio', REF_AUDIO_PATH,
-            '--output', output_path
-        ]
+        # GPT-SoVits TTS 실행 (스케줄러 큐를 거쳐 대화형 우선순위로)
         print(f"📝 변환할 텍스트: '{text[:50]}...'")
-        result = subprocess.run(cmd, cwd=GPT_SOVITS_DIR, timeout=300, capture_output=True, text=True)
-        
-        if result.returncode == 0:
-            print(f"✅ TTS 변환 완료: {output_path}")
-            return True
-        else:
-            print(f"❌ TTS 변환 실패: {result.stderr}")
-            return False
+        return tts_scheduler.synthesize(text, output_path, INTERACTIVE)
             
     except Exception as e:
         print(f"❌ TTS 실행 오류: {e}")
@@ -337,6 +322,9 @@ def play_wav_file(wav_path):
 
 def stream_tts_answer(answer_text):
     """답변을 문장 단위로 스트리밍 TTS 처리합니다."""
+    # 답변 전체를 점자 페이지로 준비 (첫 페이지 표시, 이후 레버 4번으로 넘김)
+    open_braille_text(answer_text)
+    
     try:
         print("🔄 스트리밍 TTS 시작...")
         
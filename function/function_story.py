@@ -3,18 +3,28 @@
 # ===================================================================
 import os
 import pygame
-import subprocess
 import time
 
+from tts_scheduler import tts_scheduler, INTERACTIVE, READ_AHEAD
+from function.story_index import story_index
+from function.story_pack import pack_story, play_packed_story, play_packed_line, line_audio_available, is_pack_fresh
+from function.audio_store import resolve_audio
+from function.phrase_composer import phrase_composer
+from function.word_timing import word_timing, braille_follower
+from navigation_system import nav_manager
+
 # --- 동화 설정 ---
 TEXTBOOK_DIR = "/home/drboom/py_project/hanium_snowdream/function/function_textbook/"
-REF_AUDIO_PATH = "/home/drboom/py_project/shortform/route/kor_male.wav"
-GPT_SOVITS_DIR = "/home/drboom/py_project/GPT-SoVITS"
 
 # 동화 선택 상태
 current_story_index = 0
 current_language = "kor"  # 기본값: 한국어
+LANGUAGE_NAMES = {"kor": "한국어", "eng": "영어"}
+READ_AHEAD_LINES = 2  # 재생 중에 미리 합성해 둘 다음 줄 수 (다른 언어도 같은 위치를 함께 준비)
+CANCEL_SIGNAL_FILE = "/tmp/cancel_story_signal.txt"
+LANGUAGE_SIGNAL_FILE = "/tmp/story_language_signal.txt"
 available_stories = []
+story_playing = False  # 동화 내용 재생 중이면 언어 전환을 신호 파일로 전달
 
 # pygame 초기화
 pygame.mixer.init()
@@ -24,84 +34,127 @@ pygame.mixer.init()
 # ===================================================================
 
 def get_available_stories():
-    """사용 가능한 동화 목록을 반환합니다."""
-    stories = []
-    if os.path.exists(TEXTBOOK_DIR):
-        for item in os.listdir(TEXTBOOK_DIR):
-            story_dir = os.path.join(TEXTBOOK_DIR, item)
-            if os.path.isdir(story_dir):
-                # kor, eng 파일이 모두 있는지 확인
-                kor_file = os.path.join(story_dir, f"{item}_kor.txt")
-                eng_file = os.path.join(story_dir, f"{item}_eng.txt")
-                if os.path.exists(kor_file) and os.path.exists(eng_file):
-                    stories.append(item)
-    return stories
+    """사용 가능한 동화 목록을 반환합니다. (인덱스에서 변경된 부분만 갱신)"""
+    story_index.refresh()
+    return story_index.story_names()
 
 def read_story_file(story_name, language):
-    """동화 파일을 읽어서 줄별로 반환합니다."""
-    file_path = os.path.join(TEXTBOOK_DIR, story_name, f"{story_name}_{language}.txt")
-    if not os.path.exists(file_path):
-        print(f"❌ 동화 파일을 찾을 수 없습니다: {file_path}")
-        return None
-    
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-        return [line.strip() for line in lines if line.strip()]
-    except Exception as e:
-        print(f"❌ 동화 파일 읽기 오류: {e}")
-        return None
+    """동화 파일을 줄별로 반환합니다. (인덱스에 캐시된 줄 목록 사용)"""
+    lines = story_index.lines(story_name, language)
+    if lines is None:
+        # 인덱스에 없으면 디스크 변경을 확인한 뒤 한 번 더 조회
+        story_index.refresh(force=True)
+        lines = story_index.lines(story_name, language)
+    if lines is None:
+        print(f"❌ 동화 파일을 찾을 수 없습니다: {story_name}_{language}.txt")
+    return lines
 
 def create_wav_filename(story_name, language, line_number):
     """WAV 파일명을 생성합니다."""
     return f"{story_name}_{language}_{line_number}.wav"
 
 def check_wav_exists(story_name, language, line_number):
-    """WAV 파일이 존재하는지 확인합니다."""
-    wav_dir = os.path.join(TEXTBOOK_DIR, story_name)
-    wav_file = os.path.join(wav_dir, create_wav_filename(story_name, language, line_number))
-    return os.path.exists(wav_file)
+    """줄 음성이 있는지 확인합니다. (줄별 파일 또는 묶음 파일, 인덱스 조회)"""
+    return line_audio_available(story_name, language, line_number)
 
-def generate_tts_for_line(text, output_path):
-    """한 줄의 텍스트를 TTS로 변환합니다."""
+def generate_tts_for_line(text, output_path, priority=INTERACTIVE):
+    """한 줄의 텍스트를 TTS로 변환합니다. (스케줄러 큐를 거쳐 실행)"""
     try:
-        cmd = [
-            'conda', 'run', '-n', 'GPTSoVits', 'python', 'tts_cli.py',
-            '--text', text,
-            '--ref_audio', REF_AUDIO_PATH,
-            '--output', output_path
-        ]
-        print(f"🔊 TTS 생성 중: '{text[:30]}...'")
-        result = subprocess.run(cmd, cwd=GPT_SOVITS_DIR, timeout=300, capture_output=True, text=True)
-        
-        if result.returncode == 0:
-            print(f"✅ TTS 생성 완료: {output_path}")
-            return True
-        else:
-            print(f"❌ TTS 생성 실패: {result.stderr}")
-            return False
+        return tts_scheduler.synthesize(text, output_path, priority)
             
     except Exception as e:
         print(f"❌ TTS 실행 오류: {e}")
         return False
 
-def check_cancel_signal():
-    """취소 신호를 확인합니다."""
-    cancel_signal_file = "/tmp/cancel_story_signal.txt"
+def other_language(language):
+    """한국어 ↔ 영어"""
+    return next(other for other in LANGUAGE_NAMES if other != language)
+
+def queue_line_synthesis(story_name, language, lines, first, last):
+    """first~last 줄 중 음성이 없는 줄을 미리 읽기 우선순위로 합성 요청"""
+    wav_dir = os.path.join(TEXTBOOK_DIR, story_name)
+    for number in range(max(1, first), min(last, len(lines)) + 1):
+        if check_wav_exists(story_name, language, number):
+            continue
+        wav_path = os.path.join(wav_dir, create_wav_filename(story_name, language, number))
+        tts_scheduler.submit(
+            lines[number - 1], wav_path, READ_AHEAD,
+            on_done=lambda success, n=number: success and story_index.record_line_audio(story_name, language, n))
+
+def queue_read_ahead(story_name, language, lines, current):
+    """
+    현재 줄을 재생하는 동안 다음 줄들을 미리 합성 요청
+    다른 언어도 같은 위치부터 준비해 두어 언어 전환이 합성 대기 없이 바로 재생되게 함
+    """
+    queue_line_synthesis(story_name, language, lines, current + 1, current + READ_AHEAD_LINES)
+    other = other_language(language)
+    other_lines = story_index.lines(story_name, other)
+    if other_lines:
+        aligned = story_index.aligned_line(story_name, language, other, current)
+        queue_line_synthesis(story_name, other, other_lines, aligned, aligned + READ_AHEAD_LINES)
+
+def check_signal_file(signal_file):
+    """신호 파일에 "1"이 있으면 리셋하고 True를 반환합니다."""
     try:
-        if os.path.exists(cancel_signal_file):
-            with open(cancel_signal_file, 'r') as f:
+        if os.path.exists(signal_file):
+            with open(signal_file, 'r') as f:
                 signal = f.read().strip()
             if signal == "1":
                 # 신호 리셋
-                with open(cancel_signal_file, 'w') as f:
+                with open(signal_file, 'w') as f:
                     f.write("0")
                 return True
     except:
         pass
     return False
 
-def play_wav_file(wav_path):
+def check_cancel_signal():
+    """취소 신호를 확인합니다."""
+    return check_signal_file(CANCEL_SIGNAL_FILE)
+
+def check_language_signal():
+    """언어 전환 신호를 확인합니다."""
+    return check_signal_file(LANGUAGE_SIGNAL_FILE)
+
+def is_story_playing():
+    """동화 내용을 재생 중인지 (언어 전환을 신호 파일로 전달해야 하는지)"""
+    return story_playing
+
+def request_story_cancel():
+    """재생 중인 동화 중단 신호 전송 (재생 루프가 신호 파일을 확인해 멈춤)"""
+    try:
+        with open(CANCEL_SIGNAL_FILE, 'w') as f:
+            f.write("1")
+        print("📢 동화 재생 중단 신호 전송")
+    except OSError as e:
+        print(f"❌ 동화 재생 중단 신호 전송 실패: {e}")
+
+def request_language_toggle():
+    """
+    한국어/영어 전환 (조이스틱 신호 '4')
+    재생 중이면 신호 파일로 알려 같은 위치에서 다른 언어로 이어 읽고,
+    재생 중이 아니면 다음에 읽을 언어만 바꿉니다.
+    """
+    global current_language
+    if story_playing:
+        try:
+            with open(LANGUAGE_SIGNAL_FILE, 'w') as f:
+                f.write("1")
+            print("🌐 언어 전환 신호 전송")
+        except OSError as e:
+            print(f"❌ 언어 전환 신호 전송 실패: {e}")
+        return
+    
+    current_language = other_language(current_language)
+    print(f"🌐 읽기 언어 변경: {LANGUAGE_NAMES[current_language]}")
+    language_wav = phrase_composer.render("{language}로 읽어드립니다",
+                                          language=LANGUAGE_NAMES[current_language])
+    if language_wav:
+        play_wav_file(str(language_wav))
+    if available_stories:
+        notify_story_cursor()
+
+def play_wav_file(wav_path, should_stop=check_cancel_signal):
     """WAV 파일을 재생합니다. (취소 버튼 감지 가능)"""
     try:
         pygame.mixer.music.load(wav_path)
@@ -110,8 +163,8 @@ def play_wav_file(wav_path):
         # 재생이 끝날 때까지 대기 (취소 버튼 감지)
         while pygame.mixer.music.get_busy():
             # 취소 신호 확인
-            if check_cancel_signal():
-                print("⏹️  취소 버튼 감지! 동화 재생을 중단합니다.")
+            if should_stop():
+                print("⏹️  동화 재생을 중단합니다.")
                 pygame.mixer.music.stop()
                 return False
             pygame.time.wait(50)  # 더 빠른 반응을 위해 50ms로 단축
@@ -122,67 +175,125 @@ def play_wav_file(wav_path):
         return False
 
 def read_story_title(story_name, language):
-    """동화 제목을 읽어줍니다."""
-    title_text = f"동화 제목 : {language} {story_name}"
-    title_wav = os.path.join(TEXTBOOK_DIR, story_name, f"{story_name}_{language}_title.wav")
-    
-    # 제목 WAV 파일이 없으면 생성
-    if not os.path.exists(title_wav):
-        print(f"📖 동화 제목 TTS 생성 중: '{title_text}'")
-        if generate_tts_for_line(title_text, title_wav):
-            print("✅ 제목 TTS 생성 완료")
-        else:
-            print("❌ 제목 TTS 생성 실패")
-            return False
+    """동화 제목을 읽어줍니다. (조각 음성 조립)"""
+    title_wav = phrase_composer.render("동화 제목 {language} {story}",
+                                       language=LANGUAGE_NAMES.get(language, language), story=story_name)
+    if not title_wav:
+        print("❌ 제목 안내 음성 준비 실패")
+        return False
     
     # 제목 재생
-    print(f"📖 동화 제목 재생: {title_text}")
-    return play_wav_file(title_wav)
+    print(f"📖 동화 제목 재생: {language} {story_name}")
+    return play_wav_file(str(title_wav))
 
 def read_story_content(story_name, language):
-    """동화 내용을 한 줄씩 읽어줍니다. (취소 기능 지원)"""
-    lines = read_story_file(story_name, language)
-    if not lines:
-        return False
+    """
+    동화 내용을 한 줄씩 읽어줍니다. (취소 / 언어 전환 지원)
+    언어 전환 신호가 오면 줄 대응표로 같은 위치를 찾아 다른 언어로 이어 읽습니다.
+    """
+    global current_language, story_playing
+    check_language_signal()  # 이전에 남은 전환 신호 제거
+    start_line = 1
+    story_playing = True
+    braille_follower.begin_story()
+    try:
+        while True:
+            lines = read_story_file(story_name, language)
+            if not lines:
+                return False
+            
+            completed, last_line, reason = play_story_track(story_name, language, lines, start_line)
+            if reason == 'switch':
+                target = other_language(language)
+                start_line = story_index.aligned_line(story_name, language, target, last_line)
+                print(f"🌐 {LANGUAGE_NAMES[target]}로 전환: {last_line}번째 줄 → {start_line}번째 줄")
+                language = current_language = target
+                continue
+            if not completed:
+                print(f"⏹️  동화 읽기가 취소되었습니다. ({last_line}번째 줄)")
+                return False
+            break
+    finally:
+        story_playing = False
+        braille_follower.stop()
+    
+    print("✅ 동화 읽기 완료!")
+    # 이번에 모든 줄 음성이 준비되었으면 다음부터는 묶음 파일로 재생 (두 언어 모두)
+    for packed_language in LANGUAGE_NAMES:
+        if not is_pack_fresh(story_name, packed_language):
+            pack_story(story_name, packed_language)
+    return True
+
+def play_story_track(story_name, language, lines, start_line=1):
+    """
+    한 언어로 start_line부터 끝까지 재생합니다.
+    반환값: (끝까지 재생했는지, 마지막 줄 번호, 중단 이유 None/'cancel'/'switch')
+    """
+    interrupt = {'reason': None}
+    
+    def should_stop():
+        if check_cancel_signal():
+            interrupt['reason'] = 'cancel'
+        elif check_language_signal():
+            interrupt['reason'] = 'switch'
+        return interrupt['reason'] is not None
+    
+    def on_line_start(number):
+        print(f"📖 {number}번째 줄 재생 중...")
+        # 저장된 단어 시간표로 점자 페이지를 읽는 위치에 맞춰 넘김
+        line = lines[number - 1]
+        braille_follower.start_line(line, word_timing.line_timing(story_name, language, number, line))
+        queue_read_ahead(story_name, language, lines, number)
+    
+    # 모든 줄 음성이 준비된 동화는 묶음 파일 하나로 끊김 없이 재생 (전환 시에는 해당 줄로 이동)
+    packed = play_packed_story(story_name, language, start_line=start_line,
+                               should_stop=should_stop, on_line_start=on_line_start)
+    if packed is not None:
+        completed, last_line = packed
+        return completed, last_line, interrupt['reason']
     
     wav_dir = os.path.join(TEXTBOOK_DIR, story_name)
     
-    for i, line in enumerate(lines, 1):
-        # 각 줄 시작 전에 취소 신호 확인
-        if check_cancel_signal():
-            print("⏹️  동화 읽기가 취소되었습니다.")
-            return False
+    for i in range(start_line, len(lines) + 1):
+        line = lines[i - 1]
+        # 각 줄 시작 전에 취소 / 전환 신호 확인
+        if should_stop():
+            return False, max(start_line, i - 1), interrupt['reason']
             
         wav_filename = create_wav_filename(story_name, language, i)
         wav_path = os.path.join(wav_dir, wav_filename)
         
         # WAV 파일이 없으면 TTS 생성
-        if not os.path.exists(wav_path):
+        if not check_wav_exists(story_name, language, i):
             print(f"📖 {i}번째 줄 TTS 생성 중...")
             if not generate_tts_for_line(line, wav_path):
                 print(f"❌ {i}번째 줄 TTS 생성 실패")
                 continue
+            story_index.record_line_audio(story_name, language, i)
         
-        # WAV 파일 재생
-        print(f"📖 {i}번째 줄 재생 중...")
-        play_result = play_wav_file(wav_path)
+        # 이 줄을 듣는 동안 다음 줄 합성 (같은 줄을 바로 요청하면 대화형으로 올라감)
+        on_line_start(i)
+        
+        # 줄 음성 재생 (WAV/FLAC/Opus 파일은 스트리밍 디코딩, 없으면 묶음 파일에서)
+        line_audio = resolve_audio(wav_path)
+        if line_audio:
+            play_result = play_wav_file(line_audio, should_stop=should_stop)
+        else:
+            play_result = play_packed_line(story_name, language, i, should_stop=should_stop)
         if not play_result:
-            # False가 반환되면 취소 또는 오류
-            if check_cancel_signal() or play_result is False:
-                print("⏹️  동화 읽기가 중단되었습니다.")
-                return False
+            # False가 반환되면 취소 / 전환 또는 오류
+            if interrupt['reason'] or should_stop() or play_result is False:
+                return False, i, interrupt['reason'] or 'cancel'
             print(f"❌ {i}번째 줄 재생 실패")
             continue
         
-        # 줄 간 대기 중에도 취소 신호 확인
+        # 줄 간 대기 중에도 취소 / 전환 신호 확인
         for _ in range(5):  # 0.5초를 0.1초씩 5번으로 분할
-            if check_cancel_signal():
-                print("⏹️  동화 읽기가 취소되었습니다.")
-                return False
+            if should_stop():
+                return False, i, interrupt['reason']
             time.sleep(0.1)
     
-    print("✅ 동화 읽기 완료!")
-    return True
+    return True, len(lines), None
 
 # ===================================================================
 #                      MAIN FUNCTIONS
@@ -196,7 +307,8 @@ def start_story_mode():
     print("📚 동화 모드 시작")
     print("---" * 15)
     
-    # 사용 가능한 동화 목록 가져오기
+    # 사용 가능한 동화 목록 가져오기 (폴더 감시는 처음 한 번만 시작)
+    story_index.start_watching()
     available_stories = get_available_stories()
     if not available_stories:
         print("❌ 사용 가능한 동화가 없습니다.")
@@ -204,6 +316,7 @@ def start_story_mode():
     
     current_story_index = 0
     print(f"📚 사용 가능한 동화: {', '.join(available_stories)}")
+    notify_story_cursor()
     
     # 현재 보유 중인 동화책 안내
     announce_available_stories()
@@ -211,149 +324,38 @@ def start_story_mode():
     # 첫 번째 동화 제목 읽기
     announce_current_story()
 
-def create_announcement_parts():
-    """동화 안내에 필요한 기본 WAV 파일들을 생성합니다."""
-    announcement_dir = os.path.join(TEXTBOOK_DIR, "announcements")
-    os.makedirs(announcement_dir, exist_ok=True)
-    
-    # 기본 문구들
-    parts = {
-        "prefix": "사용가능한",
-        "suffix": "입니다"
-    }
-    
-    for part_name, text in parts.items():
-        wav_path = os.path.join(announcement_dir, f"{part_name}.wav")
-        if not os.path.exists(wav_path):
-            print(f"📢 {part_name} TTS 생성 중: '{text}'")
-            if generate_tts_for_line(text, wav_path):
-                print(f"✅ {part_name} TTS 생성 완료")
-            else:
-                print(f"❌ {part_name} TTS 생성 실패")
-                return False
-    
-    return True
-
-def create_story_title_wavs():
-    """각 동화 제목의 WAV 파일을 생성합니다."""
-    announcement_dir = os.path.join(TEXTBOOK_DIR, "announcements")
-    os.makedirs(announcement_dir, exist_ok=True)
-    
-    for story in available_stories:
-        wav_path = os.path.join(announcement_dir, f"story_{story}.wav")
-        if not os.path.exists(wav_path):
-            print(f"📖 동화 제목 TTS 생성 중: '{story}'")
-            if generate_tts_for_line(story, wav_path):
-                print(f"✅ '{story}' TTS 생성 완료")
-            else:
-                print(f"❌ '{story}' TTS 생성 실패")
-                return False
-    
-    return True
-
-def combine_wav_files(wav_files, output_path):
-    """여러 WAV 파일을 하나로 합성합니다."""
-    try:
-        import wave
-        import numpy as np
-        
-        # 모든 WAV 파일을 읽어서 합성
-        combined_data = []
-        sample_rate = None
-        
-        for wav_file in wav_files:
-            if os.path.exists(wav_file):
-                with wave.open(wav_file, 'rb') as wf:
-                    if sample_rate is None:
-                        sample_rate = wf.getframerate()
-                        channels = wf.getnchannels()
-                        sample_width = wf.getsampwidth()
-                    
-                    data = wf.readframes(wf.getnframes())
-                    combined_data.append(data)
-        
-        # 합성된 데이터를 하나의 WAV 파일로 저장
-        with wave.open(output_path, 'wb') as wf:
-            wf.setnchannels(channels)
-            wf.setsampwidth(sample_width)
-            wf.setframerate(sample_rate)
-            wf.writeframes(b''.join(combined_data))
-        
-        return True
-    except Exception as e:
-        print(f"❌ WAV 파일 합성 오류: {e}")
-        return False
-
 def announce_available_stories():
-    """현재 보유 중인 동화책을 TTS로 안내합니다."""
+    """현재 보유 중인 동화책을 TTS로 안내합니다. (동화 제목 조각을 이어 붙임)"""
     if not available_stories:
         return False
     
-    # 기본 문구 WAV 파일들 생성
-    if not create_announcement_parts():
-        return False
-    
-    # 각 동화 제목 WAV 파일들 생성
-    if not create_story_title_wavs():
+    final_wav = phrase_composer.render("사용가능한 {stories} 입니다", stories=available_stories)
+    if not final_wav:
+        print("❌ 동화 목록 안내 음성 준비 실패")
         return False
     
-    # 합성할 WAV 파일 목록 생성
-    announcement_dir = os.path.join(TEXTBOOK_DIR, "announcements")
-    wav_files = []
-    
-    # "사용가능한"
-    wav_files.append(os.path.join(announcement_dir, "prefix.wav"))
-    
-    # 각 동화 제목들
-    for story in available_stories:
-        wav_files.append(os.path.join(announcement_dir, f"story_{story}.wav"))
-    
-    # "입니다"
-    wav_files.append(os.path.join(announcement_dir, "suffix.wav"))
-    
-    # 최종 합성 파일 경로
-    final_wav = os.path.join(announcement_dir, "available_stories_combined.wav")
-    
-    # 합성된 파일이 없으면 생성
-    if not os.path.exists(final_wav):
-        print("🔗 동화 목록 WAV 파일 합성 중...")
-        if combine_wav_files(wav_files, final_wav):
-            print("✅ 동화 목록 WAV 파일 합성 완료")
-        else:
-            print("❌ 동화 목록 WAV 파일 합성 실패")
-            return False
-    
-    # 합성된 파일 재생
     story_list = ", ".join(available_stories)
     print(f"📢 동화책 목록 재생: 사용가능한 동화는 {story_list}입니다.")
-    return play_wav_file(final_wav)
+    return play_wav_file(str(final_wav))
 
 def announce_current_story():
-    """현재 선택된 동화의 제목을 읽어줍니다."""
+    """현재 선택된 동화의 제목을 읽어줍니다. (동화마다 조각 하나만 합성)"""
     if not available_stories:
         return False
     
     current_story = available_stories[current_story_index]
-    story_title_text = f"선택된 동화는 {current_story}입니다."
-    
-    # 동화 안내 WAV 파일을 저장할 디렉토리 생성
-    announcement_dir = os.path.join(TEXTBOOK_DIR, "announcements")
-    os.makedirs(announcement_dir, exist_ok=True)
-    
-    title_wav = os.path.join(announcement_dir, f"selected_story_{current_story_index}.wav")
-    
-    # 제목 WAV 파일이 없으면 생성
-    if not os.path.exists(title_wav):
-        print(f"📖 동화 제목 TTS 생성 중: '{story_title_text}'")
-        if generate_tts_for_line(story_title_text, title_wav):
-            print("✅ 제목 TTS 생성 완료")
-        else:
-            print("❌ 제목 TTS 생성 실패")
-            return False
+    title_wav = phrase_composer.render("선택된 동화는 {story}입니다", story=current_story)
+    if not title_wav:
+        print("❌ 선택 안내 음성 준비 실패")
+        return False
     
-    # 제목 재생
-    print(f"📖 동화 제목 재생: {story_title_text}")
-    return play_wav_file(title_wav)
+    print(f"📖 동화 제목 재생: 선택된 동화는 {current_story}입니다.")
+    return play_wav_file(str(title_wav))
+
+def notify_story_cursor():
+    """선택된 동화가 바뀌었음을 알림 (제목/앞부분 음성 미리 준비)"""
+    nav_manager.notify_cursor('story', available_stories[current_story_index], language=current_language,
+                              language_name=LANGUAGE_NAMES.get(current_language, current_language))
 
 def select_next_story():
     """다음 동화를 선택합니다."""
@@ -363,6 +365,7 @@ def select_next_story():
     
     current_story_index = (current_story_index + 1) % len(available_stories)
     print(f"➡️ 다음 동화로 이동: {available_stories[current_story_index]}")
+    notify_story_cursor()
     announce_current_story()
 
 def select_previous_story():
@@ -373,6 +376,7 @@ def select_previous_story():
     
     current_story_index = (current_story_index - 1) % len(available_stories)
     print(f"⬅️ 이전 동화로 이동: {available_stories[current_story_index]}")
+    notify_story_cursor()
     announce_current_story()
 
 def read_selected_story():
@@ -388,6 +392,7 @@ def read_selected_story():
 def read_story(story_name, language):
     """동화를 읽어줍니다."""
     print(f"\n📖 '{story_name}' 동화를 읽어드립니다...")
+    check_cancel_signal()  # 이전 취소 버튼에서 남은 신호 제거 (제목부터 바로 멈추지 않도록)
     
     # 1. 제목 읽기
     if not read_story_title(story_name, language):
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+읽기 학습 커리큘럼 컴파일러
+- function_read.txt(===N단계=== / "1. 단어")를 한 번만 파싱해 JSON 산출물로 저장
+- 단계 수 제한 없음 (헤더의 숫자 순서대로, 숫자가 없으면 나온 순서대로 번호 부여)
+- 단어마다 점자 문자열, 10칸 셀 번호, 단계 안에서 이전 단어 → 이 단어 모터 이동량, 음성 캐시 키 / 길이를 미리 계산
+- 원본 파일의 크기 / 수정 시각이 같으면 산출물을 그대로 로드 (수 ms), 다르면 해시로 내용 변경 확인
+- 점자 변환기 소스가 바뀌면 (점자 / 셀 / 이동량 계산이 달라질 수 있으므로) 다시 컴파일
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+from pathlib import Path
+
+from function.audio_store import audio_store, resolve_audio
+
+CURRICULUM_SOURCE = Path(__file__).parent / "function_study" / "function_read.txt"
+CURRICULUM_ARTIFACT = Path(__file__).parent / "function_study" / "curriculum.json"
+WORD_AUDIO_DIR = Path(__file__).parent / "audio_prompts"
+TRANSLATOR_SOURCE = Path(__file__).parent.parent / "braille" / "braille_translator.py"
+CURRICULUM_VERSION = 2
+BRAILLE_CELLS = 10           # 점자 모듈 칸 수
+BLANK_CELL = '88'            # 빈 칸 셀 번호
+STAGE_HEADER = re.compile(r"^===(.*)===$")
+STAGE_NUMBER = re.compile(r"(\d+)\s*단계")
+WORD_LINE = re.compile(r"^\d+\s*\.\s*(.+)$")
+
+
+def word_audio_key(word):
+    """단어 음성 파일 이름 (기존 word_<단어>.wav 캐시와 같은 이름)"""
+    return f"word_{word}.wav"
+
+
+def source_signature(source_path):
+    """원본 파일의 (크기, 수정 시각) - 변경 확인용"""
+    stat = os.stat(source_path)
+    return [stat.st_size, stat.st_mtime]
+
+
+def content_hash(raw):
+    return hashlib.sha1(raw).hexdigest()[:16]
+
+
+def translator_signature(translator_path=TRANSLATOR_SOURCE):
+    """점자 변환기 소스 해시 - 산출물의 점자 / 셀 / 이동량이 어떤 변환기로 계산됐는지"""
+    try:
+        with open(translator_path, 'rb') as f:
+            return content_hash(f.read())
+    except OSError:
+        return None
+
+
+# ===================================================================
+#                              PARSER
+# ===================================================================
+
+def parse_curriculum(text):
+    """
+    커리큘럼 텍스트 → [(단계 번호, 단계 이름, [단어, ...]), ...]
+    헤더 예: ===1단계===, ===12단계: 받침===  /  단어 예: 1. 강
+    """
+    stages = []
+    for raw_line in text.split('\n'):
+        line = raw_line.strip()
+        header = STAGE_HEADER.match(line)
+        if header:
+            title = header.group(1).strip()
+            number = STAGE_NUMBER.search(title)
+            stage = int(number.group(1)) if number else (stages[-1][0] + 1 if stages else 1)
+            stages.append((stage, title, []))
+            continue
+        word = WORD_LINE.match(line)
+        if word and stages:
+            stages[-1][2].append(word.group(1).strip())
+    stages.sort(key=lambda entry: entry[0])
+    return stages
+
+
+# ===================================================================
+#                             COMPILER
+# ===================================================================
+
+def word_cells(translator, word):
+    """단어 → (점자 문자열, 10칸 셀 번호 목록) - 모자라면 빈 칸으로 채움"""
+    braille = translator.translate_text(word)
+    cells = translator.convert_braille_to_number(braille)
+    return braille, cells + [BLANK_CELL] * (BRAILLE_CELLS - len(cells))
+
+
+def word_audio_duration(audio_dir, word):
+    """캐시된 단어 음성 길이(초), 아직 합성되지 않았으면 None"""
+    stored_path = resolve_audio(Path(audio_dir) / word_audio_key(word))
+    return audio_store.duration(stored_path) if stored_path else None
+
+
+def compile_curriculum(source_path=CURRICULUM_SOURCE, artifact_path=CURRICULUM_ARTIFACT,
+                       audio_dir=WORD_AUDIO_DIR):
+    """커리큘럼 텍스트를 파싱해 산출물(JSON)로 저장하고 그 내용을 반환 (실패 시 None)"""
+    from braille.braille_translator import BrailleTranslator
+
+    start = time.time()
+    try:
+        with open(source_path, 'rb') as f:
+            raw = f.read()
+    except OSError as e:
+        print(f"❌ 커리큘럼 파일을 읽을 수 없습니다: {e}")
+        return None
+
+    translator = BrailleTranslator(connect=False)
+    stages = []
+    for stage, title, words in parse_curriculum(raw.decode('utf-8')):
+        entries = []
+        previous_cells = None
+        for word in words:
+            braille, cells = word_cells(translator, word)
+            entries.append({
+                'word': word,
+                'braille': braille,
+                'cells': cells,
+                # 단계 안에서 순서대로 진행할 때의 모터 이동량 (첫 단어는 현재 상태에 따라 달라서 None)
+                'transition': translator.calculate_state_transition(previous_cells, cells)
+                              if previous_cells else None,
+                'audio_key': word_audio_key(word),
+                'duration': word_audio_duration(audio_dir, word),
+            })
+            previous_cells = cells
+        stages.append({'stage': stage, 'title': title, 'words': entries})
+
+    curriculum = {
+        'version': CURRICULUM_VERSION,
+        'source_signature': source_signature(source_path),
+        'source_hash': content_hash(raw),
+        'translator_signature': translator_signature(),
+        'stages': stages,
+    }
+    save_curriculum(curriculum, artifact_path)
+    word_count = sum(len(stage['words']) for stage in stages)
+    print(f"📚 커리큘럼 컴파일: {len(stages)}단계, 단어 {word_count}개 ({(time.time() - start) * 1000:.0f}ms)")
+    return curriculum
+
+
+def save_curriculum(curriculum, artifact_path=CURRICULUM_ARTIFACT):
+    """산출물 저장 (임시 파일에 쓴 뒤 교체)"""
+    temp_path = str(artifact_path) + ".tmp"
+    try:
+        os.makedirs(os.path.dirname(str(artifact_path)), exist_ok=True)
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(curriculum, f, ensure_ascii=False)
+        os.replace(temp_path, str(artifact_path))
+    except OSError as e:
+        print(f"⚠️ 커리큘럼 산출물 저장 실패: {e}")
+
+
+def load_curriculum(source_path=CURRICULUM_SOURCE, artifact_path=CURRICULUM_ARTIFACT,
+                    audio_dir=WORD_AUDIO_DIR):
+    """
+    산출물이 최신이면 그대로 로드, 아니면 다시 컴파일
+    수정 시각만 바뀌고 내용(해시)이 같으면 서명만 갱신해 그대로 사용
+    """
+    try:
+        with open(artifact_path, 'r', encoding='utf-8') as f:
+            curriculum = json.load(f)
+        if curriculum.get('version') == CURRICULUM_VERSION and \
+                curriculum.get('translator_signature') == translator_signature():
+            signature = source_signature(source_path)
+            if curriculum.get('source_signature') == signature:
+                return curriculum
+            with open(source_path, 'rb') as f:
+                if curriculum.get('source_hash') == content_hash(f.read()):
+                    curriculum['source_signature'] = signature
+                    save_curriculum(curriculum, artifact_path)
+                    return curriculum
+    except (OSError, ValueError):
+        pass
+    return compile_curriculum(source_path, artifact_path, audio_dir)
+
+
+# ===================================================================
+#                          CURRICULUM VIEW
+# ===================================================================
+
+class Curriculum:
+    def __init__(self, data, artifact_path=CURRICULUM_ARTIFACT):
+        """로드된 커리큘럼 조회 (단계 번호 → 단어 항목)"""
+        self.data = data
+        self.artifact_path = artifact_path
+        self.stages = {stage['stage']: stage for stage in data['stages']}
+
+    def stage_numbers(self):
+        return sorted(self.stages)
+
+    def words(self, stage):
+        """단계의 단어 목록 (문자열)"""
+        return [entry['word'] for entry in self.entries(stage)]
+
+    def entries(self, stage):
+        stage_data = self.stages.get(stage)
+        return stage_data['words'] if stage_data else []
+
+    def entry(self, stage, index):
+        entries = self.entries(stage)
+        return entries[index] if 0 <= index < len(entries) else None
+
+    def record_audio(self, stage, index, audio_dir=WORD_AUDIO_DIR):
+        """단어 음성이 새로 합성되면 길이를 기록해 산출물에 반영"""
+        entry = self.entry(stage, index)
+        if not entry or entry['duration'] is not None:
+            return
+        entry['duration'] = word_audio_duration(audio_dir, entry['word'])
+        if entry['duration'] is not None:
+            save_curriculum(self.data, self.artifact_path)
+
+
+# 편의 함수들
+def open_curriculum():
+    """최신 커리큘럼 (없거나 읽을 수 없으면 None)"""
+    data = load_curriculum()
+    return Curriculum(data) if data else None
+
+if __name__ == "__main__":
+    # python -m function.learning_curriculum → 강제로 다시 컴파일
+    print("읽기 커리큘럼 컴파일")
+    compiled = compile_curriculum()
+    if compiled:
+        start = time.time()
+        curriculum = open_curriculum()
+        print(f"로드: {(time.time() - start) * 1000:.1f}ms, 단계: {curriculum.stage_numbers()}")
+        for number in curriculum.stage_numbers():
+            print(f"  {number}단계: {curriculum.words(number)}")
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+사진 설명 캐시
+- 촬영 프레임의 지각 해시(dHash, 64비트)를 키로 사용
+- 해밍 거리가 임계값 이하면 같은 장면으로 보고 LLaVA 설명 + 합성 음성을 그대로 재사용
+- 크기가 제한된 LRU (오래 안 쓴 항목부터 음성 파일과 함께 삭제)
+"""
+
+import os
+import json
+import time
+import shutil
+import threading
+from collections import OrderedDict
+import cv2
+
+from function.audio_store import audio_store, resolve_audio
+
+PHOTO_CACHE_DIR = "/home/drboom/py_project/hanium_snowdream/function/photo_cache/"
+MAX_ENTRIES = 64          # 최대 캐시 항목 수
+HAMMING_THRESHOLD = 6     # 64비트 중 몇 비트까지 다르면 같은 장면으로 볼지
+
+
+def dhash(frame, hash_size=8):
+    """차분 해시(dHash): 가로로 인접한 픽셀 밝기 비교 → hash_size² 비트 정수"""
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+    small = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    diff = small[:, 1:] > small[:, :-1]
+    value = 0
+    for bit in diff.flatten():
+        value = (value << 1) | int(bit)
+    return value
+
+
+def hamming_distance(a, b):
+    """두 해시의 다른 비트 수"""
+    return bin(a ^ b).count('1')
+
+
+class PhotoDescriptionCache:
+    def __init__(self, cache_dir=PHOTO_CACHE_DIR, max_entries=MAX_ENTRIES, threshold=HAMMING_THRESHOLD):
+        """사진 설명 캐시 초기화 (디스크 인덱스 로드)"""
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.index_path = os.path.join(cache_dir, "index.json")
+        self.entries = OrderedDict()  # 해시(int) → {'text', 'audio', 'created'} (오래된 순)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self.load()
+
+    def load(self):
+        """디스크 인덱스 로드 (음성 파일이 없어진 항목은 제외)"""
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return
+        for key, entry in stored:
+            # 유휴 시간에 압축되었으면 확장자가 바뀌어 있음
+            audio_path = resolve_audio(entry.get('audio', ''))
+            if audio_path:
+                self.entries[int(key, 16)] = dict(entry, audio=audio_path)
+
+    def save(self):
+        """인덱스를 디스크에 저장 (LRU 순서 유지)"""
+        data = [(f"{key:016x}", entry) for key, entry in self.entries.items()]
+        temp_path = self.index_path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(temp_path, self.index_path)
+
+    def lookup(self, frame_hash):
+        """가장 가까운 캐시 항목 반환 (임계값 초과면 None)"""
+        with self.lock:
+            best_key, best_distance = None, self.threshold + 1
+            for key in self.entries:
+                distance = hamming_distance(key, frame_hash)
+                if distance < best_distance:
+                    best_key, best_distance = key, distance
+
+            if best_key is None:
+                self.misses += 1
+                return None
+
+            self.entries.move_to_end(best_key)
+            self.hits += 1
+            audio_path = resolve_audio(self.entries[best_key]['audio'])
+            if audio_path is None:
+                # 음성 파일이 사라진 항목은 버리고 새로 분석
+                del self.entries[best_key]
+                self.hits -= 1
+                self.misses += 1
+                self.save()
+                return None
+            self.entries[best_key]['audio'] = audio_path
+            entry = dict(self.entries[best_key], distance=best_distance)
+            self.save()
+
+        print(f"🗂️ 사진 캐시 적중 (해밍 거리 {best_distance}): {entry['text'][:30]}")
+        return entry
+
+    def store(self, frame_hash, text, audio_path):
+        """설명 텍스트와 합성 음성을 캐시에 저장 (음성 파일은 캐시 폴더로 복사)"""
+        cached_audio = os.path.join(self.cache_dir, f"photo_{frame_hash:016x}.wav")
+        try:
+            shutil.copyfile(audio_path, cached_audio)
+        except OSError as e:
+            print(f"⚠️ 사진 캐시 음성 저장 실패: {e}")
+            return False
+
+        with self.lock:
+            self.entries[frame_hash] = {'text': text, 'audio': cached_audio, 'created': time.time()}
+            self.entries.move_to_end(frame_hash)
+            while len(self.entries) > self.max_entries:
+                _, evicted = self.entries.popitem(last=False)
+                audio_store.remove(evicted['audio'])
+            self.save()
+        return True
+
+    def stats(self):
+        """캐시 적중률 통계"""
+        total = self.hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else None
+        }
+
+
+# 전역 사진 설명 캐시 인스턴스
+photo_cache = PhotoDescriptionCache()
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+사진 1단계 탐지기 (CPU)
+- LLaVA 설명이 나오기 전에 작은 CPU 모델로 대략적인 물체 이름을 1초 안에 알려줌 ("컵이 보여요")
+- 백엔드 교체 가능: OpenCV DNN (SSD MobileNet, Caffe/ONNX) / ONNX Runtime (분류 모델)
+- 모델 파일이나 백엔드 라이브러리가 없으면 조용히 비활성화 (LLaVA 단계만 사용)
+"""
+
+import os
+import time
+import threading
+import numpy as np
+import cv2
+
+DETECTOR_MODEL_DIR = "/home/drboom/py_project/hanium_snowdream/function/models/"
+DETECTOR_BACKEND = "opencv"   # "opencv" | "onnxruntime" | None (1단계 끄기)
+MIN_CONFIDENCE = 0.5          # 이보다 확신이 낮으면 안내하지 않음
+
+# 백엔드별 기본 모델 설정
+DETECTOR_CONFIGS = {
+    "opencv": {
+        'model': "MobileNetSSD_deploy.caffemodel",
+        'config': "MobileNetSSD_deploy.prototxt",
+        'labels': "voc_labels.txt",
+        'input_size': (300, 300),
+        'scale': 1 / 127.5,
+        'mean': (127.5, 127.5, 127.5),
+        'output': "ssd",
+    },
+    "onnxruntime": {
+        'model': "mobilenetv2.onnx",
+        'labels': "imagenet_labels.txt",
+        'input_size': (224, 224),
+        'scale': 1 / 255.0,
+        'mean': (0.485, 0.456, 0.406),
+        'std': (0.229, 0.224, 0.225),
+        'output': "classification",
+    },
+}
+
+# 모델 라벨(영문) → 안내용 한국어 이름 (여기 없는 라벨은 안내하지 않음)
+KOREAN_LABELS = {
+    "person": "사람", "cat": "고양이", "dog": "강아지", "bird": "새", "horse": "말",
+    "sheep": "양", "cow": "소", "bottle": "병", "chair": "의자", "sofa": "소파",
+    "diningtable": "식탁", "pottedplant": "화분", "tvmonitor": "텔레비전", "bicycle": "자전거",
+    "car": "자동차", "bus": "버스", "motorbike": "오토바이", "train": "기차", "boat": "배",
+    "aeroplane": "비행기", "cup": "컵", "coffee mug": "컵", "banana": "바나나",
+    "orange": "오렌지", "strawberry": "딸기", "apple": "사과", "book": "책",
+    "teddy": "곰인형", "teddy bear": "곰인형", "ball": "공", "soccer ball": "축구공",
+    "backpack": "가방", "umbrella": "우산", "clock": "시계", "wall clock": "시계",
+    "cellular telephone": "휴대폰", "cell phone": "휴대폰", "laptop": "노트북",
+    "keyboard": "키보드", "computer keyboard": "키보드", "mouse": "마우스",
+    "spoon": "숟가락", "wooden spoon": "숟가락", "pencil": "연필", "scissors": "가위",
+}
+
+
+def load_labels(labels_path):
+    """라벨 파일 로드 (한 줄에 라벨 하나, 쉼표 뒤 동의어는 무시)"""
+    try:
+        with open(labels_path, 'r', encoding='utf-8') as f:
+            return [line.strip().split(',')[0].strip().lower() for line in f]
+    except OSError:
+        return []
+
+
+def with_subject_particle(word):
+    """받침 유무에 따라 주격 조사 '이/가'를 붙임 (컵이, 사과가)"""
+    last = word[-1]
+    if '가' <= last <= '힣' and (ord(last) - ord('가')) % 28 != 0:
+        return word + "이"
+    return word + "가"
+
+
+# ===================================================================
+#                              BACKENDS
+# ===================================================================
+
+class OpenCVDnnBackend:
+    """OpenCV DNN 백엔드 (SSD 탐지 출력 또는 분류 출력)"""
+
+    def __init__(self, model, config=None, input_size=(300, 300), scale=1 / 127.5,
+                 mean=(127.5, 127.5, 127.5), output="ssd", **_):
+        self.net = cv2.dnn.readNet(model, config) if config else cv2.dnn.readNet(model)
+        self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+        self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+        self.input_size = input_size
+        self.scale = scale
+        self.mean = mean
+        self.output = output
+
+    def predict(self, frame):
+        """(클래스 번호, 점수) 목록 반환"""
+        blob = cv2.dnn.blobFromImage(frame, self.scale, self.input_size, self.mean, swapRB=False)
+        self.net.setInput(blob)
+        out = self.net.forward()
+        if self.output == "ssd":
+            # [1, 1, N, 7] = (image_id, class_id, score, x1, y1, x2, y2)
+            detections = out.reshape(-1, 7)
+            return [(int(d[1]), float(d[2])) for d in detections]
+        scores = out.flatten()
+        return [(int(np.argmax(scores)), float(np.max(scores)))]
+
+
+class OnnxRuntimeBackend:
+    """ONNX Runtime 백엔드 (분류 모델, CPU 실행)"""
+
+    def __init__(self, model, input_size=(224, 224), scale=1 / 255.0,
+                 mean=(0.485, 0.456, 0.406), std=(0.229, 0.224, 0.225), **_):
+        import onnxruntime
+        self.session = onnxruntime.InferenceSession(model, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+        self.input_size = input_size
+        self.scale = scale
+        self.mean = np.array(mean, dtype=np.float32)
+        self.std = np.array(std, dtype=np.float32)
+
+    def predict(self, frame):
+        """(클래스 번호, 점수) 목록 반환 (softmax 확률)"""
+        image = cv2.resize(frame, self.input_size, interpolation=cv2.INTER_AREA)
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB).astype(np.float32) * self.scale
+        image = (image - self.mean) / self.std
+        tensor = image.transpose(2, 0, 1)[np.newaxis]
+        logits = self.session.run(None, {self.input_name: tensor})[0].flatten()
+        probs = np.exp(logits - logits.max())
+        probs /= probs.sum()
+        return [(int(np.argmax(probs)), float(np.max(probs)))]
+
+
+BACKENDS = {
+    "opencv": OpenCVDnnBackend,
+    "onnxruntime": OnnxRuntimeBackend,
+}
+
+
+# ===================================================================
+#                              DETECTOR
+# ===================================================================
+
+class PhotoDetector:
+    def __init__(self, backend=DETECTOR_BACKEND, model_dir=DETECTOR_MODEL_DIR,
+                 min_confidence=MIN_CONFIDENCE):
+        """1단계 탐지기 초기화 (모델은 처음 사용할 때 로드)"""
+        self.backend_name = backend
+        self.model_dir = model_dir
+        self.min_confidence = min_confidence
+        self.backend = None
+        self.labels = []
+        self.disabled = backend is None
+        self.lock = threading.Lock()
+        self.last_ms = None
+
+    def load(self):
+        """백엔드와 모델 로드 (실패하면 비활성화)"""
+        with self.lock:
+            if self.backend or self.disabled:
+                return self.backend is not None
+            config = dict(DETECTOR_CONFIGS.get(self.backend_name, {}))
+            backend_class = BACKENDS.get(self.backend_name)
+            if not backend_class or not config:
+                print(f"⚠️ 알 수 없는 탐지기 백엔드: {self.backend_name}")
+                self.disabled = True
+                return False
+
+            for key in ('model', 'config', 'labels'):
+                if key in config:
+                    config[key] = os.path.join(self.model_dir, config[key])
+            if not os.path.exists(config['model']):
+                print(f"ℹ️ 탐지기 모델 없음 - 1단계 건너뜀: {config['model']}")
+                self.disabled = True
+                return False
+
+            start = time.time()
+            try:
+                self.backend = backend_class(**config)
+            except ImportError:
+                print(f"ℹ️ {self.backend_name} 백엔드가 설치되지 않음 - 1단계 건너뜀")
+                self.disabled = True
+                return False
+            except Exception as e:
+                print(f"⚠️ 탐지기 로드 실패: {e}")
+                self.disabled = True
+                return False
+            self.labels = load_labels(config.get('labels', ''))
+            print(f"🔎 탐지기 로드 완료 ({self.backend_name}, {(time.time() - start) * 1000:.0f}ms)")
+            return True
+
+    def detect(self, frame):
+        """
+        가장 확신이 높은 안내 가능한 물체 반환
+        {'label': 한국어 이름, 'confidence': 점수, 'ms': 추론 시간} 또는 None
+        """
+        if not self.load():
+            return None
+
+        start = time.time()
+        try:
+            predictions = self.backend.predict(frame)
+        except Exception as e:
+            print(f"⚠️ 탐지기 추론 오류: {e}")
+            return None
+        self.last_ms = (time.time() - start) * 1000
+
+        best = None
+        for class_id, score in predictions:
+            if score < self.min_confidence or not 0 <= class_id < len(self.labels):
+                continue
+            korean = KOREAN_LABELS.get(self.labels[class_id])
+            if korean and (best is None or score > best['confidence']):
+                best = {'label': korean, 'confidence': score, 'ms': self.last_ms}
+
+        if best:
+            print(f"🔎 1단계 탐지: {best['label']} ({best['confidence']:.2f}, {self.last_ms:.0f}ms)")
+        else:
+            print(f"🔎 1단계 탐지: 안내할 물체 없음 ({self.last_ms:.0f}ms)")
+        return best
+
+
+# 전역 탐지기 인스턴스
+photo_detector = PhotoDetector()
+
+# 편의 함수들
+def detect_object(frame):
+    """프레임에서 대략적인 물체 이름 탐지"""
+    return photo_detector.detect(frame)
+
+def announcement_for(label):
+    """탐지 결과 안내 문장 ("컵이 보여요")"""
+    return f"{with_subject_particle(label)} 보여요."
+
+if __name__ == "__main__":
+    # 테스트
+    print("1단계 탐지기 테스트")
+    for word in ("컵", "사과", "곰인형", "강아지"):
+        print(f"  {announcement_for(word)}")
+    test_frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    print(f"탐지 결과: {detect_object(test_frame)}")
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+안내 문구 조립기
+- "선택된 동화는 {story}입니다" 같은 템플릿을 조각 음성을 이어 붙여 만듦
+- 조각은 한 번만 합성해 캐시 → 새 동화/단계가 생겨도 조각 하나만 합성
+- 샘플레이트/채널/비트 형식을 맞추고 조각 사이를 짧게 크로스페이드 (NumPy 벡터 연산)
+"""
+
+import os
+import re
+import wave
+import hashlib
+import numpy as np
+from pathlib import Path
+
+from function.route import generate_tts_audio
+from function.audio_postprocess import write_wav, convert_format
+from function.audio_store import read_audio, resolve_audio
+
+FRAGMENT_DIR = Path(__file__).parent / "audio_fragments"
+CROSSFADE_MS = 12     # 조각 사이 크로스페이드 길이
+MAX_RENDERS = 200     # 조립본 캐시 최대 개수 (넘으면 오래 안 쓴 것부터 삭제)
+SLOT_PATTERN = re.compile(r"\{(\w+)\}")
+
+
+def short_hash(text):
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]
+
+
+# ===================================================================
+#                         AUDIO ARRAY HELPERS
+# ===================================================================
+
+def crossfade_concat(pieces, rate, crossfade_ms=CROSSFADE_MS):
+    """조각 배열들을 이어 붙이되 경계마다 짧은 선형 크로스페이드 적용"""
+    pieces = [p for p in pieces if len(p)]
+    if not pieces:
+        return np.zeros((0, 1), dtype=np.float32)
+    fade = int(rate * crossfade_ms / 1000)
+
+    # 겹치는 길이만큼 줄어든 전체 길이를 미리 계산해 한 번에 할당
+    overlaps = [min(fade, len(a), len(b)) for a, b in zip(pieces, pieces[1:])]
+    total = sum(len(p) for p in pieces) - sum(overlaps)
+    output = np.zeros((total, pieces[0].shape[1]), dtype=np.float32)
+
+    position = 0
+    for index, piece in enumerate(pieces):
+        piece = piece.copy()
+        overlap_in = overlaps[index - 1] if index > 0 else 0
+        overlap_out = overlaps[index] if index < len(overlaps) else 0
+        if overlap_in:
+            piece[:overlap_in] *= np.linspace(0, 1, overlap_in, dtype=np.float32)[:, None]
+        if overlap_out:
+            piece[-overlap_out:] *= np.linspace(1, 0, overlap_out, dtype=np.float32)[:, None]
+        start = position - overlap_in
+        output[start:start + len(piece)] += piece
+        position = start + len(piece)
+    return output
+
+
+# ===================================================================
+#                           PHRASE COMPOSER
+# ===================================================================
+
+class PhraseComposer:
+    def __init__(self, fragment_dir=FRAGMENT_DIR, synthesize=generate_tts_audio,
+                 crossfade_ms=CROSSFADE_MS, max_renders=MAX_RENDERS):
+        """안내 문구 조립기 초기화"""
+        self.fragment_dir = Path(fragment_dir)
+        self.rendered_dir = self.fragment_dir / "rendered"
+        self.rendered_dir.mkdir(parents=True, exist_ok=True)
+        self.synthesize = synthesize
+        self.crossfade_ms = crossfade_ms
+        self.max_renders = max_renders
+
+    def fragment_path(self, text):
+        return self.fragment_dir / f"frag_{short_hash(text)}.wav"
+
+    def ensure_fragment(self, text):
+        """조각 음성이 없으면 합성 (조각 단위로 한 번만)"""
+        path = self.fragment_path(text)
+        stored_path = resolve_audio(path)
+        if stored_path:
+            return Path(stored_path)
+        print(f"🧩 조각 음성 합성: '{text}'")
+        if self.synthesize(text, path) and path.exists():
+            return path
+        print(f"❌ 조각 음성 합성 실패: '{text}'")
+        return None
+
+    def plan(self, template, **slots):
+        """
+        템플릿을 조각 텍스트 목록으로 나눕니다.
+        - 빈칸 값만 조각 하나 ("{story}입니다" → "토끼" + "입니다")
+        - 빈칸 값이 목록이면 항목마다 조각 ("{stories}" → 동화 제목 각각)
+        - 빈칸 사이의 고정 문구는 단어에 붙은 어미까지 묶어서 조각 하나 ("선택된 동화는", "입니다")
+        """
+        fragments = []
+        literal = ""
+        for position, part in enumerate(SLOT_PATTERN.split(template)):
+            if position % 2 == 0:           # 고정 문구
+                literal += part
+                continue
+            if literal.strip():
+                fragments.append(" ".join(literal.split()))
+            literal = ""
+            value = slots[part]
+            if isinstance(value, (list, tuple)):
+                fragments.extend(str(item) for item in value)
+            else:
+                fragments.append(str(value))
+        if literal.strip():
+            fragments.append(" ".join(literal.split()))
+        return fragments
+
+    def render(self, template, **slots):
+        """템플릿을 조각 음성으로 조립해 WAV 경로 반환 (같은 조합은 캐시 재사용)"""
+        fragments = self.plan(template, **slots)
+        paths = [self.ensure_fragment(text) for text in fragments]
+        if not all(paths):
+            return None
+
+        # 조각이 다시 합성되면 결과도 달라지도록 조각 수정 시각까지 키에 포함
+        key = "|".join(f"{text}:{path.stat().st_mtime}" for text, path in zip(fragments, paths))
+        output_path = self.rendered_dir / f"render_{short_hash(key)}.wav"
+        stored_path = resolve_audio(output_path)
+        if stored_path:
+            os.utime(stored_path)   # 최근 사용 표시 (오래 안 쓴 것부터 삭제)
+            return Path(stored_path)
+
+        try:
+            clips = [read_audio(path) for path in paths]
+        except (OSError, EOFError, ValueError, wave.Error) as e:
+            print(f"❌ 조각 음성 읽기 오류: {e}")
+            return None
+        target_rate = clips[0][1]
+        target_channels = clips[0][0].shape[1]
+        pieces = [convert_format(samples, rate, target_rate, target_channels) for samples, rate in clips]
+        write_wav(output_path, crossfade_concat(pieces, target_rate, self.crossfade_ms), target_rate)
+        print(f"🧩 안내 문구 조립: {' + '.join(fragments)}")
+        self.evict_renders()
+        return output_path
+
+    def evict_renders(self):
+        """조립본 캐시가 max_renders를 넘으면 오래 안 쓴 것부터 삭제 (조각은 그대로 둠)"""
+        renders = []
+        for path in self.rendered_dir.glob("render_*"):
+            try:
+                renders.append((path.stat().st_mtime, path))
+            except OSError:
+                continue
+        if len(renders) <= self.max_renders:
+            return 0
+        renders.sort()
+        evicted = renders[:len(renders) - self.max_renders]
+        for _, path in evicted:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+        print(f"🗑️ 안내 조립본 {len(evicted)}개 정리")
+        return len(evicted)
+
+    def missing_fragments(self, template, **slots):
+        """아직 합성되지 않은 조각의 (텍스트, 경로) 목록 (미리 합성 요청용)"""
+        return [(text, self.fragment_path(text)) for text in self.plan(template, **slots)
+                if not resolve_audio(self.fragment_path(text))]
+
+    def precache(self, template, **slots):
+        """필요한 조각을 미리 합성 (재생 없이)"""
+        return all(self.ensure_fragment(text) for text in self.plan(template, **slots))
+
+
+# 전역 안내 문구 조립기 인스턴스
+phrase_composer = PhraseComposer()
+
+# 편의 함수들
+def render_phrase(template, **slots):
+    """템플릿 안내 음성 WAV 경로 (실패 시 None)"""
+    return phrase_composer.render(template, **slots)
+
+if __name__ == "__main__":
+    # 테스트
+    print("안내 문구 조립기 테스트")
+    print(phrase_composer.plan("선택된 동화는 {story}입니다", story="토끼와 거북이"))
+    print(phrase_composer.plan("사용가능한 {stories} 입니다", stories=["토끼", "해님달님"]))
+    print(phrase_composer.plan("{stage}단계를 선택하셨습니다", stage=2))
+    tone = np.sin(np.linspace(0, 200 * np.pi, 1600, dtype=np.float32))[:, None]
+    mixed = crossfade_concat([tone, convert_format(tone, 8000, 16000, 1)], 16000)
+    print(f"크로스페이드 결과: {mixed.shape}")
@@ -4,37 +4,24 @@ TTS 기능을 위한 라우트 파일
 """
 
 import os
-import subprocess
 import time
 
+from process_supervisor import supervisor
+from tts_scheduler import tts_scheduler, INTERACTIVE
+
 # TTS 설정
-REF_AUDIO_PATH = "/home/drboom/py_project/shortform/route/kor_male.wav"
 GPT_SOVITS_DIR = "/home/drboom/py_project/GPT-SoVITS"
 
-def generate_tts_audio(text, output_path):
-    """TTS로 오디오 파일 생성"""
+def generate_tts_audio(text, output_path, priority=INTERACTIVE):
+    """TTS로 오디오 파일 생성 (스케줄러 큐를 거쳐 우선순위대로 실행)"""
     try:
         # GPT-SoVits 디렉토리 확인
         if not os.path.exists(GPT_SOVITS_DIR):
             print(f"GPT-SoVits 디렉토리를 찾을 수 없습니다: {GPT_SOVITS_DIR}")
             return False
         
-        cmd = [
-            'conda', 'run', '-n', 'GPTSoVits', 'python', 'tts_cli.py',
-            '--text', text,
-            '--ref_audio', REF_AUDIO_PATH,
-            '--output', str(output_path)
-        ]
-        
-        print(f"TTS 생성 중: '{text[:30]}...'")
-        result = subprocess.run(cmd, cwd=GPT_SOVITS_DIR, timeout=300, capture_output=True, text=True)
-        
-        if result.returncode == 0:
-            print(f"TTS 생성 완료: {output_path}")
-            return True
-        else:
-            print(f"TTS 생성 실패: {result.stderr}")
-            return False
+        print(f"TTS 생성 요청: '{text[:30]}...'")
+        return tts_scheduler.synthesize(text, str(output_path), priority)
             
     except Exception as e:
         print(f"TTS 실행 오류: {e}")
@@ -43,9 +30,8 @@ def generate_tts_audio(text, output_path):
 def kill_tts_processes():
     """TTS 관련 프로세스들을 종료하여 RAM을 해제합니다."""
     try:
-        # GPT-SoVits 관련 프로세스 종료
-        subprocess.run(['pkill', '-f', 'tts_cli.py'], capture_output=True)
-        subprocess.run(['pkill', '-f', 'GPTSoVits'], capture_output=True)
+        # 관리자가 띄운 TTS 프로세스 그룹 전체 종료 (pkill 패턴 검색 불필요)
+        supervisor.kill_group('tts')
         
         # GPU 메모리 정리 (CUDA 캐시 클리어)
         try:
@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+동화 라이브러리 인덱스
+- 동화 목록, 언어, 줄 목록, 줄별 음성 유무/길이, 내용 해시를 JSON으로 저장
+- 변경된 동화만 다시 읽는 증분 갱신 (inotify가 있으면 이벤트, 없으면 mtime 비교)
+- 동화 목록이나 내용이 바뀌면 파생 안내 음성(목록 합성본, 선택 안내, 바뀐 줄 음성)을 무효화
+- 한국어/영어 줄 대응표 (줄 수가 달라도 글자 수 비율로 대응 → 읽는 중 언어 전환)
+"""
+
+import os
+import json
+import time
+import wave
+import bisect
+import hashlib
+import threading
+
+from function.audio_store import audio_store, resolve_audio
+
+TEXTBOOK_DIR = "/home/drboom/py_project/hanium_snowdream/function/function_textbook/"
+INDEX_DIRNAME = ".story_index"     # 인덱스 저장이 동화 폴더 mtime을 바꾸지 않도록 별도 폴더
+INDEX_FILENAME = "story_index.json"
+ANNOUNCEMENT_DIRNAME = "announcements"
+LANGUAGES = ("kor", "eng")
+INDEX_VERSION = 1
+
+
+def text_hash(text):
+    """짧은 내용 해시 (변경 감지용)"""
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]
+
+
+def align_lines(source_lines, target_lines):
+    """
+    원문 줄 번호 → 번역 줄 번호 대응표 (1부터, 리스트 인덱스 0은 사용 안 함)
+    줄 수가 같으면 그대로 대응, 다르면 각 원문 줄이 시작하는 위치(전체 글자 수 중 비율)를
+    포함하는 번역 줄로 대응시킵니다 (단조 증가 보장).
+    """
+    if not source_lines or not target_lines:
+        return [0] + [1] * len(source_lines)
+    if len(source_lines) == len(target_lines):
+        return list(range(len(source_lines) + 1))
+
+    def line_starts(lines):
+        # 줄마다 시작 위치의 비율 (공백만 있는 줄도 최소 1글자로 계산)
+        lengths = [max(1, len(line.strip())) for line in lines]
+        total = float(sum(lengths))
+        starts, position = [], 0
+        for length in lengths:
+            starts.append(position / total)
+            position += length
+        return starts
+
+    target_starts = line_starts(target_lines)
+    mapping = [0]
+    for start in line_starts(source_lines):
+        # 시작 비율이 start 이하인 마지막 번역 줄 (부동소수 오차 보정)
+        mapping.append(max(1, bisect.bisect_right(target_starts, start + 1e-9)))
+    return mapping
+
+
+def wav_duration(wav_path):
+    """헤더에서 재생 길이(초) 계산 (FLAC/Opus는 저장소에 위임), 읽을 수 없으면 None"""
+    if not wav_path.endswith('.wav'):
+        return audio_store.duration(wav_path)
+    try:
+        with wave.open(wav_path, 'rb') as wf:
+            return wf.getnframes() / float(wf.getframerate())
+    except (OSError, EOFError, wave.Error):
+        return None
+
+
+class StoryIndex:
+    def __init__(self, textbook_dir=TEXTBOOK_DIR):
+        """동화 인덱스 초기화 (디스크 인덱스 로드)"""
+        self.textbook_dir = textbook_dir
+        self.index_path = os.path.join(textbook_dir, INDEX_DIRNAME, INDEX_FILENAME)
+        self.lock = threading.RLock()
+        self.data = {'version': INDEX_VERSION, 'root_mtime': None, 'signature': None, 'stories': {}}
+        self.dirty = True          # 다음 refresh에서 검사가 필요한지
+        self.watcher = None        # inotify 감시 스레드 (있으면 이벤트가 올 때만 검사)
+        self.alignments = {}       # (동화, 원문 언어, 번역 언어) → (줄 해시, 대응표)
+        self.load()
+
+    # ---------------- 저장 / 로드 ----------------
+
+    def load(self):
+        """디스크 인덱스 로드 (버전이 다르면 무시하고 새로 만듦)"""
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return
+        if stored.get('version') == INDEX_VERSION:
+            self.data = stored
+
+    def save(self):
+        """인덱스를 디스크에 저장 (임시 파일 → 교체)"""
+        if not os.path.isdir(self.textbook_dir):
+            return
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        temp_path = self.index_path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, ensure_ascii=False)
+        os.replace(temp_path, self.index_path)
+
+    # ---------------- 증분 갱신 ----------------
+
+    def refresh(self, force=False):
+        """
+        변경된 동화만 다시 읽어 인덱스를 갱신합니다.
+        inotify 감시 중이고 이벤트가 없었다면 디스크를 전혀 보지 않습니다.
+        반환값: 변경 여부
+        """
+        with self.lock:
+            if not (force or self.dirty or self.watcher is None):
+                return False
+            self.dirty = False
+
+            try:
+                root_mtime = os.stat(self.textbook_dir).st_mtime
+            except OSError:
+                print(f"❌ 동화 폴더를 찾을 수 없습니다: {self.textbook_dir}")
+                return False
+
+            stories = self.data['stories']
+            changed = False
+
+            # 동화 폴더 추가/삭제는 루트 폴더 mtime이 바뀔 때만 확인
+            if force or root_mtime != self.data['root_mtime']:
+                names = set()
+                for entry in os.scandir(self.textbook_dir):
+                    if entry.is_dir() and entry.name not in (ANNOUNCEMENT_DIRNAME, INDEX_DIRNAME):
+                        names.add(entry.name)
+                for removed in set(stories) - names:
+                    print(f"🗑️ 동화 제거됨: {removed}")
+                    del stories[removed]
+                    changed = True
+                for added in names - set(stories):
+                    stories[added] = {'dir_mtime': None, 'languages': {}}
+                self.data['root_mtime'] = root_mtime
+
+            for name in list(stories):
+                if self.refresh_story(name, force):
+                    changed = True
+
+            signature = text_hash("\n".join(self.story_names()))
+            if signature != self.data['signature']:
+                # 목록 안내 조립본은 조각 목록이 키라서 목록이 바뀌면 자연히 새로 조립됨
+                self.data['signature'] = signature
+                changed = True
+
+            if changed:
+                self.save()
+            return changed
+
+    def refresh_story(self, name, force=False):
+        """동화 하나의 텍스트/음성 정보를 변경된 부분만 갱신"""
+        story = self.data['stories'][name]
+        story_dir = os.path.join(self.textbook_dir, name)
+        try:
+            dir_mtime = os.stat(story_dir).st_mtime
+        except OSError:
+            return False
+
+        changed = False
+        for language in LANGUAGES:
+            text_path = os.path.join(story_dir, f"{name}_{language}.txt")
+            try:
+                stat = os.stat(text_path)
+            except OSError:
+                if story['languages'].pop(language, None) is not None:
+                    changed = True
+                continue
+
+            entry = story['languages'].get(language)
+            text_changed = force or entry is None or \
+                (stat.st_mtime, stat.st_size) != (entry['text_mtime'], entry['text_size'])
+            if text_changed:
+                entry = self.reindex_text(name, language, text_path, stat, entry)
+                story['languages'][language] = entry
+                changed = True
+
+            # 음성 파일 추가/삭제는 동화 폴더 mtime이 바뀔 때만 다시 확인
+            if text_changed or dir_mtime != story['dir_mtime']:
+                if self.rescan_audio(name, language, entry):
+                    changed = True
+
+        story['dir_mtime'] = dir_mtime
+        return changed
+
+    def reindex_text(self, name, language, text_path, stat, old_entry):
+        """텍스트를 다시 읽어 줄 목록/해시 갱신, 내용이 바뀐 줄의 음성은 삭제"""
+        try:
+            with open(text_path, 'r', encoding='utf-8') as f:
+                lines = [line.strip() for line in f if line.strip()]
+        except OSError as e:
+            print(f"❌ 동화 파일 읽기 오류: {e}")
+            lines = []
+
+        line_hashes = [text_hash(line) for line in lines]
+        if old_entry:
+            old_hashes = old_entry.get('line_hashes', [])
+            for number, old_hash in enumerate(old_hashes, 1):
+                if number > len(line_hashes) or line_hashes[number - 1] != old_hash:
+                    self.remove_line_audio(name, language, number)
+            print(f"🔄 동화 내용 변경: {name} ({language}, {len(lines)}줄)")
+
+        return {
+            'text_mtime': stat.st_mtime,
+            'text_size': stat.st_size,
+            'hash': text_hash("\n".join(lines)),
+            'lines': lines,
+            'line_hashes': line_hashes,
+            'audio': {},
+        }
+
+    def rescan_audio(self, name, language, entry):
+        """줄별 음성 파일 유무와 길이 갱신 (새로 생긴 파일만 헤더를 읽음)"""
+        audio = entry['audio']
+        changed = False
+        for number in range(1, len(entry['lines']) + 1):
+            wav_path = resolve_audio(self.line_audio_path(name, language, number))
+            try:
+                mtime = os.stat(wav_path).st_mtime
+            except (OSError, TypeError):
+                if audio.pop(str(number), None) is not None:
+                    changed = True
+                continue
+            known = audio.get(str(number))
+            if known is None or known['mtime'] != mtime:
+                audio[str(number)] = {'mtime': mtime, 'duration': wav_duration(wav_path)}
+                changed = True
+        return changed
+
+    # ---------------- 무효화 ----------------
+
+    def remove_line_audio(self, name, language, number):
+        """내용이 바뀐 줄의 낡은 음성 파일 삭제 (WAV/FLAC/Opus 모두)"""
+        wav_path = self.line_audio_path(name, language, number)
+        if audio_store.remove(wav_path):
+            print(f"🗑️ 낡은 줄 음성 삭제: {os.path.basename(wav_path)}")
+
+    # ---------------- 조회 ----------------
+
+    def story_names(self):
+        """한국어/영어 텍스트가 모두 있는 동화 이름 (정렬됨)"""
+        return sorted(name for name, story in self.data['stories'].items()
+                      if all(language in story['languages'] for language in LANGUAGES))
+
+    def lines(self, name, language):
+        """동화의 줄 목록 (없으면 None)"""
+        entry = self.data['stories'].get(name, {}).get('languages', {}).get(language)
+        return list(entry['lines']) if entry else None
+
+    def line_audio_path(self, name, language, number):
+        return os.path.join(self.textbook_dir, name, f"{name}_{language}_{number}.wav")
+
+    def has_line_audio(self, name, language, number):
+        entry = self.data['stories'].get(name, {}).get('languages', {}).get(language)
+        return bool(entry) and str(number) in entry['audio']
+
+    def line_duration(self, name, language, number):
+        """줄 음성 길이(초), 음성이 없으면 None"""
+        entry = self.data['stories'].get(name, {}).get('languages', {}).get(language)
+        if not entry or str(number) not in entry['audio']:
+            return None
+        return entry['audio'][str(number)]['duration']
+
+    def record_line_audio(self, name, language, number):
+        """새로 합성한 줄 음성을 인덱스에 반영 (폴더 재검사 없이)"""
+        with self.lock:
+            entry = self.data['stories'].get(name, {}).get('languages', {}).get(language)
+            if not entry:
+                return
+            wav_path = resolve_audio(self.line_audio_path(name, language, number))
+            try:
+                mtime = os.stat(wav_path).st_mtime
+                dir_mtime = os.stat(os.path.dirname(wav_path)).st_mtime
+            except (OSError, TypeError):
+                return
+            entry['audio'][str(number)] = {'mtime': mtime, 'duration': wav_duration(wav_path)}
+            self.data['stories'][name]['dir_mtime'] = dir_mtime
+            self.save()
+
+    def summary(self, name, language):
+        """줄 수, 음성 준비된 줄 수, 총 재생 길이"""
+        entry = self.data['stories'].get(name, {}).get('languages', {}).get(language)
+        if not entry:
+            return None
+        durations = [a['duration'] for a in entry['audio'].values() if a['duration']]
+        return {
+            'lines': len(entry['lines']),
+            'audio_ready': len(entry['audio']),
+            'total_seconds': sum(durations),
+            'hash': entry['hash'],
+        }
+
+    def line_hashes(self, name, language):
+        """줄별 내용 해시 목록 (묶음 파일의 줄이 현재 텍스트와 같은지 비교용)"""
+        entry = self.data['stories'].get(name, {}).get('languages', {}).get(language)
+        return list(entry['line_hashes']) if entry else None
+
+    def aligned_line(self, name, from_language, to_language, number):
+        """다른 언어 텍스트에서 같은 내용이 시작하는 줄 번호 (텍스트가 없으면 number 그대로)"""
+        source_hashes = self.line_hashes(name, from_language)
+        target_hashes = self.line_hashes(name, to_language)
+        if not source_hashes or not target_hashes:
+            return number
+        key = (name, from_language, to_language)
+        signature = (tuple(source_hashes), tuple(target_hashes))
+        with self.lock:
+            cached = self.alignments.get(key)
+            if not cached or cached[0] != signature:
+                mapping = align_lines(self.lines(name, from_language), self.lines(name, to_language))
+                cached = self.alignments[key] = (signature, mapping)
+        mapping = cached[1]
+        return mapping[min(max(1, number), len(mapping) - 1)]
+
+    def latest_line_audio_mtime(self, name, language):
+        """따로 있는 줄 음성 파일 중 가장 최근 수정 시각 (없으면 None)"""
+        entry = self.data['stories'].get(name, {}).get('languages', {}).get(language)
+        if not entry or not entry['audio']:
+            return None
+        return max(audio['mtime'] for audio in entry['audio'].values())
+
+    # ---------------- inotify 감시 (선택) ----------------
+
+    def start_watching(self):
+        """inotify로 동화 폴더 변경을 감시 (라이브러리가 없으면 mtime 비교로 동작)"""
+        if self.watcher and self.watcher.is_alive():
+            return True
+        try:
+            from inotify_simple import INotify, flags
+        except ImportError:
+            print("ℹ️ inotify_simple이 설치되지 않음 - mtime 비교로 동화 변경 감지")
+            return False
+
+        inotify = INotify()
+        mask = flags.CREATE | flags.DELETE | flags.MODIFY | flags.MOVED_FROM | flags.MOVED_TO | flags.CLOSE_WRITE
+        inotify.add_watch(self.textbook_dir, mask)
+        for name in self.data['stories']:
+            story_dir = os.path.join(self.textbook_dir, name)
+            if os.path.isdir(story_dir):
+                inotify.add_watch(story_dir, mask)
+
+        def watch_loop():
+            while True:
+                events = inotify.read()
+                if not events:
+                    continue
+                self.dirty = True
+                for event in events:
+                    # 새 동화 폴더도 감시 대상에 추가
+                    if event.mask & flags.ISDIR and event.mask & (flags.CREATE | flags.MOVED_TO):
+                        try:
+                            inotify.add_watch(os.path.join(self.textbook_dir, event.name), mask)
+                        except OSError:
+                            pass
+
+        self.watcher = threading.Thread(target=watch_loop, daemon=True)
+        self.watcher.start()
+        print("👀 동화 폴더 변경 감시 시작")
+        return True
+
+
+# 전역 동화 인덱스 인스턴스
+story_index = StoryIndex()
+
+# 편의 함수들
+def get_story_names():
+    """최신 동화 목록 (변경된 부분만 갱신)"""
+    story_index.refresh()
+    return story_index.story_names()
+
+def get_story_lines(name, language):
+    """동화 줄 목록 (인덱스에 캐시된 값)"""
+    story_index.refresh()
+    return story_index.lines(name, language)
+
+if __name__ == "__main__":
+    # 테스트
+    print("동화 인덱스 테스트")
+    start = time.time()
+    story_index.refresh(force=True)
+    print(f"전체 스캔: {(time.time() - start) * 1000:.1f}ms")
+    start = time.time()
+    names = get_story_names()
+    print(f"증분 갱신: {(time.time() - start) * 1000:.1f}ms, 동화: {names}")
+    for story_name in names:
+        for lang in LANGUAGES:
+            print(f"  {story_name} ({lang}): {story_index.summary(story_name, lang)}")
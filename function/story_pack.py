@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+동화 음성 묶음 파일 (줄별 WAV → 한 파일)
+- 한 동화/언어의 줄 음성을 이어 붙이고, 줄별 (오프셋, 길이) 인덱스를 헤더에 저장
+- 줄 데이터는 PCM 또는 줄별 FLAC/Opus (동화 분류 코덱) - 압축 묶음은 줄 단위로 메모리에서 디코딩
+- SD 카드의 작은 WAV 수백 개를 열고 디코딩하는 대신 파일 하나를 메모리 매핑
+- 재생기는 줄 범위를 잘라 pygame Sound로 만들고 Channel.queue로 끊김 없이 이어 재생
+- 어느 줄에서든 바로 시작 (이어 듣기 / 탐색)
+"""
+
+import os
+import json
+import mmap
+import time
+import struct
+import pygame
+
+from function.story_index import story_index
+from function.audio_store import audio_store, to_pcm16
+from function.audio_postprocess import convert_format
+
+PACK_MAGIC = b"SDPK"
+PACK_VERSION = 2
+LINE_GAP_SECONDS = 0.5   # 줄 사이 쉼 (기존 줄별 재생의 0.5초 대기와 동일)
+
+
+def pack_path_for(story_name, language):
+    return os.path.join(story_index.textbook_dir, story_name, f"{story_name}_{language}.pack")
+
+
+# ===================================================================
+#                              PACKER
+# ===================================================================
+
+def pack_story(story_name, language):
+    """
+    줄 음성들을 묶음 파일 하나로 합칩니다.
+    파일 구조: MAGIC(4) + 헤더 길이(uint32) + JSON 헤더 + 줄별 데이터
+    줄 데이터는 동화 분류 코덱으로 저장 (wav = 헤더 없는 16비트 PCM, flac/opus = 줄별 인코딩 파일)
+    줄 음성은 따로 있는 파일이나, 내용이 바뀌지 않은 기존 묶음의 줄에서 가져옵니다.
+    압축 코덱이면 묶은 뒤 줄별 파일은 삭제합니다 (묶음 파일이 저장소 역할).
+    """
+    story_index.refresh()
+    lines = story_index.lines(story_name, language)
+    line_hashes = story_index.line_hashes(story_name, language)
+    if not lines:
+        return None
+    if not all(line_audio_available(story_name, language, n) for n in range(1, len(lines) + 1)):
+        print(f"ℹ️ {story_name} ({language}) 음성이 아직 모두 준비되지 않아 묶지 않습니다.")
+        return None
+
+    codec = audio_store.codec_for('story')
+    old_pack = open_player(story_name, language)
+    chunks = []
+    durations = []
+    audio_format = None
+    try:
+        for number in range(1, len(lines) + 1):
+            loose_path = audio_store.resolve(story_index.line_audio_path(story_name, language, number))
+            if loose_path is None and old_pack and old_pack.codec == codec and codec != 'wav':
+                # 바뀌지 않은 압축 줄은 다시 인코딩하지 않고 바이트 그대로 복사
+                chunks.append(bytes(old_pack.line_bytes(number)))
+                durations.append(old_pack.header['durations'][number - 1])
+                continue
+
+            try:
+                if loose_path:
+                    samples, rate = audio_store.read(loose_path)
+                else:
+                    samples, rate = old_pack.decode_line(number)
+            except Exception as e:
+                print(f"❌ 줄 음성 읽기 실패 ({number}번째 줄): {e}")
+                return None
+            if audio_format is None:
+                audio_format = (rate, samples.shape[1])
+            samples = convert_format(samples, rate, *audio_format)
+            data, _ = audio_store.encode_bytes(samples, audio_format[0], codec)
+            chunks.append(data)
+            durations.append(round(len(samples) / audio_format[0], 3))
+    finally:
+        if old_pack:
+            old_pack.close()
+
+    offsets = []
+    position = 0
+    for data in chunks:
+        offsets.append([position, len(data)])
+        position += len(data)
+
+    sample_rate, channels = audio_format or (old_header_format(story_name, language))
+    header = json.dumps({
+        'version': PACK_VERSION,
+        'story': story_name,
+        'language': language,
+        'codec': codec,
+        'sample_rate': sample_rate,
+        'channels': channels,
+        'sample_width': 2,
+        'line_hashes': line_hashes,
+        'durations': durations,
+        'lines': offsets,
+    }).encode('utf-8')
+
+    pack_path = pack_path_for(story_name, language)
+    temp_path = pack_path + ".tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(PACK_MAGIC)
+        f.write(struct.pack("<I", len(header)))
+        f.write(header)
+        for data in chunks:
+            f.write(data)
+    os.replace(temp_path, pack_path)
+    print(f"📦 동화 음성 묶음 생성: {os.path.basename(pack_path)} "
+          f"({len(chunks)}줄, {codec}, {position / 1024**2:.1f}MB)")
+
+    if codec != 'wav':
+        for number in range(1, len(lines) + 1):
+            audio_store.remove(story_index.line_audio_path(story_name, language, number))
+        story_index.refresh()
+    return pack_path
+
+def old_header_format(story_name, language):
+    """기존 묶음의 (샘플레이트, 채널) - 모든 줄을 바이트 복사한 경우 사용"""
+    header, _ = read_pack_header(pack_path_for(story_name, language))
+    return header['sample_rate'], header['channels']
+
+def read_pack_header(pack_path):
+    """묶음 파일 헤더와 데이터 시작 위치 반환 (형식이 다르면 None)"""
+    try:
+        with open(pack_path, 'rb') as f:
+            if f.read(4) != PACK_MAGIC:
+                return None, 0
+            (header_length,) = struct.unpack("<I", f.read(4))
+            header = json.loads(f.read(header_length).decode('utf-8'))
+    except (OSError, ValueError, struct.error):
+        return None, 0
+    if header.get('version') != PACK_VERSION:
+        return None, 0
+    return header, 8 + header_length
+
+def cached_pack_header(story_name, language):
+    """수정 시각이 같으면 헤더를 다시 읽지 않음"""
+    pack_path = pack_path_for(story_name, language)
+    try:
+        mtime = os.stat(pack_path).st_mtime
+    except OSError:
+        return None
+    cached = _header_cache.get(pack_path)
+    if not cached or cached[0] != mtime:
+        cached = (mtime, read_pack_header(pack_path)[0])
+        _header_cache[pack_path] = cached
+    return cached[1]
+
+_header_cache = {}
+
+def pack_has_line(story_name, language, number):
+    """묶음 파일에 현재 텍스트와 같은 내용의 줄 음성이 있는지"""
+    header = cached_pack_header(story_name, language)
+    line_hashes = story_index.line_hashes(story_name, language)
+    if not header or not line_hashes or number > len(header['line_hashes']) or number > len(line_hashes):
+        return False
+    return header['line_hashes'][number - 1] == line_hashes[number - 1]
+
+def line_audio_available(story_name, language, number):
+    """줄 음성이 따로 있는 파일이나 묶음 파일 중 한 곳에 있는지"""
+    return story_index.has_line_audio(story_name, language, number) or \
+        pack_has_line(story_name, language, number)
+
+def is_pack_fresh(story_name, language):
+    """묶음 파일이 현재 텍스트와 일치하고, 더 새로 합성된 줄별 파일이 없는지 확인"""
+    header = cached_pack_header(story_name, language)
+    if not header or header['line_hashes'] != story_index.line_hashes(story_name, language):
+        return False
+    latest = story_index.latest_line_audio_mtime(story_name, language)
+    return latest is None or latest <= _header_cache[pack_path_for(story_name, language)][0]
+
+
+# ===================================================================
+#                              PLAYER
+# ===================================================================
+
+class PackedStoryPlayer:
+    def __init__(self, pack_path):
+        """묶음 파일을 메모리 매핑으로 열기"""
+        self.header, self.data_offset = read_pack_header(pack_path)
+        if not self.header:
+            raise ValueError(f"올바른 동화 묶음 파일이 아닙니다: {pack_path}")
+        self.codec = self.header.get('codec', 'wav')
+        self.file = open(pack_path, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.map)
+        self.channel = None
+        self.silence = None
+
+    @property
+    def line_count(self):
+        return len(self.header['lines'])
+
+    def close(self):
+        if self.channel:
+            self.channel.stop()
+        self.view.release()
+        self.map.close()
+        self.file.close()
+
+    def ensure_mixer_format(self):
+        """
+        PCM 묶음이면 믹서 형식을 묶음 형식에 맞춤 (Sound(buffer=)는 믹서 형식으로 해석됨)
+        압축 묶음은 줄을 디코딩할 때 현재 믹서 형식으로 변환하므로 믹서를 그대로 둠
+        """
+        if self.codec == 'wav':
+            wanted = (self.header['sample_rate'], -16, self.header['channels'])
+            if pygame.mixer.get_init() != wanted:
+                pygame.mixer.quit()
+                pygame.mixer.init(frequency=wanted[0], size=wanted[1], channels=wanted[2])
+        if self.silence is None:
+            rate, _, channels = pygame.mixer.get_init()
+            self.silence = pygame.mixer.Sound(buffer=bytes(int(rate * LINE_GAP_SECONDS) * channels * 2))
+
+    def line_bytes(self, number):
+        """줄 번호(1부터)의 저장된 바이트 범위 (매핑된 페이지를 복사 없이 참조)"""
+        offset, length = self.header['lines'][number - 1]
+        start = self.data_offset + offset
+        return self.view[start:start + length]
+
+    def decode_line(self, number):
+        """줄 하나를 (float32 배열, 샘플레이트)로 디코딩 (임시 파일 없이 메모리에서)"""
+        return audio_store.decode_bytes(self.line_bytes(number), self.codec,
+                                        self.header['sample_rate'], self.header['channels'])
+
+    def line_sound(self, number):
+        """줄 번호(1부터)의 음성을 Sound로"""
+        if self.codec == 'wav':
+            return pygame.mixer.Sound(buffer=self.line_bytes(number))
+        samples, rate = self.decode_line(number)
+        mixer_rate, _, mixer_channels = pygame.mixer.get_init()
+        samples = convert_format(samples, rate, mixer_rate, mixer_channels)
+        return pygame.mixer.Sound(buffer=to_pcm16(samples))
+
+    def play(self, start_line=1, should_stop=None, on_line_start=None):
+        """
+        start_line부터 끝까지 끊김 없이 재생합니다.
+        다음 줄(과 줄 사이 쉼)은 현재 줄이 재생되는 동안 Channel.queue에 미리 넣어 둡니다.
+        should_stop()이 True를 반환하면 즉시 멈추고 (False, 현재 줄)을 반환합니다.
+        반환값: (끝까지 재생했는지, 마지막으로 재생한 줄 번호)
+        """
+        self.ensure_mixer_format()
+        self.channel = pygame.mixer.find_channel(True)
+
+        # 재생 순서: 줄, 쉼, 줄, 쉼, ... (마지막 줄 뒤 쉼 없음)
+        playlist = []
+        for number in range(start_line, self.line_count + 1):
+            if playlist:
+                playlist.append((None, self.silence))
+            playlist.append((number, None))
+
+        def sound_for(item):
+            number, sound = item
+            return sound if sound is not None else self.line_sound(number)
+
+        if not playlist:
+            return True, self.line_count
+
+        position = 0
+        current_line = playlist[0][0]
+        self.channel.play(sound_for(playlist[0]))
+        if on_line_start:
+            on_line_start(current_line)
+        queued = None
+
+        while True:
+            if should_stop and should_stop():
+                self.channel.stop()
+                return False, current_line
+
+            # 큐에 넣어 둔 항목이 재생되기 시작했으면 다음 항목을 미리 큐에 넣음
+            if queued is not None and self.channel.get_queue() is None:
+                position = queued
+                queued = None
+                number = playlist[position][0]
+                if number is not None:
+                    current_line = number
+                    if on_line_start:
+                        on_line_start(current_line)
+            if queued is None and position + 1 < len(playlist):
+                queued = position + 1
+                self.channel.queue(sound_for(playlist[queued]))
+
+            if not self.channel.get_busy() and queued is None:
+                return True, current_line
+            pygame.time.wait(20)
+
+
+    def play_line(self, number, should_stop=None):
+        """줄 하나만 재생 (줄별 재생 중 묶음에만 있는 줄을 들려줄 때)"""
+        self.ensure_mixer_format()
+        self.channel = pygame.mixer.find_channel(True)
+        self.channel.play(self.line_sound(number))
+        while self.channel.get_busy():
+            if should_stop and should_stop():
+                self.channel.stop()
+                return False
+            pygame.time.wait(20)
+        return True
+
+
+def open_player(story_name, language):
+    """묶음 파일 재생기 (없거나 형식이 다르면 None)"""
+    try:
+        return PackedStoryPlayer(pack_path_for(story_name, language))
+    except (OSError, ValueError):
+        return None
+
+# 편의 함수들
+def play_packed_story(story_name, language, start_line=1, should_stop=None, on_line_start=None):
+    """
+    최신 묶음 파일이 있으면 그것으로 재생하고 (완료 여부, 마지막 줄)을 반환합니다.
+    묶음 파일이 없거나 낡았으면 None을 반환합니다 (호출 측이 줄별 재생으로 대체).
+    """
+    if not is_pack_fresh(story_name, language):
+        return None
+    player = PackedStoryPlayer(pack_path_for(story_name, language))
+    try:
+        return player.play(start_line, should_stop=should_stop, on_line_start=on_line_start)
+    finally:
+        player.close()
+
+def play_packed_line(story_name, language, number, should_stop=None):
+    """묶음 파일에서 줄 하나 재생 (묶음에 없으면 None)"""
+    if not pack_has_line(story_name, language, number):
+        return None
+    player = open_player(story_name, language)
+    if not player:
+        return None
+    try:
+        return player.play_line(number, should_stop=should_stop)
+    finally:
+        player.close()
+
+if __name__ == "__main__":
+    # 테스트
+    print("동화 음성 묶음 테스트")
+    pygame.mixer.init()
+    for name in story_index.story_names():
+        start = time.time()
+        path = pack_story(name, "kor")
+        print(f"  {name}: {path} ({(time.time() - start) * 1000:.0f}ms)")
@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+동화 줄 음성의 단어별 시간표
+- 줄마다 각 단어가 말해지는 시작/끝 시각(초)을 계산해 동화 폴더에 저장 ({동화}_{언어}.words.json)
+- 유휴 시간에 이미 로드된 Whisper 모델(function_question)의 단어 타임스탬프로 계산
+  (인식된 단어와 원문 단어를 글자 위치 비율로 대응 - 인식 결과가 원문과 조금 달라도 사용 가능)
+- Whisper가 없거나 아직 계산하지 않은 줄은 음성 길이를 글자 수 비율로 나눈 시간표 사용 (재생 때 바로 계산)
+- 재생 중에는 저장된 시간표만 읽어 점자 페이지를 말하는 단어에 맞춰 넘김 (실행 중 음성 인식 없음)
+"""
+
+import os
+import sys
+import json
+import time
+import bisect
+import threading
+
+from function.story_index import story_index, LANGUAGES
+from function.story_pack import cached_pack_header, pack_has_line, line_audio_available, open_player
+from function.audio_store import audio_store, resolve_audio
+
+WORD_TIMING_VERSION = 1
+WHISPER_RATE = 16000                     # Whisper 입력 샘플레이트
+WHISPER_LANGUAGES = {"kor": "ko", "eng": "en"}
+PAGE_LEAD_SECONDS = 0.15                 # 모터 이동 시간을 고려해 단어보다 조금 먼저 페이지를 넘김
+DURATION_TOLERANCE = 0.05                # 묶음으로 다시 인코딩되며 생기는 길이 차이는 같은 음성으로 봄
+
+
+def text_words(line):
+    """점자 페이지와 같은 기준(공백)으로 나눈 단어 목록"""
+    return line.split()
+
+
+def word_spans(words):
+    """단어별 (시작, 끝) 글자 위치 비율 (공백 제외 글자 수 기준)"""
+    total = float(sum(len(word) for word in words)) or 1.0
+    spans, position = [], 0
+    for word in words:
+        spans.append((position / total, (position + len(word)) / total))
+        position += len(word)
+    return spans
+
+
+def interpolate(points, x):
+    """(x, 시각) 점들 사이를 선형 보간 (x는 오름차순)"""
+    xs = [point[0] for point in points]
+    index = bisect.bisect_right(xs, x)
+    if index == 0:
+        return points[0][1]
+    if index == len(points):
+        return points[-1][1]
+    (x0, t0), (x1, t1) = points[index - 1], points[index]
+    return t0 if x1 == x0 else t0 + (t1 - t0) * (x - x0) / (x1 - x0)
+
+
+def proportional_timing(words, duration):
+    """음성 길이를 글자 수 비율로 나눈 단어 시간표 [[단어, 시작, 끝], ...]"""
+    return [[word, round(start * duration, 3), round(end * duration, 3)]
+            for word, (start, end) in zip(words, word_spans(words))]
+
+
+def map_recognized_timing(words, recognized, duration):
+    """
+    인식된 단어 시각 → 원문 단어 시각
+    인식 단어의 글자 위치 비율과 시작 시각을 기준점으로 원문 단어 위치를 보간합니다.
+    """
+    recognized = [(text.strip(), start, end) for text, start, end in recognized if text.strip()]
+    if not recognized:
+        return proportional_timing(words, duration)
+
+    points = []
+    latest = 0.0
+    for (start_ratio, _), (_, start, _) in zip(word_spans([text for text, _, _ in recognized]), recognized):
+        latest = max(latest, start)   # 시각이 거꾸로 가지 않게
+        points.append((start_ratio, latest))
+    points.append((1.0, max(latest, min(recognized[-1][2], duration))))
+    if points[0][0] > 0:
+        points.insert(0, (0.0, points[0][1]))
+
+    return [[word, round(interpolate(points, start), 3), round(interpolate(points, end), 3)]
+            for word, (start, end) in zip(words, word_spans(words))]
+
+
+def loaded_whisper_model():
+    """질문 기능에서 이미 로드한 Whisper 모델 (로드되지 않았으면 None - 여기서 새로 로드하지 않음)"""
+    module = sys.modules.get('function.function_question')
+    return getattr(module, 'whisper_model', None) if module else None
+
+
+def loaded_whisper_lock():
+    """질문 기능의 Whisper 잠금 (같은 모델을 동시에 transcribe하지 않도록 공유)"""
+    module = sys.modules.get('function.function_question')
+    return getattr(module, 'whisper_lock', None) if module else None
+
+
+def whisper_word_times(model, samples, language):
+    """Whisper 단어 타임스탬프 [(단어, 시작, 끝), ...] (실패하면 None)"""
+    try:
+        from memory_manager import memory_manager
+        memory_manager.mark_loaded('whisper')
+        result = model.transcribe(samples, language=WHISPER_LANGUAGES.get(language),
+                                  word_timestamps=True, fp16=False)
+    except Exception as e:
+        print(f"⚠️ Whisper 단어 시각 계산 실패: {e}")
+        return None
+    return [(word['word'], word['start'], word['end'])
+            for segment in result.get('segments', []) for word in segment.get('words', [])]
+
+
+class WordTimingIndex:
+    def __init__(self):
+        """단어 시간표 (동화/언어별 파일을 처음 사용할 때 로드)"""
+        self.lock = threading.RLock()
+        self.tables = {}     # (동화, 언어) → {'version', 'lines': {줄 번호: 항목}}
+
+    # ---------------- 저장 / 로드 ----------------
+
+    def timing_path(self, story_name, language):
+        return os.path.join(story_index.textbook_dir, story_name, f"{story_name}_{language}.words.json")
+
+    def table(self, story_name, language):
+        with self.lock:
+            key = (story_name, language)
+            if key not in self.tables:
+                table = None
+                try:
+                    with open(self.timing_path(story_name, language), 'r', encoding='utf-8') as f:
+                        table = json.load(f)
+                except (OSError, ValueError):
+                    pass
+                if not table or table.get('version') != WORD_TIMING_VERSION:
+                    table = {'version': WORD_TIMING_VERSION, 'lines': {}}
+                self.tables[key] = table
+            return self.tables[key]
+
+    def save(self, story_name, language):
+        """시간표 저장 (임시 파일 → 교체)"""
+        path = self.timing_path(story_name, language)
+        temp_path = path + ".tmp"
+        try:
+            with self.lock:
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    json.dump(self.table(story_name, language), f, ensure_ascii=False)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"⚠️ 단어 시간표 저장 실패: {e}")
+
+    # ---------------- 조회 ----------------
+
+    def line_duration(self, story_name, language, number):
+        """줄 음성 길이(초) - 따로 있는 파일, 없으면 묶음 헤더에서"""
+        duration = story_index.line_duration(story_name, language, number)
+        if duration is None and pack_has_line(story_name, language, number):
+            duration = cached_pack_header(story_name, language)['durations'][number - 1]
+        return duration
+
+    def line_signature(self, story_name, language, number):
+        """저장된 시간표가 현재 줄과 맞는지 비교할 값 (내용 해시, 음성 길이)"""
+        hashes = story_index.line_hashes(story_name, language) or []
+        duration = self.line_duration(story_name, language, number)
+        line_hash = hashes[number - 1] if number <= len(hashes) else None
+        return [line_hash, round(duration, 3) if duration else None]
+
+    def signature_matches(self, stored, current):
+        if stored[0] != current[0] or stored[1] is None or current[1] is None:
+            return False
+        return abs(stored[1] - current[1]) <= DURATION_TOLERANCE
+
+    def stored_entry(self, story_name, language, number):
+        """현재 줄과 맞는 저장된 항목 (없으면 None)"""
+        entry = self.table(story_name, language)['lines'].get(str(number))
+        if entry and self.signature_matches(entry['signature'], self.line_signature(story_name, language, number)):
+            return entry
+        return None
+
+    def line_timing(self, story_name, language, number, line):
+        """
+        줄의 단어 시간표 [[단어, 시작, 끝], ...]
+        저장된 것이 없으면 음성 길이 비율로 계산 (음성 길이도 모르면 None)
+        """
+        entry = self.stored_entry(story_name, language, number)
+        if entry:
+            return entry['words']
+        duration = self.line_duration(story_name, language, number)
+        return proportional_timing(text_words(line), duration) if duration else None
+
+    # ---------------- 계산 (유휴 시간) ----------------
+
+    def read_line_samples(self, story_name, language, number):
+        """줄 음성 → (float32 배열, 샘플레이트) - 따로 있는 파일, 없으면 묶음 파일에서"""
+        loose_path = resolve_audio(story_index.line_audio_path(story_name, language, number))
+        if loose_path:
+            return audio_store.read(loose_path)
+        player = open_player(story_name, language)
+        if not player:
+            return None, None
+        try:
+            return player.decode_line(number)
+        finally:
+            player.close()
+
+    def align_line(self, story_name, language, number, line, model=None):
+        """줄 하나의 시간표 계산 후 저장 목록에 반영 (Whisper가 없으면 비율 계산)"""
+        from function.audio_postprocess import convert_format
+
+        duration = self.line_duration(story_name, language, number)
+        if not duration:
+            return None
+        words = text_words(line)
+        timing, method = None, 'proportional'
+        if model is not None:
+            samples, rate = self.read_line_samples(story_name, language, number)
+            if samples is not None:
+                mono = convert_format(samples, rate, WHISPER_RATE, 1)[:, 0].copy()
+                recognized = whisper_word_times(model, mono, language)
+                if recognized:
+                    timing, method = map_recognized_timing(words, recognized, duration), 'whisper'
+        if timing is None:
+            timing = proportional_timing(words, duration)
+
+        with self.lock:
+            self.table(story_name, language)['lines'][str(number)] = {
+                'signature': self.line_signature(story_name, language, number),
+                'method': method,
+                'words': timing,
+            }
+        return timing
+
+    def align_story(self, story_name, language, should_stop=None):
+        """
+        음성이 있는 줄 중 시간표가 없거나 낡은 줄을 Whisper로 계산합니다.
+        Whisper가 로드되어 있지 않으면 아무것도 하지 않습니다 (재생 시 비율 계산으로 충분).
+        질문 기능이 Whisper를 쓰는 중이면 기다리지 않고 멈춤 (다음 유휴 때 이어서 계산).
+        인식에 실패한 줄은 비율 시간표를 저장해 다음 유휴 때 다시 시도하지 않습니다.
+        반환값: 계산한 줄 수
+        """
+        model = loaded_whisper_model()
+        lock = loaded_whisper_lock()
+        if model is None or lock is None:
+            return 0
+        lines = story_index.lines(story_name, language) or []
+        aligned = 0
+        try:
+            for number, line in enumerate(lines, 1):
+                if should_stop and should_stop():
+                    break
+                if not line_audio_available(story_name, language, number) or \
+                        self.stored_entry(story_name, language, number):
+                    continue
+                if not lock.acquire(blocking=False):
+                    print("⏸️ 질문 기능이 Whisper 사용 중 - 단어 시간표 계산 중단")
+                    break
+                try:
+                    if self.align_line(story_name, language, number, line, model):
+                        aligned += 1
+                finally:
+                    lock.release()
+        finally:
+            if aligned:
+                self.save(story_name, language)
+        if aligned:
+            print(f"⏱️ 단어 시간표: {story_name} ({language}) {aligned}줄")
+        return aligned
+
+
+class BrailleFollower:
+    def __init__(self, lead=PAGE_LEAD_SECONDS):
+        """재생 중인 줄의 단어 시간표에 맞춰 점자 페이지를 넘김"""
+        self.lead = lead
+        self.stop_event = None
+        self.lock = threading.Lock()
+        self.unavailable = False     # 이번 동화에서 점자 모듈이 연결되지 않았으면 더 시도하지 않음
+
+    def begin_story(self):
+        """동화 시작: 점자 모듈 연결 여부를 이번 동화에서 다시 확인"""
+        self.unavailable = False
+
+    def start_line(self, line, timing):
+        """줄 재생 시작: 점자 문서 준비와 페이지 넘김은 별도 스레드에서 (재생을 막지 않음)"""
+        self.stop()
+        if self.unavailable or not line.strip():
+            return
+        stop_event = threading.Event()
+        with self.lock:
+            self.stop_event = stop_event
+        threading.Thread(target=self.follow, args=(line, timing, stop_event, time.time()), daemon=True).start()
+
+    def follow(self, line, timing, stop_event, started):
+        """줄을 점자 문서로 열고, 각 페이지의 첫 단어가 시작할 때 그 페이지로 넘김"""
+        from braille.braille_pager import braille_pager, open_braille_text
+
+        if not braille_pager.get_display().connected:
+            if not self.unavailable:
+                print("ℹ️ 점자 모듈이 연결되지 않아 동화 점자 표시를 건너뜁니다.")
+            self.unavailable = True
+            return
+        if stop_event.is_set():
+            return
+        document = open_braille_text(line)
+        if not document or len(document) < 2 or not timing:
+            return
+
+        # 시간표 단어는 점자 페이지와 같은 기준(공백)으로 나눈 것
+        schedule = []
+        for word_index, page in enumerate(document.word_pages):
+            if page > 0 and word_index < len(timing) and (not schedule or schedule[-1][1] < page):
+                schedule.append((max(0.0, timing[word_index][1] - self.lead), page))
+        for at, page in schedule:
+            if stop_event.wait(max(0.0, started + at - time.time())):
+                return
+            braille_pager.go_to(page)
+
+    def stop(self):
+        with self.lock:
+            stop_event, self.stop_event = self.stop_event, None
+        if stop_event:
+            stop_event.set()
+
+
+# 전역 단어 시간표 / 점자 따라가기 인스턴스
+word_timing = WordTimingIndex()
+braille_follower = BrailleFollower()
+
+# 편의 함수들
+def get_line_timing(story_name, language, number, line):
+    return word_timing.line_timing(story_name, language, number, line)
+
+def align_all_stories(should_stop=None):
+    """모든 동화의 단어 시간표 계산 (유휴 작업)"""
+    for name in story_index.story_names():
+        for language in LANGUAGES:
+            if should_stop and should_stop():
+                return
+            word_timing.align_story(name, language, should_stop)
+
+if __name__ == "__main__":
+    # 테스트 (음성 없이 대응 계산만)
+    print("단어 시간표 테스트")
+    test_words = text_words("옛날 옛날에 토끼와 거북이가 살았어요")
+    print("  비율:", proportional_timing(test_words, 3.0))
+    test_recognized = [(" 옛날", 0.1, 0.4), (" 옛날에", 0.5, 0.9), (" 토끼와", 1.2, 1.6),
+                       (" 거북이가", 1.7, 2.2), (" 살았어요", 2.3, 2.9)]
+    print("  Whisper:", map_recognized_timing(test_words, test_recognized, 3.0))
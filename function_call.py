@@ -1,16 +1,19 @@
 # 실제 기능 모듈들을 임포트합니다.
-from function.function_picture import start_picture_mode, play_photo_sound_sequence, run_photo_analysis
-from function.function_story import go_to_fairytale, select_next_story, select_previous_story, read_selected_story
+from function.function_picture import start_picture_mode, play_photo_sound_sequence, run_photo_analysis, request_photo_cancel
+from function.function_story import go_to_fairytale, select_next_story, select_previous_story, read_selected_story, request_language_toggle, is_story_playing, request_story_cancel
 from function.function_question import start_question_mode, record_and_process_question, stop_question_recording, go_to_question
-from function.function_learning import LearningFunction
+from function.function_learning import learning_session
+from function.camera_service import warm_up_camera, release_camera
 import time
 import pygame
 import os
 import subprocess
 
 # 새로운 시스템 임포트
-from memory_manager import emergency_exit_to_main, get_memory_status
+from memory_manager import cancel_to_main, get_memory_status, memory_manager
 from navigation_system import nav_manager, NavigationState
+from resource_monitor import annotate_mode
+from braille.braille_pager import next_braille_page
 
 # pygame 초기화
 pygame.mixer.init()
@@ -33,6 +36,7 @@ FUNCTION_SOUND_FILES = {
 # 현재 선택된 기능 인덱스 (0: 사진, 1: 학습, 2: 질문, 3: 동화)
 current_function_index = 0
 functions = ["사진", "학습", "질문", "동화"]
+MENU_MODES = ["photo", "reading", "question", "story"]  # 메모리 스케줄러 모드 이름
 
 # 마지막 기능 변경 시간을 추적
 last_function_change_time = 0
@@ -91,6 +95,12 @@ def execute_function(signal):
         handle_cancel_button()
         return
     
+    # 동화 모드의 언어 전환 (신호 '4') - 읽는 중에도 처리 (같은 위치에서 다른 언어로 이어 읽기)
+    if signal == '4' and in_story_mode:
+        print("🌐 한국어/영어 전환")
+        request_language_toggle()
+        return
+    
     # 기능 처리 중이면 다른 입력 무시 (취소 버튼 제외)
     if is_processing_function:
         print("[DEBUG] 기능 처리 중 - 입력 무시 (취소 버튼은 가능)")
@@ -121,7 +131,7 @@ def execute_function(signal):
             read_selected_story()
             is_processing_function = False  # 기능 처리 완료
             in_story_mode = False  # 동화 읽기 완료 후 모드 종료
-            nav_manager.complete_function()  # 네비게이션 시스템에 완료 알림
+            complete_current_function()  # 네비게이션 시스템에 완료 알림
         return
     
     # 읽기 모드에서는 단계 선택 또는 단어 학습 처리
@@ -154,7 +164,7 @@ def execute_function(signal):
                 if not reading_learning_instance.in_word_learning:
                     in_reading_mode = False
                     reading_learning_instance = None
-                    nav_manager.complete_function()
+                    complete_current_function()
                 
                 is_processing_function = False
         return
@@ -171,7 +181,7 @@ def execute_function(signal):
                 # 쓰기가 완료되면 학습 모드 종료
                 in_learning_mode = False
                 learning_sub_mode = None
-                nav_manager.complete_function()  # 네비게이션 시스템에 완료 알림
+                complete_current_function()  # 네비게이션 시스템에 완료 알림
             
             is_processing_function = False  # 기능 처리 완료
         return
@@ -179,8 +189,7 @@ def execute_function(signal):
     # 학습 모드에서는 조이스틱으로 읽기/쓰기 선택
     if in_learning_mode:
         if signal == '1' or signal == '2':  # 위/아래 (토글 방식)
-            from function.function_learning import LearningFunction
-            learning = LearningFunction()
+            learning = learning_session
             input_processing_time = current_time
             
             # 현재 선택된 기능과 다른 기능으로 토글
@@ -202,8 +211,7 @@ def execute_function(signal):
                 print(f"선택된 학습 기능 실행: {learning_sub_mode}")
                 input_processing_time = current_time
                 is_processing_function = True  # 기능 처리 시작
-                from function.function_learning import LearningFunction
-                learning = LearningFunction()
+                learning = learning_session
                 
                 # 선택 확인 메시지 재생
                 if learning_sub_mode == 'reading':
@@ -214,6 +222,8 @@ def execute_function(signal):
                     learning.start_reading_mode()
                 elif learning_sub_mode == 'writing':
                     learning.play_writing_selected_prompt()
+                    memory_manager.enter_mode('writing')
+                    annotate_mode('writing')
                     # 간단한 쓰기 모드 시작
                     go_to_simple_writing()
                     # 쓰기 모드는 별도로 관리되므로 여기서는 학습 모드를 종료하지 않음
@@ -227,7 +237,7 @@ def execute_function(signal):
                 
                 # 읽기 모드나 쓰기 모드가 아닌 경우에만 완료 처리
                 if not in_reading_mode and learning_sub_mode != 'writing':
-                    nav_manager.complete_function()  # 네비게이션 시스템에 완료 알림
+                    complete_current_function()  # 네비게이션 시스템에 완료 알림
             else:
                 print("먼저 읽기 또는 쓰기 기능을 선택해주세요")
         return
@@ -246,7 +256,7 @@ def execute_function(signal):
                 recording_continues = handle_fake_recording_button()
                 if not recording_continues:  # 기능 완료
                     in_question_mode = False  # 질문 모드 종료
-                    nav_manager.complete_function()  # 네비게이션 시스템에 완료 알림
+                    complete_current_function()  # 네비게이션 시스템에 완료 알림
             
             is_processing_function = False  # 기능 처리 완료
         return
@@ -267,7 +277,8 @@ def execute_function(signal):
                 photo_continues = handle_fake_photo_button()
                 if not photo_continues:  # 기능 완료
                     in_photo_mode = False  # 사진 모드 종료
-                    nav_manager.complete_function()  # 네비게이션 시스템에 완료 알림
+                    release_camera()
+                    complete_current_function()  # 네비게이션 시스템에 완료 알림
             
             is_processing_function = False  # 기능 처리 완료
         return
@@ -290,8 +301,9 @@ def execute_function(signal):
     if current_time - last_function_change_time < FUNCTION_CHANGE_DELAY:
         return
     
-    # 입력 4번 제거 - 사용하지 않는 신호 무시
+    # 메인 메뉴의 신호 '4'는 열린 점자 문서(사진 설명, 질문 답변)의 다음 페이지
     if signal == '4':
+        next_braille_page()
         return
     
     if signal == '1':  # 위 (이전 기능으로 이동)
@@ -300,6 +312,7 @@ def execute_function(signal):
         last_function_change_time = current_time
         input_processing_time = current_time
         play_select_sound()
+        on_menu_hover()
         
         # 기능 변경 시에만 현재 선택된 기능 표시
         print(f"현재 선택된 기능: {functions[current_function_index]}")
@@ -315,6 +328,7 @@ def execute_function(signal):
         last_function_change_time = current_time
         input_processing_time = current_time
         play_select_sound()
+        on_menu_hover()
         
         # 기능 변경 시에만 현재 선택된 기능 표시
         print(f"현재 선택된 기능: {functions[current_function_index]}")
@@ -326,6 +340,24 @@ def execute_function(signal):
     
     # 신호가 '1' 또는 '2'일 때만 여기까지 도달 (위에서 return으로 종료됨)
 
+def complete_current_function():
+    """기능 완료 시 네비게이션 시스템에 알리고 텔레메트리에 모드 전환을 기록합니다."""
+    nav_manager.complete_function()
+    annotate_mode("main_menu")
+
+def on_menu_hover():
+    """메뉴 커서 이동 시 네비게이션 상태를 맞추고 다음 모드 준비(클립/모델)를 알립니다."""
+    nav_manager.main_menu_index = current_function_index
+    function_sound = FUNCTION_SOUND_FILES.get(functions[current_function_index])
+    nav_manager.notify_cursor('menu', MENU_MODES[current_function_index],
+                              clips=[os.path.join(SOUND_DIR, function_sound)] if function_sound else [])
+    
+    # "사진"에 커서가 오면 카메라 예열, 벗어나면 해제
+    if functions[current_function_index] == "사진":
+        warm_up_camera()
+    else:
+        release_camera()
+
 def play_select_sound():
     """현재 선택된 기능의 선택 사운드를 재생합니다."""
     global is_playing_sound
@@ -395,9 +427,14 @@ def execute_selected_function():
     """현재 선택된 기능을 실행합니다."""
     global current_function_index, in_photo_mode, in_story_mode, in_question_mode, in_learning_mode, learning_sub_mode
     
+    # 모드에 필요한 메모리 확보 (부족할 때만 오래 안 쓴 모델 언로드)
+    memory_manager.enter_mode(MENU_MODES[current_function_index])
+    annotate_mode(MENU_MODES[current_function_index])
+    
     if current_function_index == 0:
-        # 사진 기능: 모드 진입
+        # 사진 기능: 모드 진입 (카메라 예열)
         in_photo_mode = True
+        warm_up_camera()
         print("사진 모드 진입")
         print("상호작용 버튼을 눌러서 간단한 사진 기능을 시작하세요")
     elif current_function_index == 1:
@@ -411,8 +448,7 @@ def execute_selected_function():
         print("위아래로 읽기/쓰기를 선택하고, 상호작용 버튼으로 실행하세요")
         
         # 현재 선택된 기능 안내
-        from function.function_learning import LearningFunction
-        learning = LearningFunction()
+        learning = learning_session
         if learning_sub_mode == 'reading':
             print("현재 선택: 읽기 기능")
             learning.play_reading_prompt()
@@ -430,6 +466,7 @@ def execute_selected_function():
         go_to_fairytale()
         print("동화 모드 진입")
         print("좌우로 동화를 선택하고, 상호작용 버튼으로 읽기를 시작하세요")
+        print("레버 4번으로 한국어/영어를 바꿀 수 있습니다 (읽는 중에도 같은 위치에서 전환)")
 
 def go_to_study():
     """학습 기능"""
@@ -444,26 +481,41 @@ def go_to_fairytale():
     from function.function_story import start_story_mode
     start_story_mode()
 
+def handle_busy_signal(signal):
+    """
+    기능 실행 중(동화 읽기 등 메인 루프가 막힌 동안) 들어온 신호 처리 - 별도 읽기 스레드에서 호출
+    바로 처리했으면 True, 기능이 끝난 뒤 메인 루프에서 처리할 신호면 False
+    """
+    # 동화 재생 중 언어 전환 (신호 '4') - 신호 파일로 알려 같은 위치에서 다른 언어로 이어 읽기
+    if signal == '4' and in_story_mode and is_story_playing():
+        print("🌐 한국어/영어 전환 (재생 중)")
+        request_language_toggle()
+        return True
+    
+    # 취소 버튼 (신호 '6') - 재생 중인 동화 / 사진 설명은 바로 멈추고, 메뉴 복귀는 기능이 끝난 뒤 처리
+    if signal == '6':
+        if is_story_playing():
+            request_story_cancel()
+        request_photo_cancel()
+    return False
+
 def handle_cancel_button():
-    """취소 버튼 처리 - 모든 리소스 해제하고 메인 메뉴로 복귀"""
+    """취소 버튼 처리 - 즉시 메인 메뉴로 복귀 (리소스 정리는 필요할 때만 백그라운드에서)"""
     global current_function_index, in_photo_mode, in_story_mode, in_question_mode, in_learning_mode, learning_sub_mode, in_writing_mode, in_reading_mode, reading_learning_instance, is_processing_function, last_interaction_time
     
     print("🚨 취소 버튼 실행 - 모든 기능 종료 중...")
+    cancel_start_time = time.time()
     
     # 1. 진행 중인 처리 강제 중단
     is_processing_function = True
     
-    # 1.5. 동화 재생 중단 신호 전송
-    try:
-        cancel_signal_file = "/tmp/cancel_story_signal.txt"
-        with open(cancel_signal_file, 'w') as f:
-            f.write("1")
-        print("📢 동화 재생 중단 신호 전송")
-    except:
-        pass
+    # 1.5. 동화 재생 / 사진 설명 중단 신호 전송
+    request_story_cancel()
+    request_photo_cancel()
     
-    # 2. 메모리 정리 및 모든 모델 언로드
-    cleanup_results = emergency_exit_to_main()
+    # 2. 오디오 즉시 중지 (메모리 정리는 압박이 있을 때만 백그라운드에서)
+    cancel_to_main()
+    release_camera()
     
     # 3. 모든 모드 플래그 초기화
     in_photo_mode = False
@@ -481,11 +533,12 @@ def handle_cancel_button():
     
     # 5. 네비게이션 시스템 초기화
     success, msg, state = nav_manager.go_back()
+    annotate_mode("main_menu")
     
     # 6. 메인 메뉴 상태로 복귀
     current_function_index = 0  # 첫 번째 기능(사진)으로 리셋
     is_processing_function = False
     
-    print("✅ 메인 메뉴로 복귀 완료")
+    print(f"✅ 메인 메뉴로 복귀 완료 ({(time.time() - cancel_start_time) * 1000:.0f}ms)")
     print(f"현재 선택된 기능: {functions[current_function_index]}")
     print("조이스틱으로 기능을 선택하고 상호작용 버튼으로 실행하세요")
\ No newline at end of file
@@ -2,6 +2,7 @@ import time
 import sys
 import os
 import warnings
+from collections import deque
 
 # 모든 경고 숨기기
 warnings.filterwarnings("ignore")
@@ -9,8 +10,11 @@ warnings.filterwarnings("ignore")
 # pygame 경고 숨기기
 os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
 
-from connect_arduino import initialize_connection, read_signal, send_signal, close_connection
-from function_call import execute_function, execute_selected_function
+from connect_arduino import initialize_connection, read_signal, send_signal, close_connection, SignalRelay
+from function_call import execute_function, execute_selected_function, handle_busy_signal
+from resource_monitor import start_resource_monitor, export_telemetry
+from idle_scheduler import start_idle_scheduler, begin_input, end_input
+from prefetch_engine import start_prefetch_engine
 
 def main():
     """
@@ -26,6 +30,15 @@ def main():
         print("프로그램을 종료합니다.")
         return
 
+    # 리소스 텔레메트리 (멈춤 현상과 메모리 압박 상관관계 분석용)
+    start_resource_monitor()
+
+    # 입력이 없는 동안 음성 합성 / 압축 등 유지보수 작업 (입력이 오면 즉시 중단)
+    start_idle_scheduler()
+    
+    # 커서가 머무는 기능/동화/단계에 필요한 음성과 모델을 미리 준비
+    start_prefetch_engine()
+
     try:
         print("한이음 눈송이 꿈 프로젝트 시작")
         print("조이스틱 조작법:")
@@ -33,13 +46,20 @@ def main():
         print("   상호작용 버튼: 선택된 기능 실행")
         print("아두이노 레버 조작을 기다립니다...")
         
+        deferred_signals = deque()  # 기능 실행 중에 들어와 나중에 처리할 신호
         while True:
-            # 2. 아두이노로부터 신호 읽기
-            signal = read_signal(ser)
+            # 2. 아두이노로부터 신호 읽기 (실행 중에 미뤄 둔 신호가 먼저)
+            signal = deferred_signals.popleft() if deferred_signals else read_signal(ser)
            
-            # 3. 신호가 있으면 해당 기능 실행
+            # 3. 신호가 있으면 해당 기능 실행 (실행 중 신호는 별도 스레드가 읽음 - 동화 언어 전환 등)
             if signal :
-                execute_function(signal)
+                begin_input(signal)
+                relay = SignalRelay(ser, handle_busy_signal).start()
+                try:
+                    execute_function(signal)
+                finally:
+                    deferred_signals.extend(relay.stop())
+                    end_input()
                 send_signal(ser)  # 아두이노 플래그 리셋
                 
             # 불필요한 CPU 사용을 막기 위해 잠시 대기
@@ -50,6 +70,7 @@ def main():
     finally:
         # 4. 프로그램 종료 시 연결 해제
         close_connection(ser)
+        export_telemetry()
         print("프로그램을 안전하게 종료합니다.")
 
 if __name__ == "__main__":
@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+유휴 시간 백그라운드 작업 스케줄러
+- 조이스틱 입력과 네비게이션 상태로 "기기가 쉬고 있는지" 판단
+- 마지막 입력 후 IDLE_DELAY초가 지나면 등록된 작업을 하나씩 실행
+- 입력이 들어오는 즉시 작업을 중단 (작업은 should_stop()을 수시로 확인)
+- CPU 사용률 / 온도(/sys/class/thermal)가 한도를 넘으면 작업을 시작하지 않음
+- 기본 작업: 동화 인덱스 갱신, 빠진 동화 음성 합성(TTS 백그라운드 우선순위), 묶음 파일 생성,
+  단어 시간표 계산, 음성 압축
+"""
+
+import os
+import glob
+import time
+import threading
+import psutil
+
+from navigation_system import NavigationState, nav_manager
+
+IDLE_DELAY = 30.0              # 마지막 입력 후 이 시간이 지나야 작업 시작 (초)
+CHECK_INTERVAL = 1.0           # 유휴 상태 확인 주기 (초)
+CPU_CEILING = 60.0             # 이보다 CPU 사용률이 높으면 작업을 시작하지 않음 (%)
+THERMAL_CEILING = 70.0         # 이보다 뜨거우면 작업 시작/계속 안 함 (°C)
+THERMAL_ROOT = "/sys/class/thermal"
+MISSING_AUDIO_BATCH = 5        # 한 번에 백그라운드 합성 요청할 동화 줄 수
+
+# 이 화면에서는 사용자가 안내를 듣거나 기능을 쓰는 중이 아니므로 작업 가능
+IDLE_STATES = (NavigationState.MAIN_MENU, NavigationState.STORY_SELECT, NavigationState.LEARNING_SELECT)
+
+
+class IdleJob:
+    def __init__(self, name, func, min_interval):
+        """유휴 작업 하나 (func(should_stop) 형태로 호출)"""
+        self.name = name
+        self.func = func
+        self.min_interval = min_interval   # 같은 작업을 다시 실행하기까지 최소 간격 (초)
+        self.last_run = 0
+        self.runs = 0
+        self.interrupted = 0
+        self.failures = 0
+        self.total_seconds = 0.0
+
+
+class IdleScheduler:
+    def __init__(self, idle_delay=IDLE_DELAY, cpu_ceiling=CPU_CEILING,
+                 thermal_ceiling=THERMAL_CEILING, thermal_root=THERMAL_ROOT, nav_manager=None):
+        """유휴 스케줄러 초기화 (thermal_root를 바꾸면 가짜 sysfs로 테스트 가능)"""
+        self.idle_delay = idle_delay
+        self.cpu_ceiling = cpu_ceiling
+        self.thermal_ceiling = thermal_ceiling
+        self.thermal_root = thermal_root
+        self.nav_manager = nav_manager
+
+        self.jobs = []
+        self.last_input_time = time.time()
+        self.active_inputs = 0           # 처리 중인 입력 (기능 실행 중이면 1 이상)
+        self.interrupt = threading.Event()
+        self.lock = threading.Lock()
+        self.current_job = None
+        self.thread = None
+        self.stop_event = threading.Event()
+
+        # 첫 cpu_percent 호출은 항상 0이므로 미리 한 번 호출
+        psutil.cpu_percent(None)
+
+    # ---------------- 작업 등록 ----------------
+
+    def register(self, name, func, min_interval=600):
+        """유휴 작업 등록 (등록 순서대로 실행)"""
+        with self.lock:
+            self.jobs = [job for job in self.jobs if job.name != name]
+            self.jobs.append(IdleJob(name, func, min_interval))
+
+    # ---------------- 입력 이벤트 ----------------
+
+    def begin_input(self, signal=None):
+        """조이스틱 입력 도착: 실행 중인 작업을 즉시 중단하고 유휴 타이머 초기화"""
+        with self.lock:
+            self.active_inputs += 1
+            self.last_input_time = time.time()
+        self.interrupt.set()
+        self.pause_background_tts()
+
+    def end_input(self):
+        """입력 처리(기능 실행) 완료: 이때부터 다시 유휴 시간 계산"""
+        with self.lock:
+            self.active_inputs = max(0, self.active_inputs - 1)
+            self.last_input_time = time.time()
+
+    def note_input(self, signal=None):
+        """기능 실행 없이 입력만 기록"""
+        self.begin_input(signal)
+        self.end_input()
+
+    def pause_background_tts(self):
+        from tts_scheduler import tts_scheduler
+        tts_scheduler.pause_background()
+
+    def resume_background_tts(self):
+        from tts_scheduler import tts_scheduler
+        tts_scheduler.resume_background()
+
+    # ---------------- 유휴 / 자원 판단 ----------------
+
+    def idle_seconds(self):
+        with self.lock:
+            if self.active_inputs:
+                return 0.0
+            return time.time() - self.last_input_time
+
+    def nav_allows(self):
+        """네비게이션 상태가 작업해도 되는 화면인지"""
+        if self.nav_manager is None:
+            return True
+        return self.nav_manager.current_state in IDLE_STATES and not self.nav_manager.is_processing
+
+    def is_idle(self):
+        return self.idle_seconds() >= self.idle_delay and self.nav_allows()
+
+    def read_temperature(self):
+        """thermal_zone*/temp 중 최고 온도 (°C, 밀리도 단위를 변환), 읽을 수 없으면 None"""
+        temperatures = []
+        for path in glob.glob(os.path.join(self.thermal_root, "thermal_zone*", "temp")):
+            try:
+                with open(path, 'r') as f:
+                    value = float(f.read().strip())
+            except (OSError, ValueError):
+                continue
+            temperatures.append(value / 1000 if value > 1000 else value)
+        return max(temperatures) if temperatures else None
+
+    def too_hot(self):
+        temperature = self.read_temperature()
+        return temperature is not None and temperature >= self.thermal_ceiling
+
+    def resources_allow(self):
+        """CPU / 온도 한도 확인 (작업 시작 전에만 CPU를 봄 - 작업 자체의 사용률 제외)"""
+        cpu = psutil.cpu_percent(None)
+        if cpu >= self.cpu_ceiling:
+            return False
+        return not self.too_hot()
+
+    def should_stop(self):
+        """작업이 수시로 확인하는 중단 조건: 입력 도착, 과열, 스케줄러 종료"""
+        return self.interrupt.is_set() or self.stop_event.is_set() or self.too_hot()
+
+    # ---------------- 실행 ----------------
+
+    def next_job(self):
+        """실행 간격이 지난 첫 번째 작업"""
+        now = time.time()
+        with self.lock:
+            for job in self.jobs:
+                if now - job.last_run >= job.min_interval:
+                    return job
+        return None
+
+    def run_job(self, job):
+        """작업 하나 실행 (중단되면 last_run을 갱신하지 않아 다음 유휴 때 이어서 실행)"""
+        self.current_job = job
+        start = time.time()
+        print(f"🌙 유휴 작업 시작: {job.name}")
+        try:
+            job.func(self.should_stop)
+            failed = False
+        except Exception as e:
+            print(f"⚠️ 유휴 작업 오류 ({job.name}): {e}")
+            failed = True
+        finally:
+            self.current_job = None
+
+        elapsed = time.time() - start
+        job.total_seconds += elapsed
+        if self.should_stop() and not failed:
+            job.interrupted += 1
+            print(f"⏸️ 유휴 작업 중단: {job.name} ({elapsed:.1f}초)")
+            return False
+        job.runs += 1
+        job.failures += failed
+        job.last_run = time.time()
+        print(f"✅ 유휴 작업 완료: {job.name} ({elapsed:.1f}초)")
+        return True
+
+    def tick(self):
+        """유휴 상태면 작업 하나 실행, 실행했으면 True"""
+        if not self.is_idle():
+            return False
+        self.interrupt.clear()
+        if not self.resources_allow():
+            self.pause_background_tts()
+            return False
+        self.resume_background_tts()
+        job = self.next_job()
+        if not job:
+            return False
+        self.run_job(job)
+        return True
+
+    def start(self, interval=CHECK_INTERVAL):
+        """유휴 감시 스레드 시작 (이미 실행 중이면 무시)"""
+        if self.thread and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+
+        def idle_loop():
+            while not self.stop_event.is_set():
+                try:
+                    if not self.tick():
+                        self.stop_event.wait(interval)
+                except Exception as e:
+                    print(f"⚠️ 유휴 스케줄러 오류: {e}")
+                    self.stop_event.wait(interval)
+
+        self.thread = threading.Thread(target=idle_loop, daemon=True)
+        self.thread.start()
+        print(f"🌙 유휴 스케줄러 시작 ({self.idle_delay:.0f}초 무입력 후 작업 {len(self.jobs)}개)")
+
+    def stop(self):
+        self.stop_event.set()
+        self.interrupt.set()
+        if self.thread:
+            self.thread.join(timeout=5)
+            self.thread = None
+
+    def stats(self):
+        """작업별 실행 / 중단 / 실패 횟수"""
+        idle_seconds = self.idle_seconds()
+        temperature = self.read_temperature()
+        with self.lock:
+            return {
+                'idle_seconds': round(idle_seconds, 1),
+                'temperature': temperature,
+                'current_job': self.current_job.name if self.current_job else None,
+                'jobs': {job.name: {'runs': job.runs, 'interrupted': job.interrupted,
+                                    'failures': job.failures,
+                                    'total_seconds': round(job.total_seconds, 1),
+                                    'last_run': job.last_run}
+                         for job in self.jobs}
+            }
+
+
+# ===================================================================
+#                           DEFAULT JOBS
+# ===================================================================
+
+def prerender_unavailable_clip_job(should_stop):
+    """서버 연결 불가 안내 음성을 미리 합성 (장애 때 합성 대기 없이 바로 재생)"""
+    from ollama_client import UNAVAILABLE_MESSAGE, unavailable_clip_path
+    from function.audio_store import resolve_audio
+    from tts_scheduler import tts_scheduler, BACKGROUND
+
+    wav_path = unavailable_clip_path()
+    if resolve_audio(wav_path):
+        return
+    os.makedirs(os.path.dirname(wav_path), exist_ok=True)
+    job = tts_scheduler.submit(UNAVAILABLE_MESSAGE, wav_path, BACKGROUND)
+    while not job.done.wait(0.5):
+        if should_stop():
+            return
+
+def refresh_story_index_job(should_stop):
+    """동화 폴더 변경 반영"""
+    from function.story_index import story_index
+    story_index.refresh()
+
+def synthesize_missing_story_audio_job(should_stop):
+    """음성이 없는 동화 줄을 TTS 백그라운드 우선순위로 합성 (입력이 오면 스케줄러가 양보)"""
+    from function.story_index import story_index, LANGUAGES
+    from function.story_pack import line_audio_available
+    from tts_scheduler import tts_scheduler, BACKGROUND
+
+    jobs = []
+    for name in story_index.story_names():
+        for language in LANGUAGES:
+            for number, line in enumerate(story_index.lines(name, language) or [], 1):
+                if len(jobs) >= MISSING_AUDIO_BATCH:
+                    break
+                # 묶음 파일로 옮겨진 줄도 음성이 있는 것으로 봄 (묶은 뒤 줄 파일은 삭제됨)
+                if line_audio_available(name, language, number):
+                    continue
+                jobs.append(tts_scheduler.submit(
+                    line, story_index.line_audio_path(name, language, number), BACKGROUND,
+                    on_done=lambda success, n=name, l=language, k=number:
+                        success and story_index.record_line_audio(n, l, k)))
+
+    # 중단되어도 작업은 큐에 남아 있다가 다음 유휴 때 이어서 실행
+    for job in jobs:
+        while not job.done.wait(0.5):
+            if should_stop():
+                return
+
+def pack_stories_job(should_stop):
+    """모든 줄 음성이 준비되었지만 묶음 파일이 오래된 동화를 다시 묶음"""
+    from function.story_index import story_index, LANGUAGES
+    from function.story_pack import pack_story, is_pack_fresh
+
+    for name in story_index.story_names():
+        for language in LANGUAGES:
+            if should_stop():
+                return
+            if not is_pack_fresh(name, language):
+                pack_story(name, language)
+
+def align_story_words_job(should_stop):
+    """동화 줄 음성의 단어 시간표 계산 (이미 로드된 Whisper가 있을 때만)"""
+    from function.word_timing import align_all_stories
+    align_all_stories(should_stop)
+
+def compress_audio_job(should_stop):
+    """분류별 코덱으로 WAV 압축"""
+    from function.audio_store import compress_all
+    compress_all(should_stop)
+
+def register_default_jobs(scheduler):
+    scheduler.register("unavailable_clip", prerender_unavailable_clip_job, min_interval=600)
+    scheduler.register("story_index", refresh_story_index_job, min_interval=300)
+    scheduler.register("missing_story_audio", synthesize_missing_story_audio_job, min_interval=60)
+    scheduler.register("pack_stories", pack_stories_job, min_interval=600)
+    scheduler.register("word_timing", align_story_words_job, min_interval=600)
+    scheduler.register("compress_audio", compress_audio_job, min_interval=1800)
+
+
+# 전역 유휴 스케줄러 인스턴스
+idle_scheduler = IdleScheduler(nav_manager=nav_manager)
+register_default_jobs(idle_scheduler)
+
+# 편의 함수들
+def start_idle_scheduler():
+    """유휴 감시 시작"""
+    idle_scheduler.start()
+
+def begin_input(signal=None):
+    """입력 도착 (실행 중인 유휴 작업 즉시 중단)"""
+    idle_scheduler.begin_input(signal)
+
+def end_input():
+    """입력 처리 완료"""
+    idle_scheduler.end_input()
+
+def get_idle_stats():
+    return idle_scheduler.stats()
+
+if __name__ == "__main__":
+    # 테스트 (가짜 sysfs 온도 + 가짜 작업)
+    import tempfile
+    print("유휴 스케줄러 테스트")
+    fake_root = tempfile.mkdtemp()
+    os.makedirs(os.path.join(fake_root, "thermal_zone0"))
+    temp_path = os.path.join(fake_root, "thermal_zone0", "temp")
+    with open(temp_path, 'w') as f:
+        f.write("45000")
+
+    def slow_job(should_stop):
+        for _ in range(50):
+            if should_stop():
+                return
+            time.sleep(0.1)
+
+    scheduler = IdleScheduler(idle_delay=0.5, cpu_ceiling=100.0, thermal_root=fake_root)
+    scheduler.pause_background_tts = scheduler.resume_background_tts = lambda: None
+    scheduler.register("slow", slow_job, min_interval=0)
+    print(f"온도: {scheduler.read_temperature()}°C")
+    scheduler.start(interval=0.1)
+    time.sleep(1.5)
+    start = time.time()
+    scheduler.begin_input('1')
+    while scheduler.current_job:
+        time.sleep(0.01)
+    print(f"입력 후 중단까지: {(time.time() - start) * 1000:.0f}ms")
+    scheduler.end_input()
+
+    with open(temp_path, 'w') as f:
+        f.write("85000")
+    time.sleep(1.5)
+    print(f"과열 중 실행 작업: {scheduler.current_job}")
+    scheduler.stop()
+    print(scheduler.stats())
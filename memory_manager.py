@@ -2,6 +2,7 @@
 """
 통합 메모리 관리 시스템
 - 모든 AI 모델의 로드/언로드 관리
+- 메모리 예산 기반 스케줄러 (LRU 언로드 + 다음 모델 예측 프리로드)
 - GPU 메모리 정리
 - 프로세스 종료
 """
@@ -9,9 +10,42 @@
 import subprocess
 import os
 import gc
+import time
+import threading
 import psutil
 import signal
 
+# --- 메모리 예산 설정 (Jetson Orin Nano 8GB 기준) ---
+MEMORY_BUDGET_MB = 6144  # 모델/헬퍼에 쓸 수 있는 전체 RAM 예산 (OS, 메인 프로세스 제외)
+MEMORY_PRESSURE_PERCENT = 80  # 취소 후 이 사용률을 넘을 때만 백그라운드 정리
+DEFERRED_CLEANUP_DELAY = 1.0  # 취소 후 백그라운드 정리까지 대기 (초)
+
+# 구성요소별 기본 메모리 사용량 (MB) - 실제 로드 시 측정값으로 갱신됨
+DEFAULT_FOOTPRINTS_MB = {
+    'whisper': 1100,
+    'llava': 4700,
+    'tinyllama': 900,
+    'tts_server': 2200,   # GPT-SoVITS 합성 프로세스 (요청마다 떴다가 종료 - 합성할 때마다 최대 RSS로 갱신)
+    'ocr': 900
+}
+
+# 모드별로 필요한 구성요소
+MODE_REQUIREMENTS = {
+    'photo': ['llava'],   # tts_server는 LLaVA와 같이 예산에 들어갈 때만 겹쳐 씀 (아니면 LLaVA를 내린 뒤 합성)
+    'question': ['whisper', 'tinyllama', 'tts_server'],
+    'reading': ['tts_server'],
+    'writing': ['ocr'],
+    'story': ['tts_server']
+}
+
+# 메인 메뉴 항목 → 모드
+MENU_TO_MODE = {
+    "사진": 'photo',
+    "학습": 'reading',
+    "질문": 'question',
+    "동화": 'story'
+}
+
 class MemoryManager:
     def __init__(self):
         """메모리 관리자 초기화"""
@@ -21,6 +55,16 @@ class MemoryManager:
             'tinyllama_active': False,
             'tts_processes': []
         }
+
+        # 메모리 예산 스케줄러 상태
+        self.memory_budget_mb = MEMORY_BUDGET_MB
+        self.footprints_mb = dict(DEFAULT_FOOTPRINTS_MB)
+        self.resident = {}  # 구성요소 → 마지막 사용 시각 (메모리에 올라와 있는 것만)
+        self.scheduler_lock = threading.RLock()
+        self.preload_thread = None
+
+        # 취소 후 지연 정리 스레드
+        self.deferred_cleanup_thread = None
     
     def unload_whisper_model(self):
         """Whisper 모델 언로드"""
@@ -32,6 +76,7 @@ class MemoryManager:
                 del fq.whisper_model
                 fq.whisper_model = None
                 self.loaded_models['whisper'] = None
+                self.mark_unloaded('whisper')
                 print("✅ Whisper 모델 언로드 완료")
                 return True
         except Exception as e:
@@ -55,7 +100,7 @@ class MemoryManager:
                 if result.returncode == 0:
                     print(f"✅ {model} 모델 중지 완료")
                     stopped_models.append(model)
-                    self.loaded_models[f'{model}_active'] = False
+                    self.mark_unloaded(model)
                 else:
                     print(f"⚠️ {model} 모델 중지 실패: {result.stderr}")
             except subprocess.TimeoutExpired:
@@ -74,7 +119,11 @@ class MemoryManager:
             'tts_server'
         ]
         
-        killed_count = 0
+        # 관리자가 띄운 TTS는 프로세스 그룹 단위로 즉시 종료
+        from process_supervisor import supervisor
+        killed_count = supervisor.kill_group('tts')
+
+        # 관리자 밖에서 남은 프로세스는 패턴으로 정리
         for pattern in tts_patterns:
             try:
                 print(f"🔫 TTS 프로세스 종료 중: {pattern}")
@@ -93,6 +142,8 @@ class MemoryManager:
     
     def kill_tablet_processes(self):
         """태블릿 관련 프로세스 종료"""
+        from process_supervisor import supervisor
+        supervisor.kill('writing_mode')
         try:
             # 실행 중인 태블릿 프로세스 찾기
             for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
@@ -149,6 +200,10 @@ class MemoryManager:
             'gpu': self.clear_gpu_memory(),
             'system': self.clear_system_memory()
         }
+
+        # 모든 구성요소가 내려갔으므로 스케줄러 상태 초기화
+        with self.scheduler_lock:
+            self.resident.clear()
         
         success_count = sum(1 for success in cleanup_results.values() if success)
         total_count = len(cleanup_results)
@@ -158,6 +213,237 @@ class MemoryManager:
         
         return cleanup_results
     
+    # ===================================================================
+    #                      취소 버튼 (즉시 단계 / 지연 단계)
+    # ===================================================================
+
+    def stop_audio(self):
+        """재생 중인 모든 오디오 즉시 중지"""
+        try:
+            import pygame
+            if pygame.mixer.get_init():
+                pygame.mixer.music.stop()
+                pygame.mixer.stop()
+            return True
+        except Exception as e:
+            print(f"⚠️ 오디오 중지 오류: {e}")
+            return False
+
+    def is_under_memory_pressure(self):
+        """메모리 사용률이 임계치를 넘었는지 확인"""
+        try:
+            return psutil.virtual_memory().percent >= MEMORY_PRESSURE_PERCENT
+        except Exception:
+            return False
+
+    def fast_cancel(self):
+        """즉시 단계: 오디오 중지만 하고 바로 반환 (수십 ms 이내)"""
+        start = time.time()
+        self.stop_audio()
+
+        # 대기 중인 대화형/미리 읽기 TTS 작업 취소 (백그라운드 준비 작업은 유지)
+        from tts_scheduler import tts_scheduler
+        tts_scheduler.cancel_pending()
+
+        # 진행 중인 헬퍼(TTS, 쓰기 모드 등) 프로세스 트리 종료 - 대기하지 않음
+        from process_supervisor import supervisor
+        supervisor.kill_all(wait=False)
+        print(f"⚡ 즉시 취소 완료 ({(time.time() - start) * 1000:.0f}ms)")
+
+    def deferred_cleanup(self):
+        """지연 단계: 메모리 압박이 있을 때만 LRU 순서로 구성요소를 내림"""
+        if not self.is_under_memory_pressure():
+            print("ℹ️ 메모리 여유 있음 - 백그라운드 정리 생략")
+            return False
+
+        print("🧹 메모리 압박 감지 - 백그라운드 정리 시작")
+        with self.scheduler_lock:
+            victims = sorted(self.resident, key=lambda c: self.resident[c])
+        for component in victims:
+            self.unload_component(component)
+            if not self.is_under_memory_pressure():
+                print("✅ 백그라운드 정리 완료")
+                return True
+
+        # 그래도 부족하면 기존 긴급 정리 실행
+        self.emergency_memory_cleanup()
+        return True
+
+    def schedule_deferred_cleanup(self, delay=DEFERRED_CLEANUP_DELAY):
+        """지연 단계를 백그라운드 스레드로 예약 (이미 예약되어 있으면 무시)"""
+        if self.deferred_cleanup_thread and self.deferred_cleanup_thread.is_alive():
+            return
+
+        def cleanup_worker():
+            time.sleep(delay)
+            try:
+                self.deferred_cleanup()
+            except Exception as e:
+                print(f"⚠️ 백그라운드 정리 오류: {e}")
+
+        self.deferred_cleanup_thread = threading.Thread(target=cleanup_worker, daemon=True)
+        self.deferred_cleanup_thread.start()
+
+    # ===================================================================
+    #                      메모리 예산 스케줄러
+    # ===================================================================
+
+    def mark_loaded(self, component):
+        """구성요소가 메모리에 올라왔거나 사용되었음을 기록 (LRU 갱신)"""
+        with self.scheduler_lock:
+            self.resident[component] = time.time()
+        if component in ('llava', 'tinyllama'):
+            self.loaded_models[f'{component}_active'] = True
+
+    def mark_unloaded(self, component):
+        """구성요소가 메모리에서 내려갔음을 기록"""
+        with self.scheduler_lock:
+            self.resident.pop(component, None)
+        if component in ('llava', 'tinyllama'):
+            self.loaded_models[f'{component}_active'] = False
+
+    def record_footprint(self, component, used_mb):
+        """실제 측정된 메모리 사용량을 반영 (이동 평균)"""
+        if used_mb <= 0:
+            return
+        with self.scheduler_lock:
+            previous = self.footprints_mb.get(component)
+            if previous is None:
+                self.footprints_mb[component] = used_mb
+            else:
+                self.footprints_mb[component] = round(previous * 0.5 + used_mb * 0.5)
+        print(f"📏 {component} 메모리 사용량 측정: {used_mb:.0f}MB")
+
+    def fits_together(self, *components):
+        """구성요소들을 동시에 올려도 예산 안인지 (측정값이 있으면 측정값 기준)"""
+        with self.scheduler_lock:
+            return sum(self.footprints_mb.get(c, 0) for c in components) <= self.memory_budget_mb
+
+    def resident_usage_mb(self):
+        """현재 올라와 있는 구성요소들의 예상 사용량 합계"""
+        with self.scheduler_lock:
+            return sum(self.footprints_mb.get(c, 0) for c in self.resident)
+
+    def headroom_mb(self):
+        """예산 기준 여유 메모리와 실제 가용 메모리 중 작은 값"""
+        budget_free = self.memory_budget_mb - self.resident_usage_mb()
+        try:
+            system_free = psutil.virtual_memory().available / 1024**2
+        except Exception:
+            system_free = budget_free
+        return min(budget_free, system_free)
+
+    def unload_component(self, component):
+        """구성요소 하나를 언로드"""
+        print(f"🧹 {component} 언로드 (LRU)")
+        if component == 'whisper':
+            ok = self.unload_whisper_model()
+        elif component in ('llava', 'tinyllama'):
+            from ollama_client import ollama_client
+            ok = ollama_client.unload_model(component)
+        elif component == 'tts_server':
+            ok = self.kill_all_tts_processes()
+        elif component == 'ocr':
+            from process_supervisor import supervisor
+            ok = supervisor.kill_group('ocr') > 0 or \
+                subprocess.run(['pkill', '-f', 'ocr_recognizer'], capture_output=True).returncode == 0
+        else:
+            ok = False
+        self.mark_unloaded(component)
+        return ok
+
+    def enter_mode(self, mode):
+        """모드 진입 - 필요한 공간이 부족할 때만 오래 안 쓴 구성요소부터 언로드"""
+        needed = MODE_REQUIREMENTS.get(mode, [])
+        with self.scheduler_lock:
+            missing = [c for c in needed if c not in self.resident]
+            required_mb = sum(self.footprints_mb.get(c, 0) for c in missing)
+            evicted = []
+
+            # 이 모드에서 쓰지 않는 구성요소를 오래된 순서로
+            candidates = sorted(
+                (c for c in self.resident if c not in needed),
+                key=lambda c: self.resident[c]
+            )
+            while required_mb > self.headroom_mb() and candidates:
+                victim = candidates.pop(0)
+                self.unload_component(victim)
+                evicted.append(victim)
+
+            if required_mb > self.headroom_mb():
+                print(f"⚠️ '{mode}' 모드에 필요한 메모리가 부족할 수 있습니다 ({required_mb}MB 필요)")
+
+            # 이미 올라와 있는 구성요소만 LRU 시각 갱신 (새로 로드되는 모델은 로드할 때 mark_loaded로 기록)
+            for component in needed:
+                if component in self.resident:
+                    self.resident[component] = time.time()
+
+        if evicted:
+            print(f"📦 '{mode}' 모드 진입: {', '.join(evicted)} 언로드 ({required_mb}MB 필요)")
+        return evicted
+
+    def predict_next_mode(self, nav):
+        """네비게이션 상태로 다음에 진입할 모드를 예측"""
+        from navigation_system import NavigationState
+
+        if nav.current_state == NavigationState.MAIN_MENU:
+            return MENU_TO_MODE.get(nav.get_current_menu_item())
+        if nav.current_state == NavigationState.LEARNING_SELECT:
+            return nav.learning_sub_mode or 'reading'
+        if nav.current_state == NavigationState.STORY_SELECT:
+            return 'story'
+        return None
+
+    def preload_component(self, component):
+        """구성요소 하나를 미리 로드하고 실제 사용량을 측정"""
+        before = psutil.virtual_memory().used / 1024**2
+        ok = False
+        if component == 'whisper':
+            import function.function_question as fq
+            if fq.whisper_model is None:
+                fq.whisper_model = fq.whisper.load_model("small")
+            ok = True
+        elif component in ('llava', 'tinyllama'):
+            from ollama_client import ollama_client
+            ok = ollama_client.load_model(component)
+        # TTS/OCR은 호출 시 뜨는 프로세스라 미리 띄우지 않음
+
+        if ok:
+            self.record_footprint(component, psutil.virtual_memory().used / 1024**2 - before)
+            self.mark_loaded(component)
+        return ok
+
+    def preload_for_navigation(self, nav):
+        """다음 모드에 필요한 모델을 백그라운드에서 프리로드 (예산 안에서만, 언로드 없음)"""
+        mode = self.predict_next_mode(nav)
+        if not mode:
+            return None
+        if self.preload_thread and self.preload_thread.is_alive():
+            return None
+
+        with self.scheduler_lock:
+            missing = [c for c in MODE_REQUIREMENTS.get(mode, [])
+                       if c not in self.resident and c in ('whisper', 'llava', 'tinyllama')]
+        if not missing:
+            return None
+
+        required_mb = sum(self.footprints_mb.get(c, 0) for c in missing)
+        if required_mb > self.headroom_mb():
+            # 예측만으로는 다른 모델을 내리지 않음
+            return None
+
+        def preload_worker():
+            for component in missing:
+                try:
+                    print(f"🔮 '{mode}' 모드 예측 - {component} 프리로드")
+                    self.preload_component(component)
+                except Exception as e:
+                    print(f"⚠️ {component} 프리로드 오류: {e}")
+
+        self.preload_thread = threading.Thread(target=preload_worker, daemon=True)
+        self.preload_thread.start()
+        return missing
+
     def get_memory_status(self):
         """현재 메모리 사용량 확인"""
         try:
@@ -198,6 +484,11 @@ def emergency_exit_to_main():
     cleanup_results = memory_manager.emergency_memory_cleanup()
     return cleanup_results
 
+def cancel_to_main():
+    """취소 버튼 시 호출 - 즉시 반환하고, 리소스 정리는 필요할 때만 백그라운드에서"""
+    memory_manager.fast_cancel()
+    memory_manager.schedule_deferred_cleanup()
+
 def get_memory_status():
     """현재 메모리 상태 확인"""
     return memory_manager.get_memory_status()
@@ -37,6 +37,25 @@ class NavigationManager:
         self.last_interaction_time = 0
         self.interaction_cooldown = 0.5  # 0.5초 쿨다운
         
+        # 커서 이동 구독자 (미리 가져오기 등)
+        self.listeners = []
+        
+    def add_listener(self, callback):
+        """커서 이동 구독 - callback(kind, value, details)"""
+        if callback not in self.listeners:
+            self.listeners.append(callback)
+    
+    def notify_cursor(self, kind, value, **details):
+        """
+        커서 이동을 구독자에게 알림
+        kind: 'menu'(기능), 'story'(동화), 'stage'(학습 단계), 'reset'(메인 메뉴 복귀)
+        """
+        for listener in list(self.listeners):
+            try:
+                listener(kind, value, details)
+            except Exception as e:
+                print(f"⚠️ 네비게이션 구독자 오류: {e}")
+        
     def can_interact(self) -> bool:
         """상호작용 가능한지 확인 (쿨다운 체크)"""
         current_time = time.time()
@@ -175,6 +194,7 @@ class NavigationManager:
         self.learning_sub_mode = None
         self.story_index = 0
         self.is_processing = False
+        self.notify_cursor('reset', previous_state.value)
         
         return True, f"{previous_state.value}에서 메인 메뉴로 복귀", "main_menu"
     
@@ -188,6 +208,7 @@ class NavigationManager:
         self.learning_sub_mode = None
         self.story_index = 0
         self.is_processing = False
+        self.notify_cursor('reset', previous_state.value)
         
         return True, f"{previous_state.value} 완료 - 메인 메뉴로 복귀"
     
@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""
+Ollama HTTP 클라이언트
+- keep-alive 커넥션 풀 공유 (requests.Session)
+- 백그라운드 헬스 체크 (/api/version)
+- 서킷 브레이커: 서버가 죽어 있으면 즉시 실패 + 캐시된 음성 안내
+- 모델별 지연시간 히스토그램 (첫 토큰, 전체)
+"""
+
+import os
+import json
+import time
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+
+# --- Ollama 설정 ---
+OLLAMA_BASE_URL = os.environ.get("OLLAMA_HOST", "http://localhost:11434")
+CONNECT_TIMEOUT = 2.0           # 연결 타임아웃 (서버 다운 시 빠른 실패)
+HEALTH_PROBE_INTERVAL = 5.0     # 헬스 체크 주기 (초)
+HEALTH_PROBE_TIMEOUT = 1.0      # 헬스 체크 타임아웃 (초)
+FAILURE_THRESHOLD = 2           # 연속 실패 몇 번이면 차단할지
+OPEN_COOLDOWN = 15.0            # 차단 후 재시도까지 대기 (초)
+
+# 서버 연결 불가 시 재생할 음성 안내
+UNAVAILABLE_MESSAGE = "인공지능 서버에 연결할 수 없습니다. 잠시 후 다시 시도해주세요."
+UNAVAILABLE_WAV = "ollama_unavailable.wav"
+TTS_CACHE_DIR = "/home/drboom/py_project/hanium_snowdream/function/tts_cache/"
+
+# 히스토그램 버킷 경계 (밀리초)
+LATENCY_BUCKETS_MS = [100, 250, 500, 1000, 2000, 5000, 10000, 20000, 30000, 60000, 120000]
+
+
+class LatencyHistogram:
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        """고정 버킷 지연시간 히스토그램"""
+        self.buckets = list(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # 마지막 칸은 overflow
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, elapsed_ms):
+        """측정값 하나를 기록"""
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if elapsed_ms <= bound:
+                index = i
+                break
+        self.counts[index] += 1
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+
+    def percentile(self, p):
+        """버킷 상한 기준 근사 백분위수 (ms)"""
+        if self.count == 0:
+            return None
+        target = self.count * p / 100.0
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= target:
+                return self.buckets[i] if i < len(self.buckets) else self.max_ms
+        return self.max_ms
+
+    def summary(self):
+        """요약 통계 반환"""
+        return {
+            'count': self.count,
+            'avg_ms': self.total_ms / self.count if self.count else None,
+            'p50_ms': self.percentile(50),
+            'p90_ms': self.percentile(90),
+            'max_ms': self.max_ms if self.count else None,
+            'buckets': dict(zip([str(b) for b in self.buckets] + ['inf'], self.counts))
+        }
+
+
+class CircuitBreaker:
+    """연속 실패 시 요청을 차단하는 서킷 브레이커 (closed → open → half_open)"""
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=FAILURE_THRESHOLD, cooldown=OPEN_COOLDOWN):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0
+        self.probe_in_flight = False   # half_open에서 시험 요청이 진행 중인지
+        self.lock = threading.Lock()
+
+    def allow_request(self):
+        """요청을 보내도 되는지 확인 (통과하면 요청 결과를 record_* 또는 release로 알려야 함)"""
+        with self.lock:
+            if self.state == self.OPEN:
+                if time.time() - self.opened_at < self.cooldown:
+                    return False
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN:
+                # 한 번만 시험 삼아 통과, 결과가 나올 때까지 나머지는 차단
+                if self.probe_in_flight:
+                    return False
+                self.probe_in_flight = True
+            return True
+
+    def would_allow(self):
+        """시험 요청 자리를 차지하지 않고 요청 가능 여부만 확인"""
+        with self.lock:
+            if self.state == self.OPEN:
+                return time.time() - self.opened_at >= self.cooldown
+            if self.state == self.HALF_OPEN:
+                return not self.probe_in_flight
+            return True
+
+    def release(self):
+        """서버 상태와 무관하게 끝난 요청 (HTTP 오류 등) - 시험 요청 자리만 반납"""
+        with self.lock:
+            self.probe_in_flight = False
+
+    def record_success(self):
+        with self.lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self.probe_in_flight = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            self.probe_in_flight = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.time()
+
+    def force_open(self):
+        """헬스 체크 실패 시 즉시 차단"""
+        with self.lock:
+            if self.state != self.OPEN:
+                self.state = self.OPEN
+                self.opened_at = time.time()
+            self.probe_in_flight = False
+
+
+class OllamaClient:
+    def __init__(self, base_url=OLLAMA_BASE_URL, probe_interval=HEALTH_PROBE_INTERVAL):
+        """Ollama 클라이언트 초기화 (커넥션 풀 + 서킷 브레이커)"""
+        self.base_url = base_url.rstrip('/')
+        self.probe_interval = probe_interval
+
+        # keep-alive 커넥션 풀
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=4)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self.breaker = CircuitBreaker()
+        self.healthy = None  # None: 아직 모름
+        self.last_error = None
+
+        # 서버 다운 시 호출할 콜백 (기본: 캐시된 음성 안내)
+        self.on_unavailable = announce_unavailable
+
+        # 모델별 지연시간 기록
+        self.latency = {}
+        self.latency_lock = threading.Lock()
+
+        self.probe_thread = None
+        self.probe_stop = threading.Event()
+
+    # ---------------- 헬스 체크 ----------------
+
+    def probe(self):
+        """서버 상태를 한 번 확인 (가벼운 /api/version 요청)"""
+        try:
+            # 요청 세션과 분리된 일회성 요청 (풀 점유 방지)
+            response = requests.get(f"{self.base_url}/api/version", timeout=HEALTH_PROBE_TIMEOUT)
+            ok = response.status_code == 200
+        except requests.RequestException:
+            ok = False
+
+        if ok and self.healthy is False:
+            print("✅ Ollama 서버 복구됨")
+        elif not ok and self.healthy is not False:
+            print("⚠️ Ollama 서버 응답 없음 - 요청 차단")
+
+        self.healthy = ok
+        if ok:
+            self.breaker.record_success()
+        else:
+            self.breaker.force_open()
+        return ok
+
+    def start_health_probe(self):
+        """백그라운드 헬스 체크 스레드 시작 (이미 실행 중이면 무시)"""
+        if self.probe_thread and self.probe_thread.is_alive():
+            return
+        self.probe_stop.clear()
+
+        def probe_loop():
+            while not self.probe_stop.is_set():
+                self.probe()
+                self.probe_stop.wait(self.probe_interval)
+
+        self.probe_thread = threading.Thread(target=probe_loop, daemon=True)
+        self.probe_thread.start()
+
+    def stop_health_probe(self):
+        """헬스 체크 스레드 중지"""
+        self.probe_stop.set()
+        if self.probe_thread:
+            self.probe_thread.join(timeout=HEALTH_PROBE_TIMEOUT + 1)
+            self.probe_thread = None
+
+    def is_available(self):
+        """요청 가능 상태인지 확인"""
+        return self.breaker.would_allow()
+
+    # ---------------- 지연시간 기록 ----------------
+
+    def record_latency(self, model, metric, elapsed_ms):
+        with self.latency_lock:
+            histograms = self.latency.setdefault(model, {
+                'first_token': LatencyHistogram(),
+                'total': LatencyHistogram()
+            })
+            histograms[metric].record(elapsed_ms)
+
+    def get_latency_stats(self):
+        """모델별 지연시간 요약 반환"""
+        with self.latency_lock:
+            return {
+                model: {metric: hist.summary() for metric, hist in histograms.items()}
+                for model, histograms in self.latency.items()
+            }
+
+    # ---------------- 생성 요청 ----------------
+
+    def generate_stream(self, model, prompt, images=None, timeout=120, notify=True):
+        """
+        스트리밍 생성: 응답 조각(str)을 yield 합니다.
+        서버를 쓸 수 없으면 아무것도 yield 하지 않고 끝납니다 (last_error 참고).
+        notify=False면 연결 불가 안내를 재생하지 않음 (다른 안내를 재생 중인 호출자가 직접 재생)
+        중간에 close()하면 응답 연결을 바로 닫습니다 (취소).
+        """
+        self.start_health_probe()
+        self.last_error = None
+
+        if not self.breaker.allow_request():
+            self.last_error = "unavailable"
+            print(f"❌ Ollama 서버 사용 불가 - {model} 요청 즉시 실패")
+            if notify and self.on_unavailable:
+                self.on_unavailable()
+            return
+
+        data = {"model": model, "prompt": prompt, "stream": True}
+        if images:
+            data["images"] = images
+
+        start = time.time()
+        first_token_at = None
+        try:
+            with self.session.post(f"{self.base_url}/api/generate", json=data, stream=True,
+                                   timeout=(CONNECT_TIMEOUT, timeout)) as response:
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    piece = chunk.get("response", "")
+                    if piece and first_token_at is None:
+                        first_token_at = time.time()
+                        self.record_latency(model, 'first_token', (first_token_at - start) * 1000)
+                    if piece:
+                        yield piece
+                    if chunk.get("done"):
+                        break
+                    if time.time() - start > timeout:
+                        raise requests.exceptions.Timeout(f"전체 응답 시간 {timeout}초 초과")
+
+            self.breaker.record_success()
+            self.record_latency(model, 'total', (time.time() - start) * 1000)
+
+        except GeneratorExit:
+            # 호출자가 중간에 닫음 (취소) - 서버는 응답하고 있었으므로 성공으로 기록
+            self.breaker.record_success()
+            raise
+        except requests.exceptions.ConnectionError:
+            self.last_error = "connection"
+            self.breaker.record_failure()
+            print("❌ 연결 오류: Ollama 서버가 실행 중인지 확인하세요")
+            print("💡 해결방법: 'ollama serve' 명령어로 서버를 시작하세요")
+            if notify and self.on_unavailable:
+                self.on_unavailable()
+        except requests.exceptions.Timeout:
+            self.last_error = "timeout"
+            self.breaker.record_failure()
+            print(f"❌ 요청 시간 초과: {model} 응답이 {timeout}초 안에 오지 않았습니다")
+        except (requests.RequestException, ValueError) as e:
+            self.last_error = "request"
+            self.breaker.release()
+            print(f"❌ API 요청 오류: {e}")
+
+    def load_model(self, model, keep_alive="10m", timeout=60):
+        """모델만 메모리에 올림 (빈 요청 = Ollama 프리로드)"""
+        return self._keep_alive_request(model, keep_alive, timeout)
+
+    def unload_model(self, model, timeout=10):
+        """모델을 메모리에서 내림 (keep_alive=0, 'ollama stop'과 동일)"""
+        return self._keep_alive_request(model, 0, timeout)
+
+    def _keep_alive_request(self, model, keep_alive, timeout):
+        if not self.breaker.allow_request():
+            return False
+        try:
+            response = self.session.post(f"{self.base_url}/api/generate",
+                                         json={"model": model, "keep_alive": keep_alive, "stream": False},
+                                         timeout=(CONNECT_TIMEOUT, timeout))
+            response.raise_for_status()
+            self.breaker.record_success()
+            return True
+        except requests.exceptions.ConnectionError:
+            self.breaker.record_failure()
+            return False
+        except requests.RequestException as e:
+            self.breaker.release()
+            print(f"⚠️ {model} keep_alive 요청 오류: {e}")
+            return False
+
+    def generate(self, model, prompt, images=None, timeout=120):
+        """전체 응답 텍스트를 반환 (실패 시 None)"""
+        pieces = list(self.generate_stream(model, prompt, images=images, timeout=timeout))
+        if self.last_error:
+            return None
+        return "".join(pieces)
+
+
+def unavailable_clip_path():
+    return os.path.join(TTS_CACHE_DIR, UNAVAILABLE_WAV)
+
+
+def announce_unavailable():
+    """서버 연결 불가 음성 안내 (유휴 시간에 미리 합성해 둔 캐시만 재생 - 장애 중에는 합성하지 않음)"""
+    try:
+        import pygame
+        from function.audio_store import resolve_audio
+
+        # 압축 저장된 캐시(FLAC/Opus)도 그대로 사용
+        stored_path = resolve_audio(unavailable_clip_path())
+        if not stored_path:
+            print("⚠️ 서버 오류 안내 음성이 아직 준비되지 않았습니다 (유휴 시간에 합성)")
+            return False
+
+        pygame.mixer.music.load(stored_path)
+        pygame.mixer.music.play()
+        while pygame.mixer.music.get_busy():
+            pygame.time.wait(100)
+        return True
+    except Exception as e:
+        print(f"⚠️ 서버 오류 안내 재생 실패: {e}")
+        return False
+
+
+# 전역 Ollama 클라이언트 인스턴스
+ollama_client = OllamaClient()
+
+# 편의 함수들
+def generate(model, prompt, images=None, timeout=120):
+    """공유 클라이언트로 생성 요청"""
+    return ollama_client.generate(model, prompt, images=images, timeout=timeout)
+
+def get_latency_stats():
+    """모델별 지연시간 통계"""
+    return ollama_client.get_latency_stats()
+
+if __name__ == "__main__":
+    # 테스트: 로컬 가짜 서버로 스트리밍/서킷 브레이커 확인
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+
+    class FakeOllamaHandler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            self.send_response(200)
+            self.end_headers()
+            self.wfile.write(b'{"version": "fake"}')
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            self.send_response(200)
+            self.end_headers()
+            for piece in ["안녕", "하세요", "."]:
+                self.wfile.write(json.dumps({"response": piece, "done": False}).encode() + b"\n")
+                time.sleep(0.05)
+            self.wfile.write(json.dumps({"response": "", "done": True}).encode() + b"\n")
+
+    server = HTTPServer(("127.0.0.1", 0), FakeOllamaHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    client = OllamaClient(f"http://127.0.0.1:{server.server_port}", probe_interval=0.5)
+    client.on_unavailable = None
+    print(f"응답: {client.generate('fake', '테스트')}")
+    print(f"지연시간: {client.get_latency_stats()}")
+
+    server.shutdown()
+    server.server_close()
+    for _ in range(FAILURE_THRESHOLD):
+        client.generate('fake', '테스트')
+    start = time.time()
+    print(f"서버 종료 후 응답: {client.generate('fake', '테스트')} ({(time.time() - start) * 1000:.1f}ms)")
+    print(f"서킷 상태: {client.breaker.state}")
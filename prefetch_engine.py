@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+네비게이션 기반 미리 가져오기
+- 메뉴 커서 / 선택된 동화 / 학습 단계가 바뀌면 다음에 필요한 것을 미리 준비
+  - 곧 재생할 클립 파일을 읽어 페이지 캐시에 올림
+  - 아직 없는 안내 조각 / 동화 첫 줄 / 단계 첫 단어 음성을 추측 우선순위로 합성 요청 (대화형 요청이나 커서 이동 시 실행 중이어도 중단)
+  - 다음 모드에 필요한 모델 프리로드 (메모리 관리자 예산 안에서)
+- 커서가 잠깐 스쳐 지나가면 시작하지 않고, 커서가 다른 곳으로 가면 진행 중인 준비를 취소
+"""
+
+import os
+import time
+import threading
+
+from navigation_system import nav_manager
+from tts_scheduler import tts_scheduler, SPECULATIVE
+
+SETTLE_DELAY = 0.3            # 커서가 이만큼 머물러야 준비 시작 (초)
+PREFETCH_STORY_LINES = 3      # 선택된 동화의 앞부분 몇 줄을 미리 합성할지
+PREFETCH_STAGE_WORDS = 2      # 선택된 단계의 앞 단어 몇 개를 미리 합성할지
+WARM_CHUNK_BYTES = 1024 * 1024
+WARM_LIMIT_BYTES = 8 * 1024 * 1024   # 파일 하나에서 미리 읽을 최대 크기
+
+
+class PrefetchEngine:
+    def __init__(self, nav=None, settle_delay=SETTLE_DELAY):
+        """미리 가져오기 엔진 초기화"""
+        self.nav = nav
+        self.settle_delay = settle_delay
+        self.lock = threading.Lock()
+        self.cancel_event = None         # 현재 대상의 취소 이벤트
+        self.jobs = []                   # 현재 대상을 위해 요청한 TTS 작업
+        self.stats = {'targets': 0, 'cancelled': 0, 'warmed_bytes': 0, 'tts_requested': 0,
+                      'tts_cancelled': 0}
+
+    # ---------------- 구독 ----------------
+
+    def on_navigation(self, kind, value, details):
+        """커서 이동 알림: 이전 준비를 취소하고 새 대상 준비 시작"""
+        self.cancel()
+        if kind == 'reset':
+            return
+
+        cancel_event = threading.Event()
+        with self.lock:
+            self.cancel_event = cancel_event
+            self.stats['targets'] += 1
+        threading.Thread(target=self.run, args=(kind, value, details, cancel_event),
+                         daemon=True).start()
+
+    def cancel(self):
+        """진행 중인 준비 중단 + 추측 TTS 작업 취소 (실행 중인 것도 종료)"""
+        with self.lock:
+            cancel_event, jobs = self.cancel_event, self.jobs
+            self.cancel_event, self.jobs = None, []
+            if cancel_event and not cancel_event.is_set():
+                cancel_event.set()
+                self.stats['cancelled'] += 1
+        if jobs:
+            cancelled = tts_scheduler.cancel_jobs(jobs)
+            with self.lock:
+                self.stats['tts_cancelled'] += cancelled
+
+    def run(self, kind, value, details, cancel_event):
+        # 커서를 빠르게 넘기는 중이면 아무것도 하지 않음
+        if cancel_event.wait(self.settle_delay):
+            return
+        start = time.time()
+        try:
+            if kind == 'menu':
+                self.prefetch_menu(value, details, cancel_event)
+            elif kind == 'story':
+                self.prefetch_story(value, details, cancel_event)
+            elif kind == 'stage':
+                self.prefetch_stage(value, details, cancel_event)
+        except Exception as e:
+            print(f"⚠️ 미리 가져오기 오류 ({kind}: {value}): {e}")
+            return
+        if not cancel_event.is_set():
+            print(f"🔮 미리 준비 완료 ({kind}: {value}, {(time.time() - start) * 1000:.0f}ms)")
+
+    # ---------------- 준비 작업 ----------------
+
+    def warm_file(self, path, cancel_event, limit=WARM_LIMIT_BYTES):
+        """파일을 읽어 페이지 캐시에 올림 (재생 시작 시 SD 카드 읽기 대기 제거)"""
+        from function.audio_store import resolve_audio
+        stored_path = resolve_audio(path) if str(path).endswith('.wav') else path
+        if not stored_path or not os.path.exists(stored_path):
+            return 0
+        read = 0
+        with open(stored_path, 'rb') as f:
+            while read < limit and not cancel_event.is_set():
+                chunk = f.read(WARM_CHUNK_BYTES)
+                if not chunk:
+                    break
+                read += len(chunk)
+        with self.lock:
+            self.stats['warmed_bytes'] += read
+        return read
+
+    def speculate_tts(self, text, output_path, cancel_event, on_done=None):
+        """추측 합성 요청 (커서가 떠나면 취소할 수 있게 기록)"""
+        if cancel_event.is_set():
+            return None
+        job = tts_scheduler.submit(text, str(output_path), SPECULATIVE, on_done=on_done)
+        with self.lock:
+            if self.cancel_event is cancel_event:
+                self.jobs.append(job)
+                self.stats['tts_requested'] += 1
+                return job
+        # 요청하는 사이에 대상이 바뀌었으면 바로 취소
+        tts_scheduler.cancel_jobs([job])
+        return None
+
+    def speculate_phrase(self, template, cancel_event, **slots):
+        """안내 문구의 빠진 조각만 미리 합성 요청"""
+        from function.phrase_composer import phrase_composer
+        for text, path in phrase_composer.missing_fragments(template, **slots):
+            self.speculate_tts(text, path, cancel_event)
+
+    def prefetch_menu(self, mode, details, cancel_event):
+        """기능에 커서가 머묾: 실행 사운드 클립 + 모델 프리로드 (+ 동화 목록 안내 조각)"""
+        for clip in details.get('clips', []):
+            self.warm_file(clip, cancel_event)
+        if cancel_event.is_set():
+            return
+
+        if self.nav is not None:
+            from memory_manager import memory_manager
+            memory_manager.preload_for_navigation(self.nav)
+
+        if mode == 'story':
+            from function.story_index import story_index
+            story_names = story_index.story_names()
+            if story_names:
+                self.speculate_phrase("사용가능한 {stories} 입니다", cancel_event, stories=story_names)
+                self.speculate_phrase("선택된 동화는 {story}입니다", cancel_event, story=story_names[0])
+
+    def prefetch_story(self, story_name, details, cancel_event):
+        """동화가 선택됨: 제목 조각, 앞부분 줄 음성 합성 요청, 줄 음성 파일 미리 읽기"""
+        from function.story_index import story_index
+        from function.story_pack import pack_path_for, line_audio_available
+
+        language = details.get('language', 'kor')
+        language_name = details.get('language_name', language)
+        self.speculate_phrase("동화 제목 {language} {story}", cancel_event,
+                              language=language_name, story=story_name)
+
+        lines = story_index.lines(story_name, language) or []
+        for number, line in enumerate(lines[:PREFETCH_STORY_LINES], 1):
+            if cancel_event.is_set():
+                return
+            if line_audio_available(story_name, language, number):
+                self.warm_file(story_index.line_audio_path(story_name, language, number), cancel_event)
+                continue
+            self.speculate_tts(line, story_index.line_audio_path(story_name, language, number), cancel_event,
+                               on_done=lambda success, n=number:
+                                   success and story_index.record_line_audio(story_name, language, n))
+
+        # 묶음 파일이 있으면 앞부분만 미리 읽음 (재생은 앞에서부터 순서대로)
+        self.warm_file(pack_path_for(story_name, language), cancel_event)
+
+    def prefetch_stage(self, stage, details, cancel_event):
+        """학습 단계가 선택됨: 확정 안내 조각 + 앞 단어 음성"""
+        self.speculate_phrase("{stage}단계를 선택하셨습니다", cancel_event, stage=stage)
+        audio_dir = details.get('audio_dir')
+        if not audio_dir:
+            return
+        for word in details.get('words', [])[:PREFETCH_STAGE_WORDS]:
+            if cancel_event.is_set():
+                return
+            word_path = os.path.join(str(audio_dir), f"word_{word}.wav")
+            if not self.warm_file(word_path, cancel_event):
+                self.speculate_tts(word, word_path, cancel_event)
+
+    def get_stats(self):
+        with self.lock:
+            return dict(self.stats, pending_jobs=sum(not job.done.is_set() for job in self.jobs))
+
+
+# 전역 미리 가져오기 엔진 인스턴스
+prefetch_engine = PrefetchEngine(nav=nav_manager)
+
+# 편의 함수들
+def start_prefetch_engine():
+    """네비게이션 커서 이동 구독 시작"""
+    nav_manager.add_listener(prefetch_engine.on_navigation)
+    print("🔮 미리 가져오기 시작 (메뉴 / 동화 / 학습 단계)")
+
+def get_prefetch_stats():
+    return prefetch_engine.get_stats()
+
+if __name__ == "__main__":
+    # 테스트 (TTS 요청 없이 클립 미리 읽기와 취소만 확인)
+    import tempfile
+    print("미리 가져오기 테스트")
+    clip_path = os.path.join(tempfile.mkdtemp(), "clip.mp3")
+    with open(clip_path, 'wb') as f:
+        f.write(os.urandom(3 * WARM_CHUNK_BYTES))
+
+    engine = PrefetchEngine(settle_delay=0.1)
+    engine.on_navigation('menu', 'photo', {'clips': [clip_path]})
+    engine.on_navigation('menu', 'reading', {'clips': [clip_path]})   # 바로 이동 → 앞의 준비 취소
+    time.sleep(0.5)
+    print(engine.get_stats())
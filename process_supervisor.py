@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+외부 헬퍼 프로세스 관리자
+- 모든 헬퍼(TTS, ollama, 쓰기 모드 등)를 독립된 프로세스 그룹으로 실행
+- PID 추적, 실행 시간 제한(deadline) 적용
+- 취소 시 프로세스 트리 전체를 즉시 종료 (pkill 패턴 검색 불필요)
+- 오래 실행되는 헬퍼가 죽으면 백오프 후 재시작
+- 헬퍼별 CPU / 메모리 사용량 보고
+"""
+
+import os
+import time
+import signal
+import threading
+import subprocess
+import psutil
+
+KILL_GRACE = 0.2          # SIGTERM 후 SIGKILL까지 대기 (초)
+RESTART_BACKOFF = 1.0     # 첫 재시작 대기 (초), 실패할 때마다 2배
+MAX_RESTART_BACKOFF = 30.0
+LOG_DIR = "/tmp/snowdream_helpers/"
+
+
+class ManagedProcess:
+    def __init__(self, name, cmd, group, popen, deadline=None, restart=False, spawn_kwargs=None):
+        """관리 중인 헬퍼 프로세스 하나의 상태"""
+        self.name = name
+        self.cmd = cmd
+        self.group = group
+        self.popen = popen
+        self.started_at = time.time()
+        self.deadline = deadline  # 절대 시각 (time.time() 기준)
+        self.restart = restart
+        self.spawn_kwargs = spawn_kwargs or {}
+        self.restart_count = 0
+        self.stopping = False
+        self.exited_at = None
+
+    @property
+    def pid(self):
+        return self.popen.pid
+
+    def is_running(self):
+        return self.popen.poll() is None
+
+
+class ProcessSupervisor:
+    def __init__(self):
+        """프로세스 관리자 초기화"""
+        self.processes = {}  # name → ManagedProcess
+        self.lock = threading.RLock()
+        self.watchdog_thread = None
+        self.watchdog_stop = threading.Event()
+        self.proc_cache = {}  # pid → psutil.Process (cpu_percent는 이전 호출과의 차이로 계산되므로 재사용)
+
+    # ---------------- 실행 ----------------
+
+    def _popen(self, cmd, cwd=None, stdout=None, stderr=None, text=True):
+        # start_new_session=True → 새 세션/프로세스 그룹 (PGID == PID)
+        return subprocess.Popen(cmd, cwd=cwd, stdout=stdout, stderr=stderr,
+                                text=text, start_new_session=True)
+
+    def run(self, name, cmd, cwd=None, timeout=None, group=None):
+        """
+        subprocess.run(capture_output=True, text=True)과 같은 방식으로 실행하되,
+        자체 프로세스 그룹에서 실행하고 취소 시 그룹 전체를 종료할 수 있게 합니다.
+        timeout 초과 시 프로세스 트리를 종료하고 subprocess.TimeoutExpired를 발생시킵니다.
+        """
+        popen = self._popen(cmd, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        managed = ManagedProcess(name, cmd, group or name, popen,
+                                 deadline=time.time() + timeout if timeout else None)
+        key = f"{name}:{popen.pid}"
+        with self.lock:
+            self.processes[key] = managed
+
+        try:
+            stdout, stderr = popen.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            self.kill_tree(managed)
+            stdout, stderr = popen.communicate()
+            raise subprocess.TimeoutExpired(cmd, timeout, output=stdout, stderr=stderr)
+        finally:
+            with self.lock:
+                self.processes.pop(key, None)
+
+        if managed.stopping:
+            # 취소로 종료된 경우 호출 측이 실패로 처리하도록 음수 종료 코드 유지
+            print(f"⏹️ {name} 취소됨 (PID {popen.pid})")
+        return subprocess.CompletedProcess(cmd, popen.returncode, stdout, stderr)
+
+    def spawn(self, name, cmd, cwd=None, group=None, deadline=None, restart=False):
+        """
+        오래 실행되는 헬퍼를 백그라운드로 시작합니다.
+        출력은 LOG_DIR에 기록 (PIPE를 읽지 않아 버퍼가 차서 멈추는 문제 방지).
+        restart=True면 비정상 종료 시 백오프 후 다시 시작합니다.
+        """
+        with self.lock:
+            existing = self.processes.get(name)
+            if existing and existing.is_running():
+                print(f"ℹ️ {name} 이미 실행 중 (PID {existing.pid})")
+                return existing
+
+        os.makedirs(LOG_DIR, exist_ok=True)
+        log_file = open(os.path.join(LOG_DIR, f"{name}.log"), 'a')
+        popen = self._popen(cmd, cwd=cwd, stdout=log_file, stderr=subprocess.STDOUT)
+        log_file.close()  # 자식 프로세스가 파일 디스크립터를 물려받음
+
+        managed = ManagedProcess(name, cmd, group or name, popen,
+                                 deadline=time.time() + deadline if deadline else None,
+                                 restart=restart,
+                                 spawn_kwargs={'cwd': cwd, 'group': group, 'deadline': deadline})
+        with self.lock:
+            if existing:
+                managed.restart_count = existing.restart_count
+            self.processes[name] = managed
+
+        print(f"🚀 {name} 시작 (PID {popen.pid})")
+        self.start_watchdog()
+        return managed
+
+    # ---------------- 종료 ----------------
+
+    def kill_tree(self, managed, grace=KILL_GRACE, wait=True):
+        """프로세스 그룹 전체를 종료 (SIGTERM → grace 후 SIGKILL)"""
+        managed.stopping = True
+        if not managed.is_running():
+            return True
+
+        try:
+            pgid = os.getpgid(managed.pid)
+        except ProcessLookupError:
+            return True
+
+        # 그룹 밖으로 빠져나간 손자 프로세스도 함께 처리
+        try:
+            descendants = psutil.Process(managed.pid).children(recursive=True)
+        except psutil.Error:
+            descendants = []
+
+        if not self.signal_group(pgid, signal.SIGTERM):
+            return True
+
+        def escalate():
+            try:
+                managed.popen.wait(timeout=grace)
+            except subprocess.TimeoutExpired:
+                pass
+            self.signal_group(pgid, signal.SIGKILL)
+            for child in descendants:
+                try:
+                    child.kill()
+                except psutil.Error:
+                    pass
+            try:
+                managed.popen.wait(timeout=grace)
+            except subprocess.TimeoutExpired:
+                pass
+
+        if wait:
+            escalate()
+        else:
+            threading.Thread(target=escalate, daemon=True).start()
+        return True
+
+    def signal_group(self, pgid, sig):
+        """
+        프로세스 그룹에 신호 전송 (그룹이 이미 없으면 False)
+        sudo로 root 권한에서 실행된 헬퍼(쓰기 모드)는 일반 사용자가 보낼 수 없으므로 sudo kill 사용
+        """
+        try:
+            os.killpg(pgid, sig)
+            return True
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+        try:
+            result = subprocess.run(['sudo', '-n', 'kill', f'-{int(sig)}', '--', f'-{pgid}'],
+                                    capture_output=True, timeout=2)
+            if result.returncode != 0:
+                print(f"⚠️ 프로세스 그룹 {pgid} 종료 실패 (권한 없음): {result.stderr.decode(errors='replace').strip()}")
+            return result.returncode == 0
+        except (OSError, subprocess.SubprocessError) as e:
+            print(f"⚠️ 프로세스 그룹 {pgid} 종료 실패 (권한 없음): {e}")
+            return False
+
+    def kill(self, name, wait=True):
+        """이름으로 헬퍼 종료"""
+        with self.lock:
+            targets = [m for key, m in self.processes.items() if m.name == name]
+        for managed in targets:
+            self.kill_tree(managed, wait=wait)
+        return len(targets)
+
+    def kill_group(self, group, wait=True):
+        """그룹(예: 'tts')에 속한 헬퍼 전부 종료"""
+        with self.lock:
+            targets = [m for m in self.processes.values() if m.group == group]
+        for managed in targets:
+            self.kill_tree(managed, wait=wait)
+        if targets:
+            print(f"🔫 {group} 헬퍼 {len(targets)}개 종료")
+        return len(targets)
+
+    def kill_all(self, wait=True):
+        """관리 중인 모든 헬퍼 종료"""
+        with self.lock:
+            targets = list(self.processes.values())
+        for managed in targets:
+            self.kill_tree(managed, wait=wait)
+        return len(targets)
+
+    # ---------------- 감시 (deadline / 재시작) ----------------
+
+    def start_watchdog(self, interval=0.5):
+        """deadline 초과와 비정상 종료를 감시하는 스레드 시작"""
+        if self.watchdog_thread and self.watchdog_thread.is_alive():
+            return
+        self.watchdog_stop.clear()
+
+        def watchdog_loop():
+            while not self.watchdog_stop.is_set():
+                self.check_processes()
+                self.watchdog_stop.wait(interval)
+
+        self.watchdog_thread = threading.Thread(target=watchdog_loop, daemon=True)
+        self.watchdog_thread.start()
+
+    def check_processes(self):
+        """deadline 초과 헬퍼 종료, 죽은 헬퍼 재시작"""
+        now = time.time()
+        with self.lock:
+            spawned = [m for key, m in self.processes.items() if key == m.name]
+
+        for managed in spawned:
+            if managed.is_running():
+                if managed.deadline and now > managed.deadline:
+                    print(f"⏰ {managed.name} 실행 시간 초과 - 종료")
+                    self.kill_tree(managed)
+                    with self.lock:
+                        self.processes.pop(managed.name, None)
+                continue
+
+            returncode = managed.popen.returncode
+            if managed.stopping or not managed.restart or returncode == 0:
+                with self.lock:
+                    if self.processes.get(managed.name) is managed:
+                        self.processes.pop(managed.name)
+                continue
+
+            # 비정상 종료 → 백오프 후 재시작
+            if managed.exited_at is None:
+                managed.exited_at = now
+            backoff = min(RESTART_BACKOFF * (2 ** managed.restart_count), MAX_RESTART_BACKOFF)
+            if now - managed.exited_at < backoff:
+                continue
+            print(f"♻️ {managed.name} 비정상 종료 (코드 {returncode}) - 재시작 {managed.restart_count + 1}회")
+            managed.restart_count += 1
+            self.spawn(managed.name, managed.cmd, restart=True, **managed.spawn_kwargs)
+
+    # ---------------- 상태 보고 ----------------
+
+    def stats(self):
+        """헬퍼별 CPU / 메모리 사용량 (프로세스 트리 합계)"""
+        with self.lock:
+            targets = list(self.processes.values())
+
+        result = {}
+        seen = {}
+        for managed in targets:
+            if not managed.is_running():
+                continue
+            cpu = 0.0
+            rss = 0
+            try:
+                root = self.cached_process(managed.pid)
+                for proc in [root] + root.children(recursive=True):
+                    proc = self.cached_process(proc.pid, proc)
+                    seen[proc.pid] = proc
+                    try:
+                        cpu += proc.cpu_percent(interval=None)
+                        rss += proc.memory_info().rss
+                    except psutil.Error:
+                        pass
+            except psutil.Error:
+                continue
+            entry = result.setdefault(managed.name, {'count': 0, 'cpu_percent': 0.0, 'rss_mb': 0.0,
+                                                     'group': managed.group})
+            entry['count'] += 1
+            entry['cpu_percent'] += cpu
+            entry['rss_mb'] += rss / 1024**2
+            entry['uptime_s'] = time.time() - managed.started_at
+            entry['restarts'] = managed.restart_count
+
+        # 끝난 프로세스는 캐시에서 제거 (첫 보고의 CPU는 0%, 다음 보고부터 실제 값)
+        with self.lock:
+            self.proc_cache = seen
+        return result
+
+    def tree_rss_mb(self, name):
+        """이름이 name인 헬퍼들의 현재 메모리 사용량 합계 (프로세스 트리, MB)"""
+        with self.lock:
+            targets = [m for m in self.processes.values() if m.name == name and m.is_running()]
+        rss = 0
+        for managed in targets:
+            try:
+                root = psutil.Process(managed.pid)
+                for proc in [root] + root.children(recursive=True):
+                    try:
+                        rss += proc.memory_info().rss
+                    except psutil.Error:
+                        pass
+            except psutil.Error:
+                continue
+        return rss / 1024**2
+
+    def cached_process(self, pid, proc=None):
+        """같은 PID면 이전 psutil.Process 재사용 (PID가 재사용된 경우는 새로 만듦)"""
+        with self.lock:
+            cached = self.proc_cache.get(pid)
+        if cached is not None and cached.is_running():
+            return cached
+        return proc or psutil.Process(pid)
+
+
+# 전역 프로세스 관리자 인스턴스
+supervisor = ProcessSupervisor()
+
+# 편의 함수들
+def run_helper(name, cmd, cwd=None, timeout=None, group=None):
+    """헬퍼를 실행하고 끝날 때까지 대기"""
+    return supervisor.run(name, cmd, cwd=cwd, timeout=timeout, group=group)
+
+def kill_helpers(group=None, wait=True):
+    """그룹(없으면 전체) 헬퍼 즉시 종료"""
+    if group:
+        return supervisor.kill_group(group, wait=wait)
+    return supervisor.kill_all(wait=wait)
+
+def get_helper_stats():
+    """헬퍼별 CPU / 메모리 사용량"""
+    return supervisor.stats()
+
+if __name__ == "__main__":
+    # 테스트
+    print("프로세스 관리자 테스트")
+    result = run_helper("echo", ["sh", "-c", "echo hello"])
+    print(f"실행 결과: {result.returncode}, '{result.stdout.strip()}'")
+
+    try:
+        run_helper("sleep", ["sh", "-c", "sleep 5"], timeout=0.3)
+    except subprocess.TimeoutExpired:
+        print("타임아웃 → 프로세스 그룹 종료 확인")
+
+    supervisor.spawn("crasher", ["sh", "-c", "sleep 0.2; exit 1"], restart=True)
+    time.sleep(2)
+    print(f"상태: {get_helper_stats()}")
+    start = time.time()
+    kill_helpers()
+    print(f"전체 종료: {(time.time() - start) * 1000:.1f}ms")
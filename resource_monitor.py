@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+리소스 텔레메트리 샘플러
+- 백그라운드 스레드에서 주기적으로 RAM / CPU / 프로세스별 RSS 기록
+- Jetson GPU / EMC 사용률은 sysfs에 있을 때만 읽음
+- 고정 크기 링 버퍼 + 모드 전환 주석
+- JSON / CSV 스냅샷 내보내기
+"""
+
+import os
+import csv
+import json
+import time
+import threading
+from collections import deque
+import psutil
+
+SAMPLE_INTERVAL = 1.0     # 샘플링 주기 (초)
+BUFFER_CAPACITY = 900     # 링 버퍼 크기 (1초 주기 기준 15분)
+HELPER_RESCAN_EVERY = 30  # 외부 헬퍼(ollama 등) PID 재탐색 주기 (샘플 수)
+EXPORT_DIR = "/home/drboom/py_project/hanium_snowdream/telemetry/"
+
+# 헬퍼 분류용 명령줄 패턴
+HELPER_PATTERNS = {
+    'tts': ['tts_cli.py', 'GPT-SoVITS', 'GPTSoVits', 'tts_server'],
+    'ollama': ['ollama'],
+    'ocr': ['ocr_recognizer', 'easyocr'],
+    'writing': ['writing_mode.py']
+}
+
+# Jetson sysfs 경로 후보 (sysfs_root 기준 상대 경로)
+GPU_LOAD_PATHS = [
+    'devices/platform/gpu.0/load',
+    'devices/gpu.0/load',
+    'devices/platform/17000000.ga10b/load',
+    'devices/platform/17000000.gv11b/load'
+]
+EMC_ACTIVITY_PATHS = [
+    'kernel/actmon_avg_activity/mc_all'
+]
+EMC_RATE_PATHS = [
+    'kernel/debug/bpmp/debug/clk/emc/rate',
+    'kernel/debug/clk/emc/clk_rate'
+]
+
+CSV_FIELDS = ['timestamp', 'mode', 'ram_percent', 'ram_used_mb', 'cpu_percent',
+              'main_rss_mb', 'tts_rss_mb', 'ollama_rss_mb', 'ocr_rss_mb', 'writing_rss_mb',
+              'gpu_load_percent', 'emc_activity', 'emc_rate_mhz']
+
+
+class ResourceSampler:
+    def __init__(self, interval=SAMPLE_INTERVAL, capacity=BUFFER_CAPACITY, sysfs_root="/sys"):
+        """리소스 샘플러 초기화"""
+        self.interval = interval
+        self.samples = deque(maxlen=capacity)
+        self.events = deque(maxlen=capacity)
+        self.lock = threading.Lock()
+
+        self.sysfs_root = sysfs_root
+        self.gpu_load_path = self.find_sysfs_path(GPU_LOAD_PATHS)
+        self.emc_activity_path = self.find_sysfs_path(EMC_ACTIVITY_PATHS)
+        self.emc_rate_path = self.find_sysfs_path(EMC_RATE_PATHS)
+
+        self.main_process = psutil.Process(os.getpid())
+        self.external_helpers = {}  # 자식이 아닌 헬퍼 (예: ollama serve) PID 캐시
+        self.sample_count = 0
+        self.current_mode = "main_menu"
+
+        self.thread = None
+        self.stop_event = threading.Event()
+
+        # 첫 cpu_percent 호출은 항상 0이므로 미리 한 번 호출
+        psutil.cpu_percent(None)
+
+    # ---------------- sysfs ----------------
+
+    def find_sysfs_path(self, candidates):
+        """후보 경로 중 존재하는 첫 번째 sysfs 파일"""
+        for relative in candidates:
+            path = os.path.join(self.sysfs_root, relative)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def read_sysfs_number(self, path):
+        if not path:
+            return None
+        try:
+            with open(path, 'r') as f:
+                return float(f.read().strip().split()[0])
+        except (OSError, ValueError, IndexError):
+            return None
+
+    # ---------------- 프로세스 ----------------
+
+    def classify(self, proc):
+        """프로세스를 헬퍼 종류로 분류 (해당 없으면 None)"""
+        try:
+            cmdline = ' '.join(proc.cmdline())
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            return None
+        for kind, patterns in HELPER_PATTERNS.items():
+            if any(pattern in cmdline for pattern in patterns):
+                return kind
+        return None
+
+    def rescan_external_helpers(self):
+        """자식이 아닌 헬퍼 프로세스 탐색 (전체 스캔이라 가끔만 실행)"""
+        helpers = {}
+        for proc in psutil.process_iter(['pid']):
+            kind = self.classify(proc)
+            if kind:
+                helpers[proc.pid] = (kind, proc)
+        self.external_helpers = helpers
+
+    def helper_rss_mb(self):
+        """헬퍼 종류별 RSS 합계 (MB)"""
+        totals = {kind: 0.0 for kind in HELPER_PATTERNS}
+        seen = set()
+
+        try:
+            children = self.main_process.children(recursive=True)
+        except psutil.Error:
+            children = []
+
+        for proc in children:
+            kind = self.classify(proc)
+            if kind:
+                try:
+                    totals[kind] += proc.memory_info().rss / 1024**2
+                    seen.add(proc.pid)
+                except psutil.Error:
+                    pass
+
+        for pid, (kind, proc) in list(self.external_helpers.items()):
+            if pid in seen:
+                continue
+            try:
+                totals[kind] += proc.memory_info().rss / 1024**2
+            except psutil.Error:
+                self.external_helpers.pop(pid, None)
+
+        return totals
+
+    # ---------------- 샘플링 ----------------
+
+    def sample(self):
+        """샘플 하나를 수집해서 링 버퍼에 추가"""
+        if self.sample_count % HELPER_RESCAN_EVERY == 0:
+            self.rescan_external_helpers()
+        self.sample_count += 1
+
+        memory = psutil.virtual_memory()
+        helpers = self.helper_rss_mb()
+        emc_rate = self.read_sysfs_number(self.emc_rate_path)
+        gpu_load = self.read_sysfs_number(self.gpu_load_path)
+
+        record = {
+            'timestamp': time.time(),
+            'mode': self.current_mode,
+            'ram_percent': memory.percent,
+            'ram_used_mb': round(memory.used / 1024**2, 1),
+            'cpu_percent': psutil.cpu_percent(None),
+            'main_rss_mb': round(self.main_process.memory_info().rss / 1024**2, 1),
+            'tts_rss_mb': round(helpers['tts'], 1),
+            'ollama_rss_mb': round(helpers['ollama'], 1),
+            'ocr_rss_mb': round(helpers['ocr'], 1),
+            'writing_rss_mb': round(helpers['writing'], 1),
+            # Jetson GPU load는 0~1000 단위
+            'gpu_load_percent': gpu_load / 10 if gpu_load is not None else None,
+            'emc_activity': self.read_sysfs_number(self.emc_activity_path),
+            'emc_rate_mhz': emc_rate / 1e6 if emc_rate is not None else None
+        }
+
+        with self.lock:
+            self.samples.append(record)
+        return record
+
+    def start(self):
+        """백그라운드 샘플링 시작 (이미 실행 중이면 무시)"""
+        if self.thread and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+
+        def sample_loop():
+            while not self.stop_event.is_set():
+                try:
+                    self.sample()
+                except Exception as e:
+                    print(f"⚠️ 리소스 샘플링 오류: {e}")
+                self.stop_event.wait(self.interval)
+
+        self.thread = threading.Thread(target=sample_loop, daemon=True)
+        self.thread.start()
+        print(f"📈 리소스 텔레메트리 시작 ({self.interval}초 주기)")
+
+    def stop(self):
+        """백그라운드 샘플링 중지"""
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(timeout=self.interval + 1)
+            self.thread = None
+
+    # ---------------- 주석 / 조회 ----------------
+
+    def annotate_mode(self, mode):
+        """모드 전환 기록 (이후 샘플에 모드 이름이 붙음)"""
+        with self.lock:
+            if mode == self.current_mode:
+                return
+            self.events.append({'timestamp': time.time(), 'from': self.current_mode, 'to': mode})
+            self.current_mode = mode
+
+    def query(self, since=None, last_n=None, mode=None):
+        """조건에 맞는 샘플 목록 반환"""
+        with self.lock:
+            result = list(self.samples)
+        if since is not None:
+            result = [r for r in result if r['timestamp'] >= since]
+        if mode is not None:
+            result = [r for r in result if r['mode'] == mode]
+        if last_n is not None:
+            result = result[-last_n:]
+        return result
+
+    def peak(self, field, since=None):
+        """필드의 최대값 샘플 반환 (예: 'ram_percent')"""
+        values = [r for r in self.query(since=since) if r.get(field) is not None]
+        return max(values, key=lambda r: r[field]) if values else None
+
+    def snapshot(self):
+        """현재 링 버퍼 스냅샷"""
+        with self.lock:
+            return {
+                'interval': self.interval,
+                'gpu_load_path': self.gpu_load_path,
+                'emc_activity_path': self.emc_activity_path,
+                'events': list(self.events),
+                'samples': list(self.samples)
+            }
+
+    def export_json(self, path=None):
+        """스냅샷을 JSON 파일로 저장하고 경로 반환"""
+        path = path or os.path.join(EXPORT_DIR, time.strftime("telemetry_%Y%m%d_%H%M%S.json"))
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+        print(f"💾 텔레메트리 JSON 저장: {path}")
+        return path
+
+    def export_csv(self, path=None):
+        """샘플을 CSV 파일로 저장하고 경로 반환"""
+        path = path or os.path.join(EXPORT_DIR, time.strftime("telemetry_%Y%m%d_%H%M%S.csv"))
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+            writer.writeheader()
+            for record in self.query():
+                writer.writerow(record)
+        print(f"💾 텔레메트리 CSV 저장: {path}")
+        return path
+
+
+# 전역 리소스 샘플러 인스턴스
+resource_monitor = ResourceSampler()
+
+# 편의 함수들
+def start_resource_monitor():
+    """백그라운드 샘플링 시작"""
+    resource_monitor.start()
+
+def annotate_mode(mode):
+    """모드 전환 기록"""
+    resource_monitor.annotate_mode(mode)
+
+def export_telemetry():
+    """JSON / CSV 스냅샷 저장"""
+    return resource_monitor.export_json(), resource_monitor.export_csv()
+
+if __name__ == "__main__":
+    # 테스트
+    print("리소스 텔레메트리 테스트")
+    sampler = ResourceSampler(interval=0.2, capacity=20)
+    sampler.start()
+    time.sleep(1)
+    sampler.annotate_mode("photo")
+    time.sleep(1)
+    sampler.stop()
+    for record in sampler.query(last_n=3):
+        print(record)
+    print(f"RAM 최고 사용: {sampler.peak('ram_percent')}")
@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""
+TTS 작업 스케줄러
+- 모든 GPT-SoVITS 합성 요청을 하나의 작업 큐로 모아 한 번에 하나씩 실행
+- 우선순위: 대화형(사용자가 기다리는 안내) > 미리 읽기(곧 재생할 동화 줄)
+            > 추측(커서가 머문 항목 미리 준비) > 백그라운드(유휴 시간 준비)
+- 같은 텍스트가 이미 대기/실행 중이면 합치고, 더 급한 요청이면 우선순위를 올림
+- 대화형 요청이 들어오면 실행 중인 추측/백그라운드 작업을 중단하고 나중에 다시 실행
+- 백그라운드 작업 일시 보류 (사용자 입력 중 등)
+- 클래스별 대기 작업 수, 대기 시간, 실행 시간 통계
+"""
+
+import os
+import time
+import heapq
+import shutil
+import itertools
+import threading
+import subprocess
+from collections import deque
+
+from process_supervisor import supervisor
+from function.audio_postprocess import postprocess_tts_output
+
+REF_AUDIO_PATH = "/home/drboom/py_project/shortform/route/kor_male.wav"
+GPT_SOVITS_DIR = "/home/drboom/py_project/GPT-SoVITS"
+TTS_TIMEOUT = 300
+
+# 우선순위 (작을수록 먼저)
+INTERACTIVE = 0
+READ_AHEAD = 1
+SPECULATIVE = 2               # 미리 가져오기 - 입력 중에도 실행하지만 대화형 요청이나 취소가 오면 바로 중단
+BACKGROUND = 3
+PRIORITY_NAMES = {INTERACTIVE: 'interactive', READ_AHEAD: 'read_ahead',
+                  SPECULATIVE: 'speculative', BACKGROUND: 'background'}
+
+PREEMPTIBLE = (SPECULATIVE, BACKGROUND)   # 대화형 요청이 오면 중단할 수 있는 클래스
+MAX_REQUEUE = 3               # 중단된 작업을 다시 실행하는 최대 횟수
+METRIC_WINDOW = 200           # 통계에 쓰는 최근 작업 수
+RSS_SAMPLE_INTERVAL = 0.5     # 합성 프로세스 메모리 측정 간격 (메모리 예산의 tts_server 사용량 갱신)
+
+
+class TTSJob:
+    def __init__(self, job_id, text, output_path, priority):
+        """합성 작업 하나 (같은 텍스트의 요청은 output_paths에 모임)"""
+        self.id = job_id
+        self.text = text
+        self.output_paths = [str(output_path)]
+        self.priority = priority
+        self.origin_priority = priority  # 처음 요청된 클래스 (통계는 우선순위가 올라가도 이 클래스로 집계)
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.done = threading.Event()
+        self.success = False
+        self.cancelled = False
+        self.synthesized = False        # 합성 파일이 만들어져 복사만 하면 되는 상태
+        self.requeues = 0
+        self.requesters = 1             # 이 작업을 요청한 수 (중복 요청마다 +1, 추측 요청 취소 시 -1)
+        self.callbacks = []             # 완료 시 호출할 함수 (성공 여부를 인자로 받음)
+
+    @property
+    def process_name(self):
+        return f"tts_job_{self.id}"
+
+    def wait(self, timeout=None):
+        """완료까지 대기, 성공 여부 반환"""
+        if not self.done.wait(timeout):
+            return False
+        return self.success
+
+
+class TTSScheduler:
+    def __init__(self):
+        """TTS 스케줄러 초기화 (작업 스레드는 첫 요청 때 시작)"""
+        self.queue = []                 # (우선순위, 순번, 작업)
+        self.pending = {}               # 텍스트 → 대기/실행 중인 작업 (중복 제거용)
+        self.counter = itertools.count()
+        self.condition = threading.Condition()
+        self.running = None
+        self.worker = None
+        self.background_allowed = threading.Event()
+        self.background_allowed.set()
+        self.metrics = {
+            name: {'submitted': 0, 'completed': 0, 'failed': 0, 'deduplicated': 0,
+                   'preempted': 0, 'waits': deque(maxlen=METRIC_WINDOW),
+                   'runs': deque(maxlen=METRIC_WINDOW)}
+            for name in PRIORITY_NAMES.values()
+        }
+
+    # ---------------- 요청 ----------------
+
+    def submit(self, text, output_path, priority=INTERACTIVE, on_done=None):
+        """
+        합성 요청 등록 (즉시 반환, 작업 객체의 wait()로 결과 확인)
+        on_done: 완료 후 작업 스레드에서 on_done(success)로 호출
+        """
+        with self.condition:
+            self.start_worker()
+            job = self.pending.get(text)
+            if job:
+                # 같은 텍스트가 이미 있으면 출력 경로만 추가하고 우선순위를 올림
+                job.requesters += 1
+                if str(output_path) not in job.output_paths:
+                    job.output_paths.append(str(output_path))
+                    if job.synthesized:
+                        # 합성은 끝나고 완료 처리만 남은 작업 → 바로 복사
+                        self.copy_output(job.output_paths[0], str(output_path))
+                if on_done:
+                    job.callbacks.append(on_done)
+                self.metrics[PRIORITY_NAMES[priority]]['deduplicated'] += 1
+                if priority < job.priority:
+                    job.priority = priority
+                    if job is not self.running:
+                        heapq.heappush(self.queue, (priority, next(self.counter), job))
+                return job
+
+            job = TTSJob(next(self.counter), text, output_path, priority)
+            if on_done:
+                job.callbacks.append(on_done)
+            self.pending[text] = job
+            heapq.heappush(self.queue, (priority, job.id, job))
+            self.metrics[PRIORITY_NAMES[priority]]['submitted'] += 1
+
+            # 사용자가 기다리는 요청이면 실행 중인 백그라운드 작업을 양보시킴
+            if priority == INTERACTIVE and self.running and self.running.priority in PREEMPTIBLE:
+                self.preempt(self.running)
+            self.condition.notify()
+            return job
+
+    def synthesize(self, text, output_path, priority=INTERACTIVE, timeout=None):
+        """합성 요청 후 완료까지 대기 (기존 generate_tts_* 함수 대체용)"""
+        return self.submit(text, output_path, priority).wait(timeout)
+
+    def preempt(self, job):
+        """실행 중인 작업의 프로세스 트리를 종료 → 작업 스레드가 다시 큐에 넣음"""
+        print(f"⏸️ {PRIORITY_NAMES[job.priority]} TTS 중단 (대화형 요청 우선): '{job.text[:20]}'")
+        self.metrics[PRIORITY_NAMES[job.origin_priority]]['preempted'] += 1
+        supervisor.kill(job.process_name, wait=False)
+
+    def cancel_pending(self, keep_background=True):
+        """취소 버튼: 대화형/미리 읽기 작업을 모두 취소 (백그라운드 작업은 유지)"""
+        with self.condition:
+            cancelled = []
+            kept = []
+            for entry in self.queue:
+                job = entry[2]
+                if keep_background and job.priority == BACKGROUND:
+                    kept.append(entry)
+                elif not job.cancelled:
+                    cancelled.append(job)
+            self.queue = kept
+            heapq.heapify(self.queue)
+            if self.running and not (keep_background and self.running.priority == BACKGROUND):
+                cancelled.append(self.running)
+                supervisor.kill(self.running.process_name, wait=False)
+            for job in cancelled:
+                job.cancelled = True
+                if job is not self.running:
+                    self.finish(job, False)
+        for job in cancelled:
+            if job.done.is_set():
+                self.run_callbacks(job)
+        if cancelled:
+            print(f"🚫 TTS 작업 {len(cancelled)}개 취소")
+        return len(cancelled)
+
+    def cancel_jobs(self, jobs):
+        """
+        추측으로 요청한 작업 취소 (미리 가져오기 대상이 바뀌었을 때)
+        jobs의 항목마다 요청 하나를 거둬들이고, 다른 요청자가 남지 않은 작업만 취소
+        (대화형으로 올라간 작업은 두고, 실행 중인 작업은 추측 작업일 때만 프로세스를 종료)
+        """
+        cancelled = []
+        killed = 0
+        with self.condition:
+            for job in jobs:
+                if job.done.is_set():
+                    continue
+                job.requesters -= 1
+                if job.requesters > 0 or job.priority == INTERACTIVE:
+                    continue
+                if job is self.running:
+                    if job.priority == SPECULATIVE and not job.cancelled:
+                        # 종료 후 작업 스레드가 취소된 작업으로 완료 처리 (다시 큐에 넣지 않음)
+                        job.cancelled = True
+                        supervisor.kill(job.process_name, wait=False)
+                        killed += 1
+                    continue
+                job.cancelled = True
+                self.finish(job, False)
+                cancelled.append(job)
+        for job in cancelled:
+            self.run_callbacks(job)
+        return len(cancelled) + killed
+
+    # ---------------- 백그라운드 보류 ----------------
+
+    def pause_background(self):
+        """백그라운드 작업을 새로 시작하지 않음 (실행 중인 것도 양보)"""
+        self.background_allowed.clear()
+        with self.condition:
+            if self.running and self.running.priority == BACKGROUND:
+                self.preempt(self.running)
+
+    def resume_background(self):
+        self.background_allowed.set()
+        with self.condition:
+            self.condition.notify()
+
+    # ---------------- 작업 스레드 ----------------
+
+    def start_worker(self):
+        if self.worker and self.worker.is_alive():
+            return
+        self.worker = threading.Thread(target=self.worker_loop, daemon=True)
+        self.worker.start()
+
+    def next_job(self):
+        """실행할 다음 작업 (백그라운드 보류 중이면 백그라운드는 건너뜀)"""
+        while True:
+            with self.condition:
+                while self.queue:
+                    priority, _, job = self.queue[0]
+                    # 우선순위가 올라가 다시 들어간 작업의 이전 항목, 취소된 작업은 버림
+                    if job.cancelled or job.done.is_set() or priority != job.priority or job is self.running:
+                        heapq.heappop(self.queue)
+                        continue
+                    if priority == BACKGROUND and not self.background_allowed.is_set():
+                        break
+                    heapq.heappop(self.queue)
+                    self.running = job
+                    return job
+                self.condition.wait(timeout=1.0)
+
+    def worker_loop(self):
+        while True:
+            job = self.next_job()
+            name = PRIORITY_NAMES[job.origin_priority]
+            job.started_at = time.time()
+            self.metrics[name]['waits'].append(job.started_at - job.submitted_at)
+
+            returncode = self.run_tts(job)
+
+            with self.condition:
+                self.running = None
+                killed = returncode is not None and returncode < 0
+                if killed and not job.cancelled and job.priority in PREEMPTIBLE and job.requeues < MAX_REQUEUE:
+                    # 중단된 백그라운드 작업은 나중에 다시 실행
+                    job.requeues += 1
+                    job.started_at = None
+                    heapq.heappush(self.queue, (job.priority, next(self.counter), job))
+                    continue
+                self.metrics[name]['runs'].append(time.time() - job.started_at)
+                job.success = returncode == 0 and not job.cancelled
+
+            # 콜백(인덱스 갱신 등)을 먼저 실행한 뒤 대기 중인 호출자를 깨움
+            self.run_callbacks(job)
+            with self.condition:
+                self.finish(job, job.success)
+
+    def run_tts(self, job):
+        """GPT-SoVITS 실행 → 후처리 → 같은 텍스트를 요청한 다른 경로로 복사, 종료 코드 반환"""
+        output_path = job.output_paths[0]
+        cmd = [
+            'conda', 'run', '-n', 'GPTSoVits', 'python', 'tts_cli.py',
+            '--text', job.text,
+            '--ref_audio', REF_AUDIO_PATH,
+            '--output', output_path
+        ]
+        print(f"🔊 TTS 생성 중 [{PRIORITY_NAMES[job.priority]}]: '{job.text[:30]}'")
+        peak_mb = [0.0]
+        sampling_done = threading.Event()
+
+        def sample_rss():
+            while not sampling_done.wait(RSS_SAMPLE_INTERVAL):
+                peak_mb[0] = max(peak_mb[0], supervisor.tree_rss_mb(job.process_name))
+
+        sampler = threading.Thread(target=sample_rss, daemon=True)
+        sampler.start()
+        try:
+            result = supervisor.run(job.process_name, cmd, cwd=GPT_SOVITS_DIR,
+                                    timeout=TTS_TIMEOUT, group='tts')
+        except subprocess.TimeoutExpired:
+            print(f"❌ TTS 시간 초과: '{job.text[:30]}'")
+            return 1
+        except Exception as e:
+            print(f"❌ TTS 실행 오류: {e}")
+            return 1
+        finally:
+            sampling_done.set()
+            sampler.join()
+
+        if result.returncode != 0:
+            if result.returncode > 0:
+                print(f"❌ TTS 생성 실패: {result.stderr}")
+            return result.returncode
+
+        # 끝까지 실행된 합성의 최대 메모리로 예산 갱신 (중단된 실행은 최대치가 아니므로 제외)
+        from memory_manager import memory_manager
+        memory_manager.record_footprint('tts_server', peak_mb[0])
+
+        postprocess_tts_output(output_path)
+        # 중복 요청으로 모인 다른 경로에도 같은 결과 복사 (요청 목록은 잠금 안에서 복사)
+        with self.condition:
+            job.synthesized = True
+            extra_paths = job.output_paths[1:]
+        for extra_path in extra_paths:
+            self.copy_output(output_path, extra_path)
+        print(f"✅ TTS 생성 완료: {output_path}")
+        return 0
+
+    def copy_output(self, source_path, target_path):
+        try:
+            os.makedirs(os.path.dirname(target_path) or '.', exist_ok=True)
+            shutil.copyfile(source_path, target_path)
+        except OSError as e:
+            print(f"⚠️ TTS 결과 복사 실패: {e}")
+
+    def finish(self, job, success):
+        """작업 완료 처리 (대기 중인 호출자 깨움) - condition 잠금 안에서 호출"""
+        job.success = success
+        job.finished_at = time.time()
+        if self.pending.get(job.text) is job:
+            del self.pending[job.text]
+        self.metrics[PRIORITY_NAMES[job.origin_priority]]['completed' if success else 'failed'] += 1
+        job.done.set()
+
+    def run_callbacks(self, job):
+        """완료 콜백 실행 (잠금 밖에서 호출, 콜백 오류는 무시)"""
+        for callback in job.callbacks:
+            try:
+                callback(job.success)
+            except Exception as e:
+                print(f"⚠️ TTS 완료 콜백 오류: {e}")
+
+    # ---------------- 통계 ----------------
+
+    def queue_depth(self):
+        """클래스별 대기 작업 수"""
+        with self.condition:
+            depth = {name: 0 for name in PRIORITY_NAMES.values()}
+            seen = set()
+            for priority, _, job in self.queue:
+                if job.id in seen or job.cancelled or priority != job.priority:
+                    continue
+                seen.add(job.id)
+                depth[PRIORITY_NAMES[priority]] += 1
+            return depth
+
+    def get_metrics(self):
+        """
+        클래스별 대기 작업 수, 대기 시간(평균/p95/최대), 실행 시간, 중복/중단 횟수
+        대기 작업 수는 현재 클래스, 나머지는 처음 요청된 클래스 기준 (제출 수와 완료 수가 맞도록)
+        """
+        depth = self.queue_depth()
+        result = {}
+        with self.condition:
+            for name, metric in self.metrics.items():
+                waits = sorted(metric['waits'])
+                runs = list(metric['runs'])
+                result[name] = {
+                    'queue_depth': depth[name],
+                    'submitted': metric['submitted'],
+                    'completed': metric['completed'],
+                    'failed': metric['failed'],
+                    'deduplicated': metric['deduplicated'],
+                    'preempted': metric['preempted'],
+                    'wait_avg_s': sum(waits) / len(waits) if waits else None,
+                    'wait_p95_s': waits[int(len(waits) * 0.95)] if waits else None,
+                    'wait_max_s': waits[-1] if waits else None,
+                    'run_avg_s': sum(runs) / len(runs) if runs else None,
+                }
+            result['running'] = self.running.text[:30] if self.running else None
+        return result
+
+
+# 전역 TTS 스케줄러 인스턴스
+tts_scheduler = TTSScheduler()
+
+# 편의 함수들
+def synthesize(text, output_path, priority=INTERACTIVE, timeout=None):
+    """합성하고 완료까지 대기 (성공 여부 반환)"""
+    return tts_scheduler.synthesize(text, output_path, priority, timeout)
+
+def submit_tts(text, output_path, priority=BACKGROUND, on_done=None):
+    """합성 요청만 등록하고 바로 반환 (미리 읽기 / 백그라운드 준비용)"""
+    return tts_scheduler.submit(text, output_path, priority, on_done)
+
+def get_tts_metrics():
+    """대기 작업 수와 대기 시간 통계"""
+    return tts_scheduler.get_metrics()
+
+if __name__ == "__main__":
+    # 테스트 (GPT-SoVITS 대신 sleep 명령으로 실행 순서 / 중단 확인)
+    print("TTS 스케줄러 테스트")
+
+    def fake_run_tts(job):
+        cmd = ['sh', '-c', f'sleep {0.3 if job.priority == INTERACTIVE else 1}']
+        print(f"  실행 [{PRIORITY_NAMES[job.priority]}] {job.text}")
+        return supervisor.run(job.process_name, cmd, group='tts').returncode
+
+    tts_scheduler.run_tts = fake_run_tts
+    background = [submit_tts(f"배경 {i}", f"/tmp/bg_{i}.wav", BACKGROUND) for i in range(2)]
+    time.sleep(0.2)
+    ahead = submit_tts("다음 줄", "/tmp/ahead.wav", READ_AHEAD)
+    start = time.time()
+    print(f"대화형 결과: {synthesize('1단계를 선택하셨습니다', '/tmp/stage.wav')}, "
+          f"{(time.time() - start) * 1000:.0f}ms")
+    duplicate = submit_tts("다음 줄", "/tmp/ahead_copy.wav", INTERACTIVE)
+    print(f"중복 합치기: {duplicate is ahead}")
+    for job in background + [ahead]:
+        job.wait()
+    print(get_tts_metrics())